@@ -0,0 +1,98 @@
+"""Benchmark: full download + BeautifulSoup vs streaming, size-capped text extraction.
+
+Serves synthetic article pages of several sizes from a local HTTP server and
+reports latency and peak Python memory (tracemalloc) for both paths.
+
+Usage:
+    python benchmarks/bench_html_extract.py
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from src.utils.html_text import fetch_text  # noqa: E402
+
+MAX_CHARS = 8000
+
+
+def make_page(size_bytes: int) -> bytes:
+    """An article page padded with inline scripts, styles and long comment threads."""
+    head = "<html><head><title>Climbs</title><style>" + "p{margin:0}" * 2000 + "</style></head><body>"
+    block = (
+        "<script>window.__STATE__ = " + '{"k": "v"}, ' * 500 + "</script>"
+        "<div class='climb'><h2>Rocacorba</h2><p>13.8 km at 6.5% average with 800 m of gain.</p></div>"
+        "<div class='comment'><p>" + "Great climb, hard at the top. " * 40 + "</p></div>"
+    )
+    body = head
+    while len(body) < size_bytes:
+        body += block
+    return (body + "</body></html>").encode("utf-8")
+
+
+def baseline(url: str) -> str:
+    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    soup = BeautifulSoup(response.content, "html.parser")
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)[:MAX_CHARS]
+
+
+def streaming(url: str) -> str:
+    return fetch_text(url, max_chars=MAX_CHARS).text
+
+
+def measure(fn, url: str, repeats: int = 3):
+    latencies, peaks = [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(url)
+        latencies.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return min(latencies), max(peaks)
+
+
+def main():
+    pages = {size: make_page(size) for size in (100_000, 1_000_000, 5_000_000)}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = pages[int(self.path.strip("/"))]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streaming client hung up early, as intended
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'page':>8} | {'path':>9} | {'latency ms':>10} | {'peak MB':>8}")
+    for size in pages:
+        url = f"{base}/{size}"
+        for name, fn in (("bs4", baseline), ("streaming", streaming)):
+            latency, peak = measure(fn, url)
+            print(f"{size / 1e6:>6.1f}MB | {name:>9} | {latency * 1000:>10.1f} | {peak / 1e6:>8.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark: HTML parsing throughput in the calling thread vs in a ParsePool.
+
+Parses synthetic article pages from memory (no network), each driven by
+several threads the way concurrent sessions would, and reports pages per
+second and pages per second per core. In-thread parsing is capped at one
+core by the GIL however many threads call it; the pool scales with workers.
+
+Usage:
+    python benchmarks/bench_parse_pool.py [pages]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from benchmarks.bench_html_extract import make_page  # noqa: E402
+from src.utils.html_text import extract_text  # noqa: E402
+from src.utils.parse_pool import ParsePool  # noqa: E402
+
+# Enough text that a page is parsed to the end, as for long comment threads
+MAX_CHARS = 1_000_000
+CHUNK = 16 * 1024
+
+
+def chunked(page: bytes):
+    return [page[i : i + CHUNK] for i in range(0, len(page), CHUNK)]
+
+
+def run(parse, pages, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as callers:
+        list(callers.map(parse, pages))
+    return len(pages) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    cores = os.cpu_count() or 1
+    pages = [make_page(200_000) for _ in range(count)]
+    threads = max(4, 2 * cores)
+
+    print(f"{count} pages of {len(pages[0]) / 1e3:.0f} kB, {threads} calling threads, {cores} cores")
+    print(f"{'mode':>12} | {'workers':>7} | {'pages/s':>8} | {'pages/s/core':>12}")
+
+    rate = run(lambda page: extract_text(chunked(page), max_chars=MAX_CHARS), pages, threads)
+    print(f"{'in-thread':>12} | {1:>7} | {rate:>8.1f} | {rate:>12.1f}")
+
+    for workers in sorted({1, max(1, cores // 2), cores}):
+        pool = ParsePool(workers=workers)
+        # Start the workers before timing
+        run(lambda page: pool.parse(chunked(page), max_chars=MAX_CHARS), pages[:workers], workers)
+        rate = run(lambda page: pool.parse(chunked(page), max_chars=MAX_CHARS), pages, threads)
+        print(f"{'pool':>12} | {workers:>7} | {rate:>8.1f} | {rate / workers:>12.1f}")
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
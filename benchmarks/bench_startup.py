@@ -0,0 +1,62 @@
+"""Benchmark: import time of the CLI, batch and tool modules in fresh interpreters.
+
+Each import runs in a new `python -c` process, so nothing is cached between
+runs, and the median of several runs is reported. "cli" is what the chat CLI
+imports before it shows the welcome panel and prompt; the model, LangChain
+and the tools load in the background after that.
+
+Pass --budget to fail (exit status 1) when the CLI import takes longer, for
+use as a regression guard in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget 1.0]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORTS = {
+    "cli": "import src.agents.conversational_agent",
+    "batch": "import src.agents.batch_runner, src.agents.conversational_agent",
+    "tools": "import src.tools.tools",
+    "agent stack": "import src.agents.conversational_agent, src.agents.climb_pipeline, src.agents.deadline_executor",
+}
+
+
+def import_seconds(statement: str) -> float:
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "src")]))
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None, help="Maximum CLI import time in seconds")
+    args = parser.parse_args()
+
+    # Warm the OS file cache so the first measurement is not an outlier
+    import_seconds(IMPORTS["agent stack"])
+
+    print(f"{'import':>12} | {'median s':>8} | {'min s':>6}")
+    results = {}
+    for name, statement in IMPORTS.items():
+        times = [import_seconds(statement) for _ in range(args.runs)]
+        results[name] = statistics.median(times)
+        print(f"{name:>12} | {results[name]:>8.3f} | {min(times):>6.3f}")
+
+    if args.budget is not None and results["cli"] > args.budget:
+        print(f"CLI import took {results['cli']:.3f}s, over the {args.budget:.3f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
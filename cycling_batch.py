@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Cycling Assistant - batch mode
+
+Runs every question in a JSONL file through the agent and appends one JSON
+result per line (answer, tool trace, timings and token counts). Re-running
+with the same output file resumes where the last run stopped.
+
+Usage:
+    python cycling_batch.py questions.jsonl results.jsonl --concurrency 4
+
+Each input line looks like {"id": "q1", "question": "Climbs near Girona?"}
+"""
+
+import sys
+import os
+
+# Add src to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+
+from src.agents.batch_runner import main
+
+if __name__ == "__main__":
+    main()
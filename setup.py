@@ -13,5 +13,5 @@ setup(
         "pydantic>=2.0.0",
         "requests>=2.31.0",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
 )
@@ -1,11 +1,11 @@
 import os
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from ..models.azure_openai_models import get_azure_openai_model
 from ..tools.tools import find_bike_rentals
 from ..prompts.system_prompt import agent_system_prompt
+from ..utils.env import load_env
 
-load_dotenv()
+load_env()
 
 MODEL = os.getenv("MODEL", "gpt-4o-mini")
 
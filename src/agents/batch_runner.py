@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ..utils.climb_query import ClimbCatalog, catalog_scope
+from ..utils.deadline import deadline_scope
+from ..utils.profiling import profile_turn, profiling_requested
+
+logger = logging.getLogger(__name__)
+
+ID_KEYS = ("id", "request_id")
+QUESTION_KEYS = ("question", "input", "text", "body")
+
+
+class TraceCallback(BaseCallbackHandler):
+    """Collects the tool calls, LLM calls and token usage of one question."""
+
+    def __init__(self):
+        self.tools: List[Dict[str, Any]] = []
+        self.llm_calls = 0
+        self.tokens = {"input": 0, "output": 0, "total": 0}
+        self._started: Dict[Any, tuple] = {}
+        self._nested: Set[Any] = set()
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id in self._started:
+            # A wrapped tool run by its wrapper (CompactResultTool); the wrapper's entry covers it
+            self._nested.add(run_id)
+            return
+        name = (serialized or {}).get("name") or kwargs.get("name", "tool")
+        self._started[run_id] = (name, input_str, time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish_tool(run_id, output=str(getattr(output, "content", output)))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id, error=str(error))
+
+    def _finish_tool(self, run_id, **result):
+        if run_id in self._nested:
+            self._nested.discard(run_id)
+            return
+        name, tool_input, start = self._started.pop(run_id, ("tool", "", time.perf_counter()))
+        self.tools.append(
+            {"tool": name, "input": tool_input, "seconds": round(time.perf_counter() - start, 3), **result}
+        )
+
+    def on_llm_end(self, response, **kwargs):
+        self.llm_calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.tokens["input"] += usage.get("input_tokens", 0)
+                    self.tokens["output"] += usage.get("output_tokens", 0)
+                    self.tokens["total"] += usage.get("total_tokens", 0)
+
+
+def read_questions(path: str) -> Iterator[Dict[str, str]]:
+    """Stream {"id", "question"} records from a JSONL file, one line at a time.
+
+    Lines may use "id" or "request_id" for the id and "question", "input",
+    "text" or "body" for the question; a missing id becomes the line number.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            question = next((record[k] for k in QUESTION_KEYS if record.get(k)), None)
+            if question is None:
+                logger.warning("Line %d has no question; skipping", line_number)
+                continue
+            question_id = next((record[k] for k in ID_KEYS if record.get(k) is not None), line_number)
+            yield {"id": str(question_id), "question": question}
+
+
+def _answered(path: str) -> Dict[str, str]:
+    """The latest error-free record line per id in an earlier (possibly interrupted) run."""
+    answered: Dict[str, str] = {}
+    if not os.path.exists(path):
+        return answered
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that question runs again
+                continue
+            if "error" not in record:
+                answered[str(record["id"])] = line.rstrip("\n")
+    return answered
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids already answered without error in an earlier (possibly interrupted) run."""
+    return set(_answered(path))
+
+
+def compact_results(path: str) -> Set[str]:
+    """Rewrite the output with only the latest error-free record per id, and return those ids.
+
+    Failed and cut-short records are dropped because those questions run
+    again, so after a resumed run the file holds one record per id.
+    """
+    if not os.path.exists(path):
+        return set()
+    answered = _answered(path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in answered.values())
+    os.replace(tmp_path, path)
+    return set(answered)
+
+
+class BatchRunner:
+    """Runs questions through a session's agent with bounded concurrency.
+
+    Results are appended to the output JSONL as each question finishes, so a
+    crashed run resumes where it stopped: answered ids are skipped and
+    failed ones are retried. Resuming first drops the failed records, so
+    the file keeps one record per id.
+    """
+
+    def __init__(self, session: Any, concurrency: int = 4, deadline_s: Optional[float] = None):
+        self.session = session
+        self.concurrency = concurrency
+        self.deadline_s = deadline_s
+        self.profile = profiling_requested()
+
+    async def answer(self, question: str, trace: TraceCallback) -> Dict[str, Any]:
+        session = self.session
+        config = {"callbacks": [trace]}
+        # The same paths the interactive chat takes: climb fast path, then router or agent
+        fast = await asyncio.to_thread(session._run_climb_fast_path, question, [], config=config)
+        if fast is not None:
+            return {"output": fast["output"], "path": "climb_fast_path"}
+        inputs = {"input": question, "chat_history": []}
+        if session.router:
+            response = await asyncio.to_thread(session.router.invoke, question, inputs, config=config)
+            return {"output": response.get("output", str(response)), "path": "router"}
+        response = await session.agent.ainvoke(inputs, config=config)
+        return {"output": response.get("output", str(response)), "path": "agent"}
+
+    async def run_one(self, item: Dict[str, str]) -> Dict[str, Any]:
+        trace = TraceCallback()
+        start = time.perf_counter()
+        record: Dict[str, Any] = {"id": item["id"], "question": item["question"]}
+        # Questions are independent, so each gets its own climb catalogue
+        with deadline_scope(self.deadline_s), catalog_scope(ClimbCatalog()), profile_turn(
+            self.profile, label=item["id"]
+        ) as profile:
+            try:
+                record.update(await self.answer(item["question"], trace))
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+        if profile is not None:
+            record["profile"] = {"phases": profile.summary(), "stacks": profile.stacks_path}
+        record.update(
+            seconds=round(time.perf_counter() - start, 3),
+            llm_calls=trace.llm_calls,
+            tokens=trace.tokens,
+            tools=trace.tools,
+        )
+        return record
+
+    async def results(self, questions: Iterator[Dict[str, str]]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield results in completion order, never holding more than `concurrency` in flight."""
+        pending: Set[asyncio.Task] = set()
+        for item in questions:
+            if len(pending) >= self.concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(self.run_one(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    async def run(self, input_path: str, output_path: str) -> Dict[str, int]:
+        done = compact_results(output_path)
+        todo = (q for q in read_questions(input_path) if q["id"] not in done)
+        summary = {"skipped": len(done), "answered": 0, "failed": 0}
+        with open(output_path, "a", encoding="utf-8") as out:
+            async for record in self.results(todo):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                summary["failed" if "error" in record else "answered"] += 1
+                logger.info("%s done in %.1fs", record["id"], record["seconds"])
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for batch mode (see cycling_batch.py)."""
+    from .conversational_agent import ConversationalCyclingAgent
+    from ..models.registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Run a JSONL file of questions through the cycling agent.")
+    parser.add_argument("input", help="JSONL file with one question per line")
+    parser.add_argument("output", help="JSONL file results are appended to (reused to resume)")
+    parser.add_argument("-c", "--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")))
+    parser.add_argument("--provider", default=os.getenv("MODEL_PROVIDER", "azure_openai"))
+    parser.add_argument(
+        "--deadline", type=float, default=None, help="Seconds per question (default: TURN_DEADLINE_S)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(message)s")
+    session = ConversationalCyclingAgent(model_provider=args.provider)
+    runner = BatchRunner(
+        session,
+        concurrency=args.concurrency,
+        deadline_s=args.deadline if args.deadline is not None else session.turn_deadline_s,
+    )
+    try:
+        summary = asyncio.run(runner.run(args.input, args.output))
+    finally:
+        get_registry().close()
+    print(json.dumps(summary))
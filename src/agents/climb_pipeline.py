@@ -0,0 +1,205 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..prompts.system_prompt import advanced_agent_system_prompt, climb_answer_prompt
+from ..tools.tools import find_cycling_climb_articles, scrape_and_extract_climb_stats
+from ..utils.climb_merge import merge_climbs
+from ..utils.deadline import bind_deadline
+from ..utils.encoding import drop_nulls, to_table
+
+logger = logging.getLogger(__name__)
+
+_CLIMB = re.compile(r"\b(climbs?|climbing routes?|cols?|ascents?|hill ?climbs?|passes)\b", re.IGNORECASE)
+# Anything that needs other tools or the user's own data goes through the full agent
+_OTHER_INTENT = re.compile(
+    r"\b(weather|forecast|rain|wind|rent(al)?s?|shops?|strava|my (routes?|rides?|activities)|"
+    r"elevation profile|plan|trip|itinerary|when|tomorrow|today|compare|versus|vs\.?)\b",
+    re.IGNORECASE,
+)
+_LOCATION = re.compile(
+    r"\b(?:near|around|in|close to|outside|by)\s+"
+    r"((?:[A-Z][\w'’.-]*)(?:(?:,\s*|\s+(?:de |del |la |le |d')?)[A-Z][\w'’.-]*)*)"
+)
+_NUMBER = r"(\d+(?:\.\d+)?)"
+_MORE = r"(?:over|above|more than|at least|steeper than|longer than|>=?)"
+_LESS = r"(?:under|below|less than|at most|shorter than|<=?)"
+
+
+@dataclass
+class PipelineEvent:
+    """One step of a streamed climb pipeline run."""
+
+    kind: str
+    url: Optional[str] = None
+    climbs: List[Dict] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    pending: int = 0
+    output: Optional[str] = None
+
+
+@dataclass
+class ClimbIntent:
+    """A climb lookup recognised in a user turn, with any numeric filters it states."""
+
+    location: str
+    radius_km: int = 50
+    min_gradient: Optional[float] = None
+    max_gradient: Optional[float] = None
+    min_length_km: Optional[float] = None
+    max_length_km: Optional[float] = None
+    min_gain_m: Optional[float] = None
+
+    def accepts(self, climb: Dict) -> bool:
+        """Whether a climb passes the filters; unknown stats are given the benefit of the doubt."""
+        checks = [
+            ("average_gradient", self.min_gradient, self.max_gradient),
+            ("distance_km", self.min_length_km, self.max_length_km),
+            ("elevation_gain_m", self.min_gain_m, None),
+        ]
+        for stat, low, high in checks:
+            value = climb.get(stat)
+            if value is None:
+                continue
+            if (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+
+def _bound(text: str, unit: str) -> Tuple[Optional[float], Optional[float]]:
+    low = re.search(rf"{_MORE}\s*{_NUMBER}\s*{unit}", text, re.IGNORECASE)
+    high = re.search(rf"{_LESS}\s*{_NUMBER}\s*{unit}", text, re.IGNORECASE)
+    return (float(low.group(1)) if low else None, float(high.group(1)) if high else None)
+
+
+def detect_climb_intent(text: str) -> Optional[ClimbIntent]:
+    """Recognise a plain "climbs near <place>" question.
+
+    Returns None whenever the turn is not clearly a climb lookup, so the
+    caller can hand it to the general agent instead.
+    """
+    if not _CLIMB.search(text) or _OTHER_INTENT.search(text):
+        return None
+    location = _LOCATION.search(text)
+    if not location:
+        return None
+
+    intent = ClimbIntent(location=location.group(1).strip(" ,.?!"))
+    radius = re.search(rf"within\s*{_NUMBER}\s*km", text, re.IGNORECASE)
+    if radius:
+        intent.radius_km = int(float(radius.group(1)))
+    intent.min_gradient, intent.max_gradient = _bound(text, "%")
+    intent.min_length_km, intent.max_length_km = _bound(text, r"km\b(?! of)")
+    intent.min_gain_m, _ = _bound(text, r"m\b")
+    return intent
+
+
+class ClimbPipeline:
+    """Deterministic fast path for climb questions.
+
+    Runs the fixed workflow from the system prompt without LLM planning:
+    article search, then every scrape and extraction concurrently, then
+    filtering, and a single model call to write the answer. `stream` reports
+    each page as soon as it is extracted; `run` returns only the answer. Both
+    signal a fallback to the agent when the turn is not a clear climb lookup
+    or nothing usable was found.
+    """
+
+    def __init__(
+        self,
+        model_factory: Callable[[], Any],
+        search_tool: Any = find_cycling_climb_articles,
+        extract_tool: Any = scrape_and_extract_climb_stats,
+        max_workers: int = 3,
+        max_climbs: int = 15,
+    ):
+        self.model_factory = model_factory
+        self.search_tool = search_tool
+        self.extract_tool = extract_tool
+        self.max_workers = max_workers
+        self.max_climbs = max_climbs
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self.model_factory()
+        return self._model
+
+    def _extract(self, url: str, config: Optional[Dict] = None) -> List[Dict]:
+        try:
+            result = self.extract_tool.invoke({"url": url}, config=config)
+        except Exception as e:
+            logger.warning("Climb extraction failed for %s: %s", url, e)
+            return []
+        return [c for c in result if isinstance(c, dict) and c.get("name")]
+
+    def _merge(self, urls: List[str], per_url: Dict[str, List[Dict]]) -> List[Dict]:
+        """One record per real climb across pages, in search order so the result does not depend on timing."""
+        return merge_climbs((url, per_url.get(url, [])) for url in urls)[: self.max_climbs]
+
+    def stream(
+        self,
+        text: str,
+        chat_history: Optional[List[Tuple[str, str]]] = None,
+        config: Optional[Dict] = None,
+    ) -> Iterator[PipelineEvent]:
+        """Run the pipeline, yielding an event as each stage and each page finishes.
+
+        Events are "sources" once the search returns, "page" per extracted URL
+        in completion order (with how many are still pending), then either
+        "answer" with the final LLM answer or "fallback" if the agent should
+        handle the turn instead. `config` (e.g. callbacks) is passed to every
+        tool and model call, as the agent would.
+        """
+        intent = detect_climb_intent(text)
+        if intent is None:
+            yield PipelineEvent("fallback")
+            return
+
+        results = self.search_tool.invoke(
+            {"location": intent.location, "radius_km": intent.radius_km}, config=config
+        )
+        urls = [u for u in results if isinstance(u, str) and u.startswith("http")]
+        if not urls:
+            yield PipelineEvent("fallback")
+            return
+        yield PipelineEvent("sources", sources=urls, pending=len(urls))
+
+        per_url: Dict[str, List[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+            futures = {pool.submit(bind_deadline(self._extract), url, config): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                per_url[url] = [c for c in future.result() if intent.accepts(c)]
+                yield PipelineEvent("page", url=url, climbs=per_url[url], pending=len(urls) - len(per_url))
+
+        climbs = self._merge(urls, per_url)
+        if not climbs:
+            logger.info("Climb fast path found nothing for %r; falling back to the agent", intent.location)
+            yield PipelineEvent("fallback", sources=urls)
+            return
+
+        # Refer to sources by their number in the prompt's source list
+        numbered = {url: i for i, url in enumerate(urls, 1)}
+        rows = [{**c, "sources": [numbered[u] for u in c["sources"]]} for c in climbs]
+        table = "\n".join(to_table(drop_nulls(rows)))
+        messages = [("system", advanced_agent_system_prompt()), *(chat_history or [])]
+        messages.append(("human", climb_answer_prompt(text, table, urls)))
+        response = self.model.invoke(messages, config=config)
+        output = getattr(response, "content", str(response))
+        yield PipelineEvent("answer", climbs=climbs, sources=urls, output=output)
+
+    def run(
+        self,
+        text: str,
+        chat_history: Optional[List[Tuple[str, str]]] = None,
+        config: Optional[Dict] = None,
+    ) -> Optional[Dict]:
+        """The final answer as {"output", "climbs", "sources"}, or None to use the agent."""
+        for event in self.stream(text, chat_history, config):
+            if event.kind == "answer":
+                return {"output": event.output, "climbs": event.climbs, "sources": event.sources}
+        return None
@@ -1,27 +1,27 @@
 import os
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.text import Text
 from prompt_toolkit import prompt
 from prompt_toolkit.history import InMemoryHistory
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-
-from ..models.azure_openai_models import get_azure_openai_model
-from ..tools.tools import (
-    find_bike_rentals,
-    get_weather_now,
-    get_weather_forecast,
-    UserStravaRoutesTool,
-    find_cycling_climb_articles,
-    scrape_and_extract_climb_stats,
-)
+
+# LangChain, the model clients and the tools are imported where they are first
+# used, so the welcome panel and prompt appear before they finish loading
+from ..models.router import ModelRouter
+from ..models.registry import get_registry
+from ..utils.deadline import deadline_scope
+from ..utils.env import load_env
+from ..utils.profiling import phase, profile_turn, profiling_requested
+from .tool_selection import ToolSelector, ToolSubsetAgent
 from ..prompts.system_prompt import advanced_agent_system_prompt
 
-load_dotenv()
+load_env()
 
 
 class ConversationalCyclingAgent:
@@ -30,26 +30,181 @@ class ConversationalCyclingAgent:
     an interactive command-line interface for cycling-related queries.
     """
 
-    def __init__(self, model_provider: str = "azure_openai"):
+    def __init__(self, model_provider: str = "azure_openai", background: bool = False):
         """
         Initialize the conversational cycling agent.
 
         Args:
             model_provider: The model provider to use ("azure_openai", "anthropic", etc.)
+            background: Build the model and agent in a background thread; call
+                wait_ready() before using them
         """
         self.console = Console()
         self.model_provider = model_provider
         self.history = InMemoryHistory()
         self.conversation_history = []
+        # Set by /profile; PROFILE_TURNS=1 profiles every turn
+        self.profile_next_turn = False
+        # Per-turn time budget; tools degrade and the agent answers early when it runs out
+        deadline = os.getenv("TURN_DEADLINE_S", "60")
+        self.turn_deadline_s = float(deadline) if deadline else None
+        self.answer_reserve_s = float(os.getenv("TURN_ANSWER_RESERVE_S", "5"))
+
+        # Models, tools and compiled agents are shared by every session in the
+        # process, so a new session only looks them up
+        self.registry = get_registry()
+        self.router = None
+        self.model = None
+        self.agent = None
+        self.climb_pipeline = None
+        # Climbs extracted in this session, for query_climbs; never shared with other sessions
+        self.climb_catalog = None
+        if model_provider == "router":
+            # Pick a backend per turn: local Ollama for quick turns, Azure for planning
+            self.router = self.registry.get(("router",), self._create_router)
+
+        # Building the model and agent imports LangChain and the tools, which
+        # the CLI does while the user types their first question
+        self._ready: Optional[Future] = None
+        if background:
+            self._ready = Future()
+            threading.Thread(target=self._build_in_background, name="agent-startup", daemon=True).start()
+        else:
+            self._build()
+
+    def _build(self) -> None:
+        from ..utils.climb_query import ClimbCatalog
+
+        self.climb_catalog = ClimbCatalog()
+        if self.router is None:
+            self.model = self._get_model(self.model_provider)
+            self.agent = self._get_agent(self.model_provider)
+
+        # Plain climb lookups skip LLM planning and run as a fixed pipeline
+        if os.getenv("CLIMB_FAST_PATH", "1") == "1":
+            provider = "azure_openai" if self.router else self.model_provider
+            self.climb_pipeline = self.registry.get(
+                ("climb_pipeline", provider),
+                lambda: self._create_climb_pipeline(provider),
+            )
 
-        # Initialize tools
-        self.user_strava_routes_tool = UserStravaRoutesTool(max_routes=5)
+    def _build_in_background(self) -> None:
+        try:
+            self._build()
+        except BaseException as e:
+            self._ready.set_exception(e)
+        else:
+            self._ready.set_result(None)
 
-        # Initialize model and agent
-        self.model = self._get_model(model_provider)
-        self.agent = self._create_agent()
+    def wait_ready(self) -> None:
+        """Wait for a background build to finish, re-raising anything it raised."""
+        if self._ready is None:
+            return
+        if not self._ready.done():
+            with self.console.status("[bold green]Loading the model...", spinner="dots"):
+                self._ready.result()
+        self._ready.result()
+        self._ready = None
+
+    @staticmethod
+    def _model_name(provider: str) -> str:
+        if provider == "ollama":
+            return os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+        return os.getenv("MODEL", "gpt-4o-mini")
 
     def _get_model(self, provider: str):
+        """The shared model client for a provider, created on first use."""
+        return self.registry.get(
+            ("model", provider, self._model_name(provider)), lambda: self._create_model(provider)
+        )
+
+    def _get_agent(self, provider: str):
+        """The shared agent for a provider, compiled on first use.
+
+        With TOOL_SELECTION on (the default) this is a ToolSubsetAgent that
+        binds only the tools each turn needs, with one compiled executor per
+        tool subset.
+        """
+        if os.getenv("TOOL_SELECTION", "1") != "1":
+            return self._get_executor(provider)
+        return self.registry.get(
+            ("tool_subset_agent", provider, self._model_name(provider), self.answer_reserve_s),
+            lambda: ToolSubsetAgent(
+                self._create_tool_selector(provider), lambda names: self._get_executor(provider, names)
+            ),
+        )
+
+    def _get_executor(self, provider: str, tool_names: Optional[Tuple[str, ...]] = None):
+        """The shared agent executor for a provider and tool subset (None for all tools)."""
+        return self.registry.get(
+            ("agent", provider, self._model_name(provider), self.answer_reserve_s, tool_names),
+            lambda: self._create_agent(self._get_model(provider), tool_names),
+        )
+
+    def _create_climb_pipeline(self, provider: str):
+        from .climb_pipeline import ClimbPipeline
+
+        return ClimbPipeline(model_factory=lambda: self._get_model(provider))
+
+    def _create_tool_selector(self, provider: str) -> ToolSelector:
+        from ..tools.tools import embed_texts
+
+        names = [t.name for t in self.registry.get(("tools",), self._create_tools)]
+        # Embeddings come from the local Ollama server, so only use them where it is expected to run
+        default = "1" if provider in ("ollama", "router") else "0"
+        embed = embed_texts if os.getenv("TOOL_SELECTION_EMBED", default) == "1" else None
+        return ToolSelector(names, embed=embed)
+
+    def _create_router(self) -> ModelRouter:
+        return ModelRouter(
+            backends={
+                "local": lambda: self._get_agent("ollama"),
+                "azure": lambda: self._get_agent("azure_openai"),
+            },
+            timeout_s=float(os.getenv("ROUTER_TIMEOUT_S", "60")),
+            slow_threshold_s=float(os.getenv("ROUTER_SLOW_THRESHOLD_S", "20")),
+        )
+
+    def _create_tools(self) -> List:
+        """Tool instances and their compact wrappers (schemas are compiled here, once)."""
+        from ..tools.result_encoding import compact_tools
+        from ..tools.tools import (
+            find_bike_rentals,
+            get_weather_now,
+            get_weather_forecast,
+            get_weather_bulk,
+            plan_ride_windows,
+            UserStravaRoutesTool,
+            StravaClimbsTool,
+            RoutesNearTool,
+            ElevationProfileTool,
+            find_cycling_climb_articles,
+            scrape_and_extract_climb_stats,
+            search_stored_articles,
+            query_climbs,
+            ARTICLE_STORE_DIR,
+        )
+
+        tools = [
+            find_bike_rentals,
+            get_weather_now,
+            get_weather_forecast,
+            get_weather_bulk,
+            plan_ride_windows,
+            find_cycling_climb_articles,
+            scrape_and_extract_climb_stats,
+            query_climbs,
+            UserStravaRoutesTool(max_routes=5),
+            StravaClimbsTool(max_items=5),
+            RoutesNearTool(),
+            ElevationProfileTool(),
+        ]
+        if ARTICLE_STORE_DIR:
+            tools.insert(tools.index(find_cycling_climb_articles), search_stored_articles)
+        # Encode tool results compactly so every follow-up LLM step reads fewer tokens
+        return compact_tools(tools)
+
+    def _create_model(self, provider: str):
         """
         Factory method to get different model providers.
 
@@ -60,7 +215,9 @@ class ConversationalCyclingAgent:
             The initialized model instance
         """
         if provider == "azure_openai":
-            return get_azure_openai_model(os.getenv("MODEL", "gpt-4o-mini"))
+            from ..models.azure_openai_models import get_azure_openai_model
+
+            return get_azure_openai_model(self._model_name(provider))
         elif provider == "anthropic":
             # Future implementation
             try:
@@ -82,8 +239,7 @@ class ConversationalCyclingAgent:
                 from ..models.open_source_models import get_ollama_model
 
                 # Use a function-calling compatible model by default
-                model_name = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-                return get_ollama_model(model_name, chat=True)
+                return get_ollama_model(self._model_name(provider), chat=True)
             except ImportError:
                 raise ImportError(
                     "Install langchain-ollama to use Ollama models: pip install langchain-ollama"
@@ -92,21 +248,26 @@ class ConversationalCyclingAgent:
         else:
             raise ValueError(f"Unsupported model provider: {provider}")
 
-    def _create_agent(self):
+    def _create_agent(self, model=None, tool_names: Optional[Tuple[str, ...]] = None):
         """
         Create the agent using the new LangChain API.
 
+        Args:
+            model: The model to bind the tools to. Defaults to self.model
+            tool_names: The tools to bind. Defaults to all of them
+
         Returns:
             The initialized agent executor
         """
-        tools = [
-            find_bike_rentals,
-            get_weather_now,
-            get_weather_forecast,
-            find_cycling_climb_articles,
-            scrape_and_extract_climb_stats,
-            self.user_strava_routes_tool,
-        ]
+        from langchain.agents import create_tool_calling_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+        from .deadline_executor import create_deadline_agent_executor
+
+        model = model or self.model
+        tools = self.registry.get(("tools",), self._create_tools)
+        if tool_names is not None:
+            tools = [t for t in tools if t.name in tool_names]
 
         # Create a simpler prompt template for tool calling agents
         prompt = ChatPromptTemplate.from_messages(
@@ -119,11 +280,17 @@ class ConversationalCyclingAgent:
         )
 
         # Create the tool calling agent (works better with OpenAI models)
-        agent = create_tool_calling_agent(self.model, tools, prompt)
-
-        # Create and return the agent executor
-        return AgentExecutor(
-            agent=agent, tools=tools, verbose=True, handle_parsing_errors=True
+        agent = create_tool_calling_agent(model, tools, prompt)
+
+        # Create and return the agent executor; it stops at the turn deadline and
+        # answers from the tool results gathered so far
+        return create_deadline_agent_executor(
+            model,
+            agent,
+            tools,
+            answer_reserve_s=self.answer_reserve_s,
+            verbose=True,
+            handle_parsing_errors=True,
         )
 
     def _extract_response_content(self, response: Any) -> str:
@@ -167,6 +334,9 @@ class ConversationalCyclingAgent:
         welcome_text.append("  /help    - Show this help message\n", style="dim")
         welcome_text.append("  /clear   - Clear conversation history\n", style="dim")
         welcome_text.append("  /history - Show conversation history\n", style="dim")
+        welcome_text.append("  /profile - Profile the next question\n", style="dim")
+        if self.router:
+            welcome_text.append("  /router  - Show model routing stats\n", style="dim")
         welcome_text.append("  /quit    - Exit the application\n", style="dim")
         welcome_text.append("  /exit    - Exit the application\n", style="dim")
         welcome_text.append(
@@ -204,6 +374,15 @@ class ConversationalCyclingAgent:
             self.show_conversation_history()
             return True
 
+        elif command == "router" and self.router:
+            self.show_router_stats()
+            return True
+
+        elif command == "profile":
+            self.profile_next_turn = True
+            self.console.print("[yellow]⏱️  The next question will be profiled.[/yellow]")
+            return True
+
         elif command in ["quit", "exit", "q"]:
             self.console.print(
                 "[cyan]👋 Thanks for using Cycling Assistant! Happy cycling![/cyan]"
@@ -232,6 +411,20 @@ class ConversationalCyclingAgent:
                 self.console.print(f"[green]{i}. Assistant:[/green] {content}")
         self.console.print()
 
+    def show_router_stats(self):
+        """Display how turns were routed between backends and the latency saved."""
+        stats = self.router.stats()
+        self.console.print("\n[bold]Model Routing:[/bold]")
+        for name, entry in stats["backends"].items():
+            self.console.print(
+                f"[cyan]{name}:[/cyan] {entry['turns']} turns, "
+                f"mean {entry['mean_latency_s']:.2f}s"
+            )
+        self.console.print(f"[dim]Fallbacks: {stats['fallbacks']}[/dim]")
+        self.console.print(
+            f"[green]Estimated latency saved: {stats['estimated_latency_saved_s']:.1f}s[/green]\n"
+        )
+
     def add_to_history(self, role: str, content: str):
         """
         Add a message to the conversation history.
@@ -282,6 +475,9 @@ class ConversationalCyclingAgent:
             The agent's response or None if there was an error
         """
         try:
+            self.wait_ready()
+            from ..utils.climb_query import catalog_scope
+
             # Convert conversation history to chat_history format
             chat_history = []
             for msg in self.conversation_history:
@@ -293,10 +489,14 @@ class ConversationalCyclingAgent:
                     chat_history.append(("ai", content))
 
             # Show thinking indicator
-            with self.console.status("[bold green]🤔 Thinking...", spinner="dots"):
-                response = self.agent.invoke(
-                    {"input": user_input, "chat_history": chat_history}
-                )
+            inputs = {"input": user_input, "chat_history": chat_history}
+            with deadline_scope(self.turn_deadline_s), catalog_scope(self.climb_catalog):
+                with self.console.status("[bold green]🤔 Thinking...", spinner="dots") as status:
+                    response = self._run_climb_fast_path(user_input, chat_history, status)
+                    if response is None and self.router:
+                        response = self.router.invoke(user_input, inputs)
+                    elif response is None:
+                        response = self.agent.invoke(inputs)
 
             # Extract response content from the new response format
             agent_response = response.get("output", str(response))
@@ -311,6 +511,62 @@ class ConversationalCyclingAgent:
             )
             return None
 
+    def _run_climb_fast_path(
+        self,
+        user_input: str,
+        chat_history: List,
+        status: Optional[Any] = None,
+        config: Optional[Dict] = None,
+    ) -> Optional[Dict]:
+        """Answer a plain climb lookup through the pipeline, or None to use the agent.
+
+        With a console status, climbs are printed page by page as they are extracted.
+        `config` is passed to the pipeline's tool and model calls (e.g. trace callbacks).
+        """
+        if self.climb_pipeline is None:
+            return None
+        try:
+            for event in self.climb_pipeline.stream(user_input, chat_history, config):
+                if event.kind == "answer":
+                    return {"output": event.output, "climbs": event.climbs, "sources": event.sources}
+                if status is not None:
+                    self._show_climb_progress(event, status)
+        except Exception as e:
+            self.console.print(f"[dim]Climb fast path failed ({e}); using the agent[/dim]")
+        return None
+
+    @staticmethod
+    def _climb_stats(climb: Dict) -> str:
+        parts = []
+        if climb.get("distance_km") is not None:
+            parts.append(f"{climb['distance_km']} km")
+        if climb.get("average_gradient") is not None:
+            parts.append(f"{climb['average_gradient']}%")
+        if climb.get("elevation_gain_m") is not None:
+            parts.append(f"+{climb['elevation_gain_m']} m")
+        return ", ".join(parts)
+
+    def _show_climb_progress(self, event: Any, status: Any):
+        """Print the climbs from each finished page while the rest are still being read."""
+        with phase("render"):
+            self._print_climb_progress(event, status)
+
+    def _print_climb_progress(self, event: Any, status: Any):
+        if event.kind == "sources":
+            status.update(f"[bold green]📖 Reading {len(event.sources)} climb articles...")
+        elif event.kind == "page":
+            site = urlparse(event.url).netloc or event.url
+            if event.climbs:
+                self.console.print(f"[cyan]✓ {site}[/cyan] [dim]({len(event.climbs)} climbs)[/dim]")
+                for climb in event.climbs:
+                    self.console.print(f"   • {climb['name']} [dim]{self._climb_stats(climb)}[/dim]")
+            else:
+                self.console.print(f"[dim]✗ {site}: no matching climbs[/dim]")
+            if event.pending:
+                status.update(f"[bold green]📖 {event.pending} more article(s) pending...")
+            else:
+                status.update("[bold green]✍️  Writing the answer...")
+
     def display_response(self, response: str):
         """
         Display the agent's response with nice formatting.
@@ -318,14 +574,29 @@ class ConversationalCyclingAgent:
         Args:
             response: The response string to display
         """
-        response_text = Text(response)
-        response_panel = Panel(
-            response_text,
-            title="🤖 Cycling Assistant",
-            border_style="green",
-            padding=(1, 2),
-        )
-        self.console.print(response_panel)
+        with phase("render"):
+            response_text = Text(response)
+            response_panel = Panel(
+                response_text,
+                title="🤖 Cycling Assistant",
+                border_style="green",
+                padding=(1, 2),
+            )
+            self.console.print(response_panel)
+
+    def show_profile(self, profile: Any):
+        """Display where the time of a profiled turn went."""
+        table = Table(title=f"⏱️  Turn profile ({profile.wall_s:.2f}s wall)", title_justify="left")
+        table.add_column("Phase")
+        table.add_column("Calls", justify="right")
+        table.add_column("Seconds", justify="right")
+        table.add_column("Share", justify="right")
+        for row in profile.summary():
+            table.add_row(row["phase"], str(row["calls"]), f"{row['seconds']:.3f}", f"{row['share']:.0%}")
+        self.console.print(table)
+        self.console.print("[dim]Phases nest: a tool's time includes the parsing and LLM calls it makes.[/dim]")
+        if profile.stacks_path:
+            self.console.print(f"[dim]Stack samples for flame graphs: {profile.stacks_path}[/dim]")
 
     def run(self):
         """Main conversation loop."""
@@ -357,16 +628,24 @@ class ConversationalCyclingAgent:
                         break
                     continue
 
-                # Process the user input through the agent
-                response = self.process_user_input(user_input)
+                # The model may still be loading from startup; failing to build it ends the session
+                self.wait_ready()
+
+                # Process the user input through the agent, profiling the turn if asked to
+                profiled = self.profile_next_turn or profiling_requested()
+                self.profile_next_turn = False
+                with profile_turn(profiled) as profile:
+                    response = self.process_user_input(user_input)
 
-                if response:
-                    # Add to conversation history
-                    self.add_to_history("user", user_input)
-                    self.add_to_history("assistant", response)
+                    if response:
+                        # Add to conversation history
+                        self.add_to_history("user", user_input)
+                        self.add_to_history("assistant", response)
 
-                    # Display the response
-                    self.display_response(response)
+                        # Display the response
+                        self.display_response(response)
+                if profile is not None:
+                    self.show_profile(profile)
 
         except KeyboardInterrupt:
             self.console.print("\n[cyan]👋 Interrupted. Goodbye![/cyan]")
@@ -378,12 +657,15 @@ def main():
     model_provider = os.getenv("MODEL_PROVIDER", "azure_openai")
 
     try:
-        agent = ConversationalCyclingAgent(model_provider=model_provider)
+        agent = ConversationalCyclingAgent(model_provider=model_provider, background=True)
         agent.run()
     except Exception as e:
         console = Console()
         console.print(f"[red]Failed to initialize agent: {e}[/red]")
         console.print("[dim]Please check your configuration and try again.[/dim]")
+    finally:
+        # Release shared model clients and their connection pools
+        get_registry().close()
 
 
 if __name__ == "__main__":
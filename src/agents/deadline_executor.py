@@ -0,0 +1,92 @@
+import logging
+from typing import Any, List, Optional, Tuple
+
+from langchain.agents import AgentExecutor
+from langchain.agents.agent import RunnableMultiActionAgent
+from langchain_core.agents import AgentAction, AgentFinish
+
+from ..utils.deadline import remaining_time
+
+logger = logging.getLogger(__name__)
+
+_ANSWER_NOW_PROMPT = (
+    "You are a cycling assistant. The time budget for this turn has run out, so no more "
+    "tools can be called. Answer the user's question now using only the tool results "
+    "below, and say briefly what you could not check."
+)
+
+
+def summarize_steps(intermediate_steps: List[Tuple[AgentAction, Any]], max_chars: int = 600) -> str:
+    """One line per tool call with its (trimmed) result."""
+    lines = []
+    for action, observation in intermediate_steps:
+        text = str(observation).replace("\n", " ")
+        if len(text) > max_chars:
+            text = text[:max_chars] + "..."
+        lines.append(f"- {action.tool}({action.tool_input}): {text}")
+    return "\n".join(lines) or "- (no tool results yet)"
+
+
+class AnswerOnStopAgent(RunnableMultiActionAgent):
+    """Tool-calling agent that writes a real answer when stopped early.
+
+    LangChain's tool-calling agents only support the "force" stopping method,
+    which replies with a canned message. With "generate", this agent makes one
+    more call to the plain model (no tools) over the results gathered so far.
+    """
+
+    answer_model: Optional[Any] = None
+
+    def return_stopped_response(
+        self,
+        early_stopping_method: str,
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        **kwargs: Any,
+    ) -> AgentFinish:
+        if early_stopping_method != "generate" or self.answer_model is None:
+            return super().return_stopped_response("force", intermediate_steps, **kwargs)
+
+        notes = summarize_steps(intermediate_steps)
+        question = kwargs.get("input", "")
+        try:
+            message = self.answer_model.invoke(
+                [
+                    ("system", _ANSWER_NOW_PROMPT),
+                    ("human", f"{question}\n\nTool results so far:\n{notes}"),
+                ]
+            )
+            output = getattr(message, "content", str(message))
+        except Exception as e:
+            logger.warning("Final answer after early stop failed: %s", e)
+            output = f"I ran out of time before finishing. Here is what I found so far:\n{notes}"
+        return AgentFinish({"output": output}, "")
+
+
+class DeadlineAgentExecutor(AgentExecutor):
+    """AgentExecutor that stops taking steps when the turn deadline is near.
+
+    `answer_reserve_s` is kept back from the deadline for the final answer.
+    """
+
+    answer_reserve_s: float = 5.0
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        remaining = remaining_time()
+        if remaining is not None and remaining <= self.answer_reserve_s:
+            logger.info("Turn deadline near (%.1fs left), answering with what we have", remaining)
+            return False
+        return super()._should_continue(iterations, time_elapsed)
+
+
+def create_deadline_agent_executor(
+    model: Any, agent_runnable: Any, tools: List[Any], answer_reserve_s: float = 5.0, **kwargs: Any
+) -> DeadlineAgentExecutor:
+    """Wrap a tool-calling agent runnable so it answers from partial results at the deadline."""
+    agent = AnswerOnStopAgent(runnable=agent_runnable, answer_model=model)
+    return DeadlineAgentExecutor(
+        agent=agent,
+        tools=tools,
+        early_stopping_method="generate",
+        answer_reserve_s=answer_reserve_s,
+        **kwargs,
+    )
@@ -0,0 +1,155 @@
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Which tools serve which kind of request; a tool may serve several
+INTENT_TOOLS: Dict[str, Tuple[str, ...]] = {
+    "weather": ("get_weather_now", "get_weather_forecast", "get_weather_bulk", "plan_ride_windows"),
+    "rentals": ("find_bike_rentals",),
+    "climbs": (
+        "search_stored_articles",
+        "find_cycling_climb_articles",
+        "scrape_and_extract_climb_stats",
+        "query_climbs",
+        "elevation_profile",
+    ),
+    "routes": ("user_strava_routes", "strava_climbs", "user_routes_near", "elevation_profile"),
+}
+
+INTENT_KEYWORDS: Dict[str, re.Pattern] = {
+    "weather": re.compile(
+        r"\b(weather|forecast|rain\w*|wind\w*|temperature|sun(ny)?|snow|storm|cold|hot|heat|"
+        r"today|tonight|tomorrow|weekend|when (should|can|is)|best (time|day)|conditions)\b",
+        re.IGNORECASE,
+    ),
+    "rentals": re.compile(r"\b(rent\w*|hire|bike shops?|shops?|repairs?|buy a bike|mechanic)\b", re.IGNORECASE),
+    "climbs": re.compile(
+        r"\b(climbs?|climbing|cols?|ascents?|hills?|gradients?|elevation|mountains?|pass(es)?|steep\w*|"
+        r"summit|kom|hairpins?)\b",
+        re.IGNORECASE,
+    ),
+    "routes": re.compile(
+        r"\b(strava|my (routes?|rides?|activities|segments?)|routes? (near|through|past)|segments?)\b",
+        re.IGNORECASE,
+    ),
+}
+
+# Example requests per intent, compared with the turn when no keyword matches
+INTENT_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    "weather": (
+        "Will it be dry enough to ride on Saturday?",
+        "Is it going to be windy on the coast this afternoon?",
+        "Which day this week is best for a long ride?",
+    ),
+    "rentals": (
+        "Where can I get a road bike for a few days?",
+        "I need to borrow an e-bike when I arrive in Mallorca",
+    ),
+    "climbs": (
+        "What are the hardest ascents around Girona?",
+        "Which roads go uphill for more than 10 km near Annecy?",
+        "How long is the road up Mont Ventoux?",
+    ),
+    "routes": (
+        "Which of my saved rides go past the lake?",
+        "Show the rides I planned on Strava",
+    ),
+}
+
+
+class ToolSelector:
+    """Picks the tools a turn is likely to need, so the model sees fewer schemas.
+
+    Keyword patterns decide first. When none match, the turn is compared
+    with example requests per intent using `embed` (if given), and intents
+    within `margin` of the best score above `threshold` are chosen. When
+    still nothing matches, every tool is offered, so an unusual request
+    never loses a tool it needs.
+    """
+
+    def __init__(
+        self,
+        tool_names: Sequence[str],
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+        threshold: float = 0.5,
+        margin: float = 0.05,
+    ):
+        self.tool_names = list(tool_names)
+        self.embed = embed
+        self.threshold = threshold
+        self.margin = margin
+        self._examples: Optional[Tuple[List[str], np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def _example_vectors(self) -> Tuple[List[str], np.ndarray]:
+        with self._lock:
+            if self._examples is None:
+                intents = [i for i, examples in INTENT_EXAMPLES.items() for _ in examples]
+                texts = [e for examples in INTENT_EXAMPLES.values() for e in examples]
+                self._examples = (intents, _unit(self.embed(texts)))
+            return self._examples
+
+    def _embedding_intents(self, text: str) -> List[str]:
+        try:
+            intents, vectors = self._example_vectors()
+            scores = vectors @ _unit(self.embed([text]))[0]
+        except Exception as e:
+            # Without the embedding model, keyword matching alone still works
+            logger.warning("Tool selection embeddings unavailable (%s); using keywords only", e)
+            self.embed = None
+            return []
+        best: Dict[str, float] = {}
+        for intent, score in zip(intents, scores):
+            best[intent] = max(best.get(intent, -1.0), float(score))
+        top = max(best.values())
+        if top < self.threshold:
+            return []
+        return [intent for intent, score in best.items() if score >= top - self.margin]
+
+    def intents(self, text: str) -> List[str]:
+        """The intents a turn expresses; empty when unsure."""
+        found = [intent for intent, pattern in INTENT_KEYWORDS.items() if pattern.search(text)]
+        if not found and self.embed is not None:
+            found = self._embedding_intents(text)
+        return found
+
+    def select(self, text: str) -> Tuple[str, ...]:
+        """Names of the tools to offer for this turn, in their original order."""
+        wanted = {name for intent in self.intents(text) for name in INTENT_TOOLS[intent]}
+        chosen = tuple(name for name in self.tool_names if name in wanted)
+        return chosen or tuple(self.tool_names)
+
+
+def _unit(vectors: Any) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class ToolSubsetAgent:
+    """Agent that binds only the tools a turn needs.
+
+    `build(tool_names)` returns an agent executor bound to those tools; it is
+    expected to cache per subset (the registry does), so each subset's tool
+    schemas are compiled once and reused by every later turn that needs the
+    same tools.
+    """
+
+    def __init__(self, selector: ToolSelector, build: Callable[[Tuple[str, ...]], Any]):
+        self.selector = selector
+        self.build = build
+
+    def executor_for(self, text: str) -> Any:
+        names = self.selector.select(text)
+        logger.info("Offering %d tool(s) for this turn: %s", len(names), ", ".join(names))
+        return self.build(names)
+
+    def invoke(self, inputs: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        return self.executor_for(inputs["input"]).invoke(inputs, *args, **kwargs)
+
+    async def ainvoke(self, inputs: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        return await self.executor_for(inputs["input"]).ainvoke(inputs, *args, **kwargs)
@@ -1,3 +1,10 @@
-from .azure_openai_models import get_azure_openai_model
-
 __all__ = ["get_azure_openai_model"]
+
+
+def __getattr__(name):
+    # Resolved on first use, so importing src.models.<anything> stays cheap
+    if name == "get_azure_openai_model":
+        from .azure_openai_models import get_azure_openai_model
+
+        return get_azure_openai_model
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
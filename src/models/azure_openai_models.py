@@ -1,12 +1,18 @@
 import os
-from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
+from typing import TYPE_CHECKING
 
-load_dotenv()
+if TYPE_CHECKING:
+    from langchain_openai import AzureChatOpenAI
 
 
-def get_azure_openai_model(model_name: str) -> AzureChatOpenAI:
-    """Returns an AzureChatOpenAI model instance based on the model name."""
+def get_azure_openai_model(model_name: str) -> "AzureChatOpenAI":
+    """Returns an AzureChatOpenAI model instance based on the model name.
+
+    Settings are read from the environment when called; the entry points load `.env`.
+    """
+    # langchain_openai takes about a second to import; only pay for it when Azure is used
+    from langchain_openai import AzureChatOpenAI
+
     api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
 
     return AzureChatOpenAI(
@@ -0,0 +1,239 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import httpx
+
+if TYPE_CHECKING:
+    from .open_source_models import BalancedChatOllama
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "http://localhost:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+# Long enough for a cold model load plus a long answer on CPU
+DEFAULT_TIMEOUT_S = 300.0
+
+# Errors that say the host itself is unreachable, as opposed to a bad request
+_HOST_ERRORS = (ConnectionError, httpx.TransportError)
+
+
+class OllamaHost:
+    """One Ollama server: its shared client, in-flight request count and health."""
+
+    def __init__(self, url: str, timeout_s: Optional[float] = None):
+        # The ollama client library is only imported once a host is actually used
+        import ollama
+
+        self.url = url.rstrip("/")
+        self.timeout_s = timeout_s
+        self.client = ollama.Client(host=self.url, timeout=timeout_s)
+        self.outstanding = 0
+        self.healthy = True
+        self.checked_at = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.resident: List[str] = []
+
+    def __repr__(self) -> str:
+        state = "up" if self.healthy else "down"
+        return f"OllamaHost({self.url}, {state}, outstanding={self.outstanding})"
+
+
+class OllamaModelManager:
+    """Spreads Ollama requests over one or more hosts and keeps models loaded.
+
+    Each host gets a single shared client. Requests go to the healthy host
+    with the fewest outstanding requests. A host that refuses connections is
+    marked down and only retried after a health check (`GET /api/ps`), which
+    runs at most every `health_interval_s`. Every request carries `keep_alive`
+    so models stay resident between turns, and `preload` loads them up front.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str] = (DEFAULT_HOST,),
+        keep_alive: Union[str, float] = DEFAULT_KEEP_ALIVE,
+        health_interval_s: float = 30.0,
+        timeout_s: Optional[float] = None,
+    ):
+        if not hosts:
+            raise ValueError("At least one Ollama host is required")
+        self.hosts = [OllamaHost(url, timeout_s) for url in dict.fromkeys(h.rstrip("/") for h in hosts)]
+        self.keep_alive = keep_alive
+        self.health_interval_s = health_interval_s
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ollama")
+
+    @classmethod
+    def from_env(cls) -> "OllamaModelManager":
+        """Hosts from OLLAMA_HOSTS (comma separated) or OLLAMA_BASE_URL, keep-alive from OLLAMA_KEEP_ALIVE.
+
+        OLLAMA_TIMEOUT_S bounds every request to a host (empty for no limit).
+        """
+        hosts = os.getenv("OLLAMA_HOSTS") or os.getenv("OLLAMA_BASE_URL") or DEFAULT_HOST
+        timeout = os.getenv("OLLAMA_TIMEOUT_S", str(DEFAULT_TIMEOUT_S))
+        return cls(
+            hosts=[h.strip() for h in hosts.split(",") if h.strip()],
+            keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_KEEP_ALIVE),
+            health_interval_s=float(os.getenv("OLLAMA_HEALTH_INTERVAL_S", "30")),
+            timeout_s=float(timeout) if timeout else None,
+        )
+
+    def check_health(self, host: OllamaHost) -> bool:
+        try:
+            running = host.client.ps()
+            host.resident = [m.model for m in running.models]
+            host.healthy = True
+        except Exception as e:
+            logger.info("Ollama host %s failed its health check: %s", host.url, e)
+            host.healthy = False
+        host.checked_at = time.monotonic()
+        return host.healthy
+
+    def _pick(self, exclude: Sequence[OllamaHost] = ()) -> OllamaHost:
+        now = time.monotonic()
+        for host in self.hosts:
+            if not host.healthy and host not in exclude and now - host.checked_at >= self.health_interval_s:
+                self.check_health(host)
+
+        with self._lock:
+            candidates = [h for h in self.hosts if h.healthy and h not in exclude]
+            if not candidates:
+                raise ConnectionError(f"No healthy Ollama host among {[h.url for h in self.hosts]}")
+            # Rotate the starting point so equally loaded hosts share the work
+            start = next(self._rotation) % len(candidates)
+            rotated = candidates[start:] + candidates[:start]
+            host = min(rotated, key=lambda h: h.outstanding)
+            host.outstanding += 1
+            host.requests += 1
+            return host
+
+    def _mark_down(self, host: OllamaHost) -> None:
+        with self._lock:
+            host.healthy = False
+            host.failures += 1
+            host.checked_at = time.monotonic()
+
+    def _release(self, host: OllamaHost) -> None:
+        with self._lock:
+            host.outstanding -= 1
+
+    @contextmanager
+    def lease(self, exclude: Sequence[OllamaHost] = ()) -> Iterator[OllamaHost]:
+        """Reserve the least loaded healthy host for one request."""
+        host = self._pick(exclude)
+        try:
+            yield host
+        except _HOST_ERRORS:
+            self._mark_down(host)
+            raise
+        finally:
+            self._release(host)
+
+    def _call(self, method: str, timeout_s: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run a client method on the least loaded host, failing over while other hosts remain."""
+        kwargs.setdefault("keep_alive", self.keep_alive)
+        tried: List[OllamaHost] = []
+        while True:
+            # Raises ConnectionError once no untried healthy host is left
+            host = self._pick(exclude=tried)
+            tried.append(host)
+            call = getattr(host.client, method)
+            try:
+                if timeout_s is None:
+                    try:
+                        return call(**kwargs)
+                    finally:
+                        self._release(host)
+                # The shared client has no per-request timeout, so bound the wait instead. The
+                # host counts as busy until the request really ends, even after we stop waiting
+                future = self._pool.submit(call, **kwargs)
+                future.add_done_callback(lambda _future, host=host: self._release(host))
+                try:
+                    return future.result(timeout=timeout_s)
+                except FutureTimeout:
+                    raise TimeoutError(f"Ollama {method} on {host.url} took longer than {timeout_s:.1f}s")
+            except _HOST_ERRORS:
+                self._mark_down(host)
+                if len(tried) >= len(self.hosts):
+                    raise
+                logger.info("Ollama host %s is down; retrying on another host", host.url)
+
+    def chat(self, model: str, messages: List[Dict], timeout_s: Optional[float] = None, **kwargs: Any):
+        return self._call("chat", timeout_s=timeout_s, model=model, messages=messages, **kwargs)
+
+    def generate(self, model: str, prompt: str, timeout_s: Optional[float] = None, **kwargs: Any):
+        return self._call("generate", timeout_s=timeout_s, model=model, prompt=prompt, **kwargs)
+
+    def embed(self, model: str, input: Union[str, Sequence[str]], timeout_s: Optional[float] = None, **kwargs: Any):
+        return self._call("embed", timeout_s=timeout_s, model=model, input=input, **kwargs)
+
+    def preload(self, models: Sequence[str], wait: bool = True) -> None:
+        """Load models into memory on every healthy host (an empty generate does just that)."""
+
+        def load(host: OllamaHost, model: str) -> None:
+            try:
+                host.client.generate(model=model, keep_alive=self.keep_alive)
+                logger.info("Preloaded %s on %s", model, host.url)
+            except Exception as e:
+                logger.warning("Could not preload %s on %s: %s", model, host.url, e)
+
+        futures = [
+            self._pool.submit(load, host, model)
+            for host in self.hosts
+            if host.healthy
+            for model in models
+        ]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def chat_model(self, model: str, **kwargs: Any) -> "BalancedChatOllama":
+        """A LangChain chat model whose requests are balanced by this manager."""
+        from .open_source_models import BalancedChatOllama
+
+        kwargs.setdefault("keep_alive", self.keep_alive)
+        chat = BalancedChatOllama(model=model, base_url=self.hosts[0].url, **kwargs)
+        chat._manager = self
+        return chat
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "host": h.url,
+                    "healthy": h.healthy,
+                    "outstanding": h.outstanding,
+                    "requests": h.requests,
+                    "failures": h.failures,
+                    "resident": list(h.resident),
+                }
+                for h in self.hosts
+            ]
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+        for host in self.hosts:
+            inner = getattr(host.client, "_client", None)
+            if inner is not None:
+                inner.close()
+
+
+_default_manager: Optional[OllamaModelManager] = None
+_default_lock = threading.Lock()
+
+
+def get_model_manager() -> OllamaModelManager:
+    """The process-wide manager, configured from the environment on first use."""
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = OllamaModelManager.from_env()
+        return _default_manager
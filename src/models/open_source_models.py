@@ -1,6 +1,12 @@
+import logging
 import os
 from langchain_ollama import ChatOllama, OllamaLLM
-from typing import Optional, Union
+from pydantic import PrivateAttr
+from typing import List, Optional, Union
+
+from .ollama_manager import _HOST_ERRORS, OllamaHost, OllamaModelManager, get_model_manager
+
+logger = logging.getLogger(__name__)
 
 
 def get_ollama_model(
@@ -16,7 +22,48 @@ def get_ollama_model(
     Models like llama2:7b-chat do NOT support function calling.
     """
     if chat:
-        return ChatOllama(model=model_name, temperature=0.7, num_predict=256)
+        manager = get_model_manager()
+        # Load the model in the background so the first turn does not pay for it
+        manager.preload([model_name], wait=False)
+        return manager.chat_model(model_name, temperature=0.7, num_predict=256)
     else:
         OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         return OllamaLLM(model=model_name, temperature=0.7, base_url=OLLAMA_BASE_URL)
+
+
+class BalancedChatOllama(ChatOllama):
+    """ChatOllama that sends each sync request through an OllamaModelManager.
+
+    A request to a host that turns out to be down is retried on the next
+    healthy host, as the manager's own calls are, unless part of the reply
+    has already been streamed. Async calls keep using the client for the
+    first host.
+    """
+
+    _manager: Optional[OllamaModelManager] = PrivateAttr(default=None)
+
+    def _create_chat_stream(self, messages, stop=None, **kwargs):
+        if self._manager is None:
+            yield from super()._create_chat_stream(messages, stop, **kwargs)
+            return
+        chat_params = self._chat_params(messages, stop, **kwargs)
+        tried: List[OllamaHost] = []
+        while True:
+            attempt: Optional[OllamaHost] = None
+            streamed = False
+            try:
+                # Raises ConnectionError once no untried healthy host is left
+                with self._manager.lease(exclude=tried) as attempt:
+                    tried.append(attempt)
+                    if chat_params["stream"]:
+                        for chunk in attempt.client.chat(**chat_params):
+                            streamed = True
+                            yield chunk
+                    else:
+                        yield attempt.client.chat(**chat_params)
+                return
+            except _HOST_ERRORS:
+                # The lease has already marked the host down
+                if attempt is None or streamed or len(tried) >= len(self._manager.hosts):
+                    raise
+                logger.info("Ollama host %s is down; retrying on another host", attempt.url)
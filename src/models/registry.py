@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Registry:
+    """Process-wide home for expensive, shareable objects.
+
+    Model clients, compiled agent executors and tool lists are built once per
+    configuration key and then handed to every session. They are stateless
+    between calls (chat history is passed in per turn), so sharing them is
+    safe. Construction happens at most once per key even under concurrent
+    first use. `close` releases HTTP pools and clears the registry.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Any] = {}
+        self._factories: Dict[Hashable, Callable[[], Any]] = {}
+        self._build_times: Dict[Hashable, float] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: Hashable, factory: Callable[[], Any]) -> None:
+        """Declare how to build `key` without building it yet (see `warmup`)."""
+        with self._lock:
+            self._factories[key] = factory
+
+    def get(self, key: Hashable, factory: Optional[Callable[[], Any]] = None) -> Any:
+        """The shared object for `key`, built with `factory` (or the registered one) on first use."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            if factory is not None:
+                self._factories.setdefault(key, factory)
+            factory = self._factories.get(key)
+            if factory is None:
+                raise KeyError(f"Nothing registered for {key!r}")
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Build outside the registry lock so unrelated keys do not wait on each other
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                start = time.perf_counter()
+                entry = factory()
+                self._build_times[key] = time.perf_counter() - start
+                self._entries[key] = entry
+                logger.info("Built %r in %.3fs", key, self._build_times[key])
+        return entry
+
+    def warmup(self, keys: Optional[Iterable[Hashable]] = None) -> List[Tuple[Hashable, Exception]]:
+        """Build registered objects ahead of the first session. Returns the ones that failed."""
+        with self._lock:
+            keys = list(self._factories) if keys is None else list(keys)
+        failures = []
+        for key in keys:
+            try:
+                self.get(key)
+            except Exception as e:
+                logger.warning("Warmup of %r failed: %s", key, e)
+                failures.append((key, e))
+        return failures
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[Hashable, float]:
+        """Build time in seconds of every object built so far."""
+        with self._lock:
+            return dict(self._build_times)
+
+    def close(self) -> None:
+        """Close everything built so far and forget it; factories stay registered."""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._entries.clear()
+            self._build_times.clear()
+        for key, entry in reversed(entries):
+            try:
+                close_resource(entry)
+            except Exception as e:
+                logger.warning("Closing %r failed: %s", key, e)
+
+
+def close_resource(resource: Any) -> None:
+    """Release the HTTP pools held by a model client or anything with a close()."""
+    close = getattr(resource, "close", None)
+    if callable(close):
+        close()
+        return
+    # LangChain OpenAI chat models keep their sync openai client here
+    client = getattr(resource, "root_client", None)
+    if client is not None and callable(getattr(client, "close", None)):
+        client.close()
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    """The process-wide registry."""
+    return _registry
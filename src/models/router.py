@@ -0,0 +1,235 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SIMPLE = "simple"
+TOOL = "tool"
+COMPLEX = "complex"
+
+_SMALL_TALK = re.compile(
+    r"^\s*(hi|hello|hey|hola|thanks?|thank you|thx|cheers|ok(ay)?|great|cool|nice|bye|goodbye|"
+    r"good (morning|afternoon|evening|night)|perfect|awesome)\b[\s!.?]*$",
+    re.IGNORECASE,
+)
+_SINGLE_LOOKUP = re.compile(
+    r"\b(weather|forecast|temperature|rain|wind|rentals?|rent|bike shop|shops?|my routes?)\b",
+    re.IGNORECASE,
+)
+_MULTI_STEP = re.compile(
+    r"\b(climbs?|plan|planning|itinerary|trip|compare|comparison|versus|vs\.?|best time|"
+    r"route between|recommend|then|after that|multi[- ]day|training|which of)\b",
+    re.IGNORECASE,
+)
+
+
+def classify_turn(text: str) -> str:
+    """Cheap local classification of a user turn.
+
+    Returns:
+        str: SIMPLE for small talk, TOOL for a single factual lookup and COMPLEX
+             for anything that needs multi-step planning.
+    """
+    words = text.split()
+    if _SMALL_TALK.match(text) or (len(words) <= 3 and not _SINGLE_LOOKUP.search(text)):
+        return SIMPLE
+    if _MULTI_STEP.search(text) or len(words) > 40 or text.count("?") > 1:
+        return COMPLEX
+    if _SINGLE_LOOKUP.search(text):
+        return TOOL
+    return COMPLEX
+
+
+@dataclass
+class BackendHealth:
+    """Rolling latency, failure and concurrency state for one backend."""
+
+    ewma_latency_s: Optional[float] = None
+    consecutive_failures: int = 0
+    down_until: float = 0.0
+    in_flight: int = 0
+    # Calls that timed out but could not be cancelled and are still running
+    stalled: Set[Future] = field(default_factory=set)
+
+    def record(self, latency_s: float, ok: bool, alpha: float = 0.3) -> None:
+        if ok:
+            self.consecutive_failures = 0
+            if self.ewma_latency_s is None:
+                self.ewma_latency_s = latency_s
+            else:
+                self.ewma_latency_s = alpha * latency_s + (1 - alpha) * self.ewma_latency_s
+        else:
+            self.consecutive_failures += 1
+
+
+@dataclass
+class RoutingDecision:
+    kind: str
+    backend: str
+    latency_s: float
+    fallback_used: bool = False
+    error: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class ModelRouter:
+    """Routes each turn to a local or a remote backend and falls back when one is slow or down.
+
+    Backends are given as factories so a backend that is never chosen is never
+    built. Simple and single-lookup turns go to the local backend, multi-step
+    planning goes to the remote one.
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, Callable[[], Any]],
+        routes: Optional[Dict[str, str]] = None,
+        classifier: Callable[[str], str] = classify_turn,
+        timeout_s: float = 60.0,
+        slow_threshold_s: float = 20.0,
+        max_failures: int = 2,
+        cooldown_s: float = 60.0,
+        history_size: int = 500,
+    ):
+        self._factories = backends
+        self._instances: Dict[str, Any] = {}
+        self.routes = routes or {SIMPLE: "local", TOOL: "local", COMPLEX: "azure"}
+        self.classifier = classifier
+        self.timeout_s = timeout_s
+        self.slow_threshold_s = slow_threshold_s
+        self.max_failures = max_failures
+        self.cooldown_s = cooldown_s
+        self.health: Dict[str, BackendHealth] = {name: BackendHealth() for name in backends}
+        self.decisions: Deque[RoutingDecision] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="model-router")
+
+    def backend(self, name: str) -> Any:
+        """The backend instance, built on first use."""
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def _available(self, name: str) -> bool:
+        return self.health[name].down_until <= time.monotonic()
+
+    def candidates(self, kind: str) -> List[str]:
+        """Backends to try for a turn kind, preferred first.
+
+        Backends still running timed-out calls move behind the others, and
+        unhealthy backends move to the back.
+        """
+        preferred = self.routes.get(kind, next(iter(self._factories)))
+        order = [preferred] + [name for name in self._factories if name != preferred]
+        return sorted(order, key=lambda name: (not self._available(name), bool(self.health[name].stalled)))
+
+    def _track(self, name: str, future: Future) -> None:
+        """Count a submitted call against its backend until it finishes, even if it is abandoned."""
+
+        def finished(_: Future) -> None:
+            with self._lock:
+                health = self.health[name]
+                health.in_flight -= 1
+                health.stalled.discard(future)
+
+        with self._lock:
+            self.health[name].in_flight += 1
+        future.add_done_callback(finished)
+
+    def _abandon(self, name: str, future: Future) -> None:
+        if future.cancel():
+            return
+        with self._lock:
+            if not future.done():
+                self.health[name].stalled.add(future)
+
+    def _record(self, name: str, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            health = self.health[name]
+            health.record(latency_s, ok)
+            if not ok and health.consecutive_failures >= self.max_failures:
+                health.down_until = time.monotonic() + self.cooldown_s
+                logger.warning("Backend %s marked down for %.0fs", name, self.cooldown_s)
+            elif ok and latency_s > self.slow_threshold_s:
+                # Deprioritize a slow backend for a while, then give it another chance
+                health.down_until = time.monotonic() + self.cooldown_s
+                logger.warning("Backend %s is slow (%.1fs); deprioritized for %.0fs", name, latency_s, self.cooldown_s)
+
+    def invoke(self, text: str, inputs: Any, **kwargs: Any) -> Any:
+        """Classify the turn, call the chosen backend's invoke and fall back on errors or timeouts."""
+        kind = self.classifier(text)
+        names = self.candidates(kind)
+        last_error: Optional[BaseException] = None
+
+        for attempt, name in enumerate(names):
+            start = time.perf_counter()
+            try:
+                runnable = self.backend(name)
+                # Copy the context so context variables set by the caller are visible to the call
+                context = contextvars.copy_context()
+                future = self._pool.submit(context.run, runnable.invoke, inputs, **kwargs)
+                self._track(name, future)
+                result = future.result(timeout=self.timeout_s)
+            except FutureTimeout as e:
+                self._abandon(name, future)
+                last_error = e
+                error = f"timed out after {self.timeout_s:.0f}s"
+            except Exception as e:
+                last_error = e
+                error = str(e)
+            else:
+                latency = time.perf_counter() - start
+                self._record(name, latency, ok=True)
+                self.decisions.append(RoutingDecision(kind, name, latency, fallback_used=attempt > 0))
+                logger.info("Routed %s turn to %s (%.2fs)", kind, name, latency)
+                return result
+
+            latency = time.perf_counter() - start
+            self._record(name, latency, ok=False)
+            self.decisions.append(RoutingDecision(kind, name, latency, attempt > 0, error))
+            logger.warning("Backend %s failed for %s turn: %s", name, kind, error)
+
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        """Turns and mean latency per backend, and the estimated time saved by routing.
+
+        Savings compare each successful local turn with the remote backend's mean latency.
+        """
+        per_backend: Dict[str, Dict[str, float]] = {}
+        for d in self.decisions:
+            if d.error:
+                continue
+            entry = per_backend.setdefault(d.backend, {"turns": 0, "total_latency_s": 0.0})
+            entry["turns"] += 1
+            entry["total_latency_s"] += d.latency_s
+        for entry in per_backend.values():
+            entry["mean_latency_s"] = entry["total_latency_s"] / entry["turns"]
+
+        remote = per_backend.get(self.routes.get(COMPLEX, ""), {})
+        saved = 0.0
+        if remote:
+            saved = sum(
+                remote["mean_latency_s"] - d.latency_s
+                for d in self.decisions
+                if not d.error and d.backend != self.routes.get(COMPLEX)
+            )
+        with self._lock:
+            stalled = {name: len(health.stalled) for name, health in self.health.items() if health.stalled}
+        return {
+            "backends": per_backend,
+            "stalled_calls": stalled,
+            "fallbacks": sum(d.fallback_used for d in self.decisions),
+            "estimated_latency_saved_s": round(saved, 2),
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -32,17 +32,42 @@ RESPONSE FORMATTING:
 
 SPECIFIC GUIDELINES FOR CYCLING CLIMBS:
 When a user asks about cycling climbs:
+0. If search_stored_articles is available, try it first; when its passages already give the climbs
+   and their stats, answer from them and skip steps 1-2
 1. Use find_cycling_climb_articles to find relevant article URLs
 2. Then call scrape_and_extract_climb_stats SEPARATELY for EACH URL (one at a time)
    - Do NOT pass multiple URLs at once
    - Call the tool multiple times if you have multiple URLs
-3. Filter and present climbs that match the user's criteria
+3. Call query_climbs ONCE to filter, sort and rank the extracted climbs by the user's criteria
+   (gradient, length, elevation gain, difficulty, distance from a place) and present the rows it returns;
+   do not filter or rank the climbs yourself
 
 Always extract detailed statistics to provide accurate climb information.
 
+SPECIFIC GUIDELINES FOR RIDE TIMING:
+When a user asks when or where is best to ride, call plan_ride_windows ONCE with all the cities and days they mention.
+Do not call get_weather_forecast for each city and compare the days yourself.
+When a user compares the weather in several places, call get_weather_bulk ONCE with all of them.
+
 EXAMPLES:
 - User asks about "bike shops in Barcelona" → Use tool, then suggest what to look for
 - User asks about "best climbing routes in Alps" → Provide advice without tools
 - User follows up on previous location → Reference earlier conversation context
 
 Remember: You're having an ongoing conversation, not just answering isolated questions."""
+
+
+def climb_answer_prompt(question: str, climbs_table: str, sources: list) -> str:
+    source_lines = "\n".join(f"[{i}] {url}" for i, url in enumerate(sources, 1))
+    return f"""{question}
+
+The climbs below were already looked up and filtered for this question. Do not call any tools.
+Answer using only this data, mention the climbs that best match, and list the sources at the end.
+Each climb is merged from every article that mentions it: `sources` are numbers from the Sources
+list, and `confidence` (0-1) says how well those articles agree on its stats.
+
+Climbs:
+{climbs_table}
+
+Sources:
+{source_lines}"""
@@ -0,0 +1,95 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain.tools import BaseTool
+from pydantic import PrivateAttr
+
+from ..utils.deadline import current_deadline
+from ..utils.encoding import encode_result
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 400
+
+# Per-tool output budgets (in tokens) for what is written into the agent scratchpad
+TOOL_TOKEN_BUDGETS: Dict[str, int] = {
+    "find_bike_rentals": 300,
+    "get_weather_now": 80,
+    "get_weather_forecast": 200,
+    "get_weather_bulk": 400,
+    "plan_ride_windows": 300,
+    "find_cycling_climb_articles": 150,
+    "scrape_and_extract_climb_stats": 600,
+    "query_climbs": 350,
+    "search_stored_articles": 800,
+    "user_strava_routes": 250,
+    "strava_climbs": 500,
+    "user_routes_near": 300,
+    "elevation_profile": 400,
+}
+
+
+class CompactResultTool(BaseTool):
+    """Wraps a tool so its result reaches the LLM as compact, budgeted text.
+
+    The wrapped tool keeps its name, description and argument schema, so the
+    model sees exactly the same tool. Token savings are logged per call and
+    accumulated in `stats`.
+    """
+
+    inner: BaseTool
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+
+    _stats: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, inner: BaseTool, token_budget: Optional[int] = None, **kwargs):
+        if token_budget is None:
+            token_budget = TOOL_TOKEN_BUDGETS.get(inner.name, DEFAULT_TOKEN_BUDGET)
+        super().__init__(
+            name=inner.name,
+            description=inner.description,
+            args_schema=inner.get_input_schema(),
+            inner=inner,
+            token_budget=token_budget,
+            handle_tool_error=inner.handle_tool_error,
+            **kwargs,
+        )
+        self._stats = {"calls": 0, "raw_tokens": 0, "tokens": 0, "truncated": 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, tokens_saved=self._stats["raw_tokens"] - self._stats["tokens"])
+
+    def _run(self, *args: Any, run_manager=None, **kwargs: Any) -> str:
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired():
+            # Calls queued after the budget ran out are skipped, not started
+            return f"Skipped {self.name}: the time budget for this turn ran out. Answer with the results you have."
+        tool_input = args[0] if args and not kwargs else kwargs
+        callbacks = run_manager.get_child() if run_manager else None
+        result = self.inner.invoke(tool_input, config={"callbacks": callbacks})
+        encoded = encode_result(result, self.token_budget)
+
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["raw_tokens"] += encoded.raw_tokens
+            self._stats["tokens"] += encoded.tokens
+            self._stats["truncated"] += int(encoded.truncated)
+        logger.info(
+            "%s result: %d -> %d tokens (saved %d%s)",
+            self.name,
+            encoded.raw_tokens,
+            encoded.tokens,
+            encoded.tokens_saved,
+            ", truncated" if encoded.truncated else "",
+        )
+        return encoded.text
+
+
+def compact_tools(tools: List[BaseTool], budgets: Optional[Dict[str, int]] = None) -> List[BaseTool]:
+    """Wrap every tool with CompactResultTool, optionally overriding per-tool budgets."""
+    budgets = budgets or {}
+    return [CompactResultTool(t, token_budget=budgets.get(t.name)) for t in tools]
@@ -1,22 +1,156 @@
 import os
+import logging
 import requests
+import threading
 import time
 import json
-import ollama
-from pydantic import BaseModel, Field
-from dotenv import load_dotenv
-from typing import List, Dict
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Callable, List, Dict, Tuple
 from langchain.tools import tool, BaseTool
-from serpapi import GoogleSearch
-from bs4 import BeautifulSoup
 from typing import Optional
 from prompts.extraction_prompt import get_climb_extraction_prompt
+from ..utils.climb_detection import detect_climbs, resample_stream, smooth, streams_to_arrays
+from ..utils.route_index import RouteGeometry, RouteIndex
+from ..utils.geometry import decode_polyline
+from ..utils.dem import DEMTileStore
+from ..utils.ride_planner import RideWeights, rolling_mean, score_hours, top_windows
+from ..utils.cache import TTLCache
+from ..utils.refresh import RefreshScheduler, canonical_location
+from ..utils.singleflight import coalesce, degraded
+from ..utils.resilience import http
+from ..utils.html_text import fetch_text
+from ..utils.parse_pool import ParsePool
+from ..utils.near_duplicate import NearDuplicateIndex
+from ..utils.climb_query import SORT_COLUMNS, current_catalog
+from ..utils.vector_store import VectorStore
+from ..utils.deadline import bind_deadline, remaining_time
+from ..utils.profiling import phase
+from ..utils.env import load_env
 
 
-load_dotenv()
+load_env()
+logger = logging.getLogger(__name__)
+
+SERPAPI_HOST = "serpapi.com"
+# Below this many seconds left in the turn, tools prefer cached or partial answers
+LOW_BUDGET_S = 3.0
+# Scraping needs a fetch plus an LLM extraction; skip it or shorten the page text below these
+SCRAPE_MIN_BUDGET_S = 8.0
+SCRAPE_SHORT_BUDGET_S = 30.0
+# Never download more than this much of an article page
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# Extraction results by article text, so syndicated or mirrored copies of an
+# article (same text, different URL and boilerplate) never cost another LLM call
+_article_index = NearDuplicateIndex(
+    threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8")),
+    max_entries=int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "512")),
+)
+
+# Local retrieval over every article scraped so far; empty ARTICLE_STORE_DIR disables it
+ARTICLE_STORE_DIR = os.getenv("ARTICLE_STORE_DIR", "")
+EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+_article_store: Optional[VectorStore] = None
+_article_store_lock = threading.Lock()
+# Embedding scraped articles happens off the request path, one at a time
+_ingest_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="article-ingest")
+
+# Parse pages in worker processes so parsing never stalls other sessions; 0 parses in the calling thread
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+_parse_pool: Optional[ParsePool] = None
+_parse_pool_lock = threading.Lock()
+
+
+# Client libraries below take a noticeable part of startup; they are imported on first use
+def get_model_manager():
+    """The shared Ollama model manager."""
+    from ..models.ollama_manager import get_model_manager as manager
+
+    return manager()
+
+
+def serpapi_search(params: Dict):
+    """A SerpAPI search for `params`, run with .get_dict()."""
+    from serpapi import GoogleSearch
+
+    return GoogleSearch(params)
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    response = get_model_manager().embed(model=EMBED_MODEL, input=texts)
+    return np.asarray(response["embeddings"], dtype=np.float32)
+
+
+def get_article_store() -> Optional[VectorStore]:
+    """The shared article store, opened on first use; None when ARTICLE_STORE_DIR is not set."""
+    global _article_store
+    if not ARTICLE_STORE_DIR:
+        return None
+    with _article_store_lock:
+        if _article_store is None:
+            _article_store = VectorStore(
+                ARTICLE_STORE_DIR,
+                embed_texts,
+                ivf_min_rows=int(os.getenv("ARTICLE_STORE_IVF_MIN_ROWS", "20000")),
+                quantize=os.getenv("ARTICLE_STORE_QUANTIZE", "0") == "1",
+            )
+        return _article_store
+
+
+def get_parse_pool() -> Optional[ParsePool]:
+    """The shared HTML parse pool, started on first use; None when PARSE_WORKERS is 0."""
+    global _parse_pool
+    if PARSE_WORKERS <= 0:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParsePool(
+                workers=PARSE_WORKERS,
+                max_pending=int(os.getenv("PARSE_MAX_PENDING", "0")) or None,
+                max_tasks_per_child=int(os.getenv("PARSE_TASKS_PER_CHILD", "200")),
+            )
+        return _parse_pool
+
+
+def _ingest_article(url: str, text: str) -> None:
+    store = get_article_store()
+    if store is None or url in store:
+        return
+
+    def ingest():
+        try:
+            added = store.add_document(url, text)
+            logger.debug("Stored %d passages from %s", added, url)
+        except Exception as e:
+            logger.warning("Could not store %s for retrieval: %s", url, e)
+
+    _ingest_pool.submit(ingest)
+
+
+# SerpAPI results change slowly; caching them saves search quota for every repeat question
+_rental_cache = TTLCache(ttl_s=float(os.getenv("RENTAL_CACHE_TTL_S", str(6 * 3600))))
+_search_cache = TTLCache(ttl_s=float(os.getenv("SEARCH_CACHE_TTL_S", str(24 * 3600))))
+
+# Popular locations are refreshed shortly before their cache entries expire, so
+# nobody waits on the upstream for them; REFRESH_HOT_KEYS=0 turns this off
+_refresher: Optional[RefreshScheduler] = None
+if os.getenv("REFRESH_HOT_KEYS", "1") == "1":
+    _refresher = RefreshScheduler(
+        budget_per_hour=float(os.getenv("REFRESH_BUDGET_PER_HOUR", "120")),
+        lead_s=float(os.getenv("REFRESH_LEAD_S", "60")),
+    )
+
+
+def _track(tool_name: str, key: Tuple, cache: TTLCache, refresh: Callable[[], object]) -> None:
+    if _refresher is not None:
+        _refresher.track(tool_name, key, cache, refresh)
 
 
 @tool
+@coalesce
 def find_bike_rentals(city: str, locality: str = "") -> List[Dict]:
     """Find bike rental shops in a given location.
     Args:
@@ -27,19 +161,27 @@ def find_bike_rentals(city: str, locality: str = "") -> List[Dict]:
     """
     location = f"{city}, {locality}" if locality else city
 
-    api_key = os.getenv("SERPAPI_KEY")
-    if not api_key:
+    if not os.getenv("SERPAPI_KEY"):
         raise ValueError("Missing SERPAPI_API_KEY environment variable")
 
+    key = (canonical_location(city), canonical_location(locality))
+    _track("rentals", key, _rental_cache, lambda: _fetch_rentals(location, key))
+    cached = _rental_cache.get(key)
+    if cached is not None:
+        return [dict(shop) for shop in cached]
+    return _fetch_rentals(location, key)
+
+
+def _fetch_rentals(location: str, key: Tuple) -> List[Dict]:
     params = {
         "engine": "google_maps",
         "q": f"{location} bike rental",
         "location": location,
-        "api_key": api_key,
+        "api_key": os.getenv("SERPAPI_KEY"),
         "num": 3,
     }
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    search = serpapi_search(params)
+    results = http.call_bounded(SERPAPI_HOST, search.get_dict)
 
     local_results = results.get("local_results", [])
     if not local_results:
@@ -58,10 +200,135 @@ def find_bike_rentals(city: str, locality: str = "") -> List[Dict]:
             "website": shop.get("website"),
         }
         return_details.append(details)
-    return return_details
+    _rental_cache.set(key, return_details)
+    return [dict(shop) for shop in return_details]
+
+
+WEATHERAPI_URL = "http://api.weatherapi.com/v1"
+
+# Shared by every weather tool so a location fetched once is not refetched while fresh
+_weather_cache = TTLCache(ttl_s=float(os.getenv("WEATHER_CACHE_TTL_S", "600")))
+# None until the first bulk attempt tells us whether the API plan supports it
+_weatherapi_bulk_available: Optional[bool] = None
+
+
+def _weather_cache_key(endpoint: str, city: str, params: Dict) -> Tuple:
+    return (endpoint, canonical_location(city), params.get("days"))
+
+
+def _track_weather(endpoint: str, city: str, key: Tuple, params: Dict) -> None:
+    _track(
+        "weather",
+        key,
+        _weather_cache,
+        lambda: _fetch_weather(endpoint, city, os.getenv("WEATHERAPI_KEY"), key, params),
+    )
+
+
+def _fetch_weather(endpoint: str, city: str, api_key: str, key: Tuple, params: Dict) -> Dict:
+    response = http.get(
+        f"{WEATHERAPI_URL}/{endpoint}", params={"key": api_key, "q": city, "aqi": "no", **params}
+    )
+    data = response.json()
+    _weather_cache.set(key, data)
+    return data
+
+
+@coalesce
+def _weatherapi_get(endpoint: str, city: str, api_key: str, **params) -> Dict:
+    """GET a WeatherAPI.com endpoint for one location, served from the weather cache when fresh."""
+    key = _weather_cache_key(endpoint, city, params)
+    _track_weather(endpoint, city, key, params)
+    cached = _weather_cache.get(key)
+    if cached is not None:
+        return cached
+    remaining = remaining_time()
+    if remaining is not None and remaining < LOW_BUDGET_S:
+        cached = _weather_cache.get(key, allow_stale=True)
+        if cached is not None:
+            return degraded(cached)
+
+    try:
+        return _fetch_weather(endpoint, city, api_key, key, params)
+    except (requests.ConnectionError, requests.Timeout):
+        # Upstream down or breaker open: an expired answer beats no answer
+        stale = _weather_cache.get(key, allow_stale=True)
+        if stale is not None:
+            return stale
+        raise
+
+
+def _weatherapi_bulk_post(endpoint: str, cities: List[str], api_key: str, **params) -> Dict[str, Dict]:
+    """One bulk request for many locations (WeatherAPI.com Pro plans and above)."""
+    body = {"locations": [{"q": city, "custom_id": str(i)} for i, city in enumerate(cities)]}
+    response = http.post(
+        f"{WEATHERAPI_URL}/{endpoint}",
+        params={"key": api_key, "q": "bulk", "aqi": "no", **params},
+        json=body,
+    )
+    results = {}
+    for item in response.json().get("bulk", []):
+        query = item.get("query", {})
+        if "custom_id" in query and "error" not in query:
+            results[cities[int(query["custom_id"])]] = {
+                k: v for k, v in query.items() if k not in ("custom_id", "q")
+            }
+    return results
+
+
+def _weatherapi_get_many(endpoint: str, cities: List[str], api_key: str, **params) -> Dict[str, object]:
+    """Fetch one endpoint for many locations.
+
+    Fresh locations come from the weather cache. The rest are fetched with a single
+    bulk request when the API plan supports it, otherwise with concurrent GETs.
+    Locations that fail map to their exception instead of failing the whole batch.
+    """
+    global _weatherapi_bulk_available
+
+    # Each city's request is counted once for refreshing: here when it is answered from the
+    # cache or the bulk request, otherwise by _weatherapi_get
+    results: Dict[str, object] = {}
+    missing = []
+    for city in dict.fromkeys(cities):
+        key = _weather_cache_key(endpoint, city, params)
+        cached = _weather_cache.get(key)
+        if cached is not None:
+            _track_weather(endpoint, city, key, params)
+            results[city] = cached
+        else:
+            missing.append(city)
+
+    if len(missing) > 1 and _weatherapi_bulk_available is not False:
+        try:
+            fetched = _weatherapi_bulk_post(endpoint, missing, api_key, **params)
+            _weatherapi_bulk_available = True
+        except requests.HTTPError:
+            # Bulk requests are a paid feature; remember and stop trying
+            _weatherapi_bulk_available = False
+            fetched = {}
+        except requests.RequestException:
+            fetched = {}
+        for city, data in fetched.items():
+            key = _weather_cache_key(endpoint, city, params)
+            _weather_cache.set(key, data)
+            _track_weather(endpoint, city, key, params)
+            results[city] = data
+        missing = [city for city in missing if city not in results]
+
+    def fetch(city):
+        try:
+            return _weatherapi_get(endpoint, city, api_key, **params)
+        except requests.RequestException as e:
+            return e
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as pool:
+            results.update(zip(missing, pool.map(bind_deadline(fetch), missing)))
+    return results
 
 
 @tool
+@coalesce
 def get_weather_now(city: str) -> str:
     """Get the current weather for a given city. This is a specific tool for real-time weather information.
     Args:
@@ -75,12 +342,7 @@ def get_weather_now(city: str) -> str:
 
     try:
         # Using WeatherAPI.com (free tier available)
-        url = "http://api.weatherapi.com/v1/current.json"
-        params = {"key": api_key, "q": city, "aqi": "no"}
-
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _weatherapi_get("current.json", city, api_key)
 
         location = data["location"]["name"]
         country = data["location"]["country"]
@@ -101,6 +363,7 @@ def get_weather_now(city: str) -> str:
 
 
 @tool
+@coalesce
 def get_weather_forecast(city: str, days: int = 3) -> List[str]:
     """Get the weather forecast for a given city for the next specified number of days.
     Args:
@@ -118,12 +381,7 @@ def get_weather_forecast(city: str, days: int = 3) -> List[str]:
 
     try:
         # Using WeatherAPI.com forecast endpoint
-        url = "http://api.weatherapi.com/v1/forecast.json"
-        params = {"key": api_key, "q": city, "days": days, "aqi": "no", "alerts": "no"}
-
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _weatherapi_get("forecast.json", city, api_key, days=days, alerts="no")
 
         forecast_strings = []
         for day in data["forecast"]["forecastday"]:
@@ -134,10 +392,8 @@ def get_weather_forecast(city: str, days: int = 3) -> List[str]:
             chance_of_rain = day["day"]["daily_chance_of_rain"]
 
             forecast_strings.append(
-                f"On {date}, expect {condition} with a high of {max_temp}°C and a low of {min_temp}°C. "
-                f"Chance of rain: {chance_of_rain}%."
+                f"{date}: {condition}, {min_temp}-{max_temp}°C, rain {chance_of_rain}%"
             )
-            time.sleep(0.1)  # Small delay to be respectful to the API
 
         return forecast_strings
 
@@ -147,6 +403,158 @@ def get_weather_forecast(city: str, days: int = 3) -> List[str]:
         raise RuntimeError(f"Unexpected weather forecast API response format: {e}")
 
 
+@tool
+@coalesce
+def get_weather_bulk(cities: List[str], days: int = 0) -> str:
+    """Get the weather for several cities at once. Use this instead of calling get_weather_now or
+    get_weather_forecast once per city when comparing places.
+    Args:
+        cities (List[str]): The cities to get the weather for, e.g. ['Girona', 'Olot', 'Vic'].
+        days (int, optional): 0 for current weather, or the number of forecast days. Defaults to 0.
+    Returns:
+        str: A compact table with one row per city (and per day for forecasts).
+    """
+    api_key = os.getenv("WEATHERAPI_KEY")
+    if not api_key:
+        raise ValueError("Missing WEATHERAPI_KEY environment variable")
+    if not cities:
+        return "No cities given."
+
+    if days > 0:
+        results = _weatherapi_get_many(
+            "forecast.json", cities, api_key, days=min(days, 7), alerts="no"
+        )
+        rows = ["city | date | condition | max_c | min_c | rain_pct"]
+    else:
+        results = _weatherapi_get_many("current.json", cities, api_key)
+        rows = ["city | condition | temp_c | humidity_pct | wind_kph"]
+
+    for city in dict.fromkeys(cities):
+        data = results.get(city)
+        if not isinstance(data, dict):
+            rows.append(f"{city} | error: {data}")
+            continue
+        try:
+            if days > 0:
+                for day in data["forecast"]["forecastday"]:
+                    d = day["day"]
+                    rows.append(
+                        f"{city} | {day['date']} | {d['condition']['text']} | "
+                        f"{d['maxtemp_c']} | {d['mintemp_c']} | {d['daily_chance_of_rain']}"
+                    )
+            else:
+                c = data["current"]
+                rows.append(
+                    f"{city} | {c['condition']['text']} | {c['temp_c']} | "
+                    f"{c['humidity']} | {c['wind_kph']}"
+                )
+        except KeyError as e:
+            rows.append(f"{city} | error: unexpected response format ({e})")
+    return "\n".join(rows)
+
+
+@tool
+@coalesce
+def plan_ride_windows(
+    cities: List[str],
+    days: int = 3,
+    window_hours: int = 2,
+    top_k: int = 5,
+    temperature_weight: float = 1.0,
+    rain_weight: float = 1.0,
+    wind_weight: float = 1.0,
+    daylight_weight: float = 1.0,
+) -> List[Dict]:
+    """Find the best times to ride across one or more cities over the next few days.
+    Use this instead of calling get_weather_forecast repeatedly when the user asks when or where to ride.
+    Args:
+        cities (List[str]): The cities to compare, e.g. ['Girona', 'Barcelona'].
+        days (int, optional): Number of days to look ahead. Defaults to 3.
+        window_hours (int, optional): Length of the ride in hours. Defaults to 2.
+        top_k (int, optional): Number of ride windows to return. Defaults to 5.
+        temperature_weight (float, optional): Importance of a comfortable temperature. Defaults to 1.
+        rain_weight (float, optional): Importance of staying dry. Defaults to 1.
+        wind_weight (float, optional): Importance of low wind. Defaults to 1.
+        daylight_weight (float, optional): Importance of riding in daylight. Defaults to 1.
+    Returns:
+        List[dict]: The best ride windows with city, start, end, score and average conditions.
+    """
+    api_key = os.getenv("WEATHERAPI_KEY")
+    if not api_key:
+        raise ValueError("Missing WEATHERAPI_KEY environment variable")
+    if not cities:
+        return [{"message": "No cities given."}]
+    if window_hours < 1:
+        return [{"message": "window_hours must be at least 1."}]
+    ride_weights = (temperature_weight, rain_weight, wind_weight, daylight_weight)
+    if min(ride_weights) < 0 or max(ride_weights) <= 0:
+        return [{"message": "Ride weights must not be negative, and at least one must be positive."}]
+
+    # One forecast per city, fetched in bulk or concurrently and shared with the weather cache
+    fetched = _weatherapi_get_many("forecast.json", cities, api_key, days=min(days, 7), alerts="no")
+    forecasts = []
+    for city in cities:
+        if not isinstance(fetched[city], dict):
+            raise RuntimeError(f"Weather forecast API request failed for {city}: {fetched[city]}")
+        forecasts.append(fetched[city])
+
+    try:
+        hours_per_city = []
+        for data in forecasts:
+            now = data["location"]["localtime_epoch"]
+            hours = [
+                h
+                for day in data["forecast"]["forecastday"]
+                for h in day["hour"]
+                if h["time_epoch"] >= now - 3600
+            ]
+            hours_per_city.append(hours)
+    except KeyError as e:
+        raise RuntimeError(f"Unexpected weather forecast API response format: {e}")
+
+    # Pad to a cities x hours matrix; NaN hours never score
+    n_hours = max((len(h) for h in hours_per_city), default=0)
+    if window_hours > n_hours:
+        return [{"message": f"window_hours must be between 1 and {n_hours}, the forecast hours available."}]
+    shape = (len(cities), n_hours)
+    temp, rain, wind, day = (np.full(shape, np.nan) for _ in range(4))
+    for row, hours in enumerate(hours_per_city):
+        n = len(hours)
+        temp[row, :n] = [h["temp_c"] for h in hours]
+        rain[row, :n] = [h["chance_of_rain"] for h in hours]
+        wind[row, :n] = [h["wind_kph"] for h in hours]
+        day[row, :n] = [h["is_day"] for h in hours]
+
+    weights = RideWeights(
+        temperature=temperature_weight,
+        precipitation=rain_weight,
+        wind=wind_weight,
+        daylight=daylight_weight,
+    )
+    scores = score_hours(temp, rain, wind, day, weights)
+    windows = top_windows(rolling_mean(scores, window_hours), window_hours, top_k)
+    if not windows:
+        return [{"message": "Not enough forecast hours to plan a ride."}]
+
+    result = []
+    for row, start, score in windows:
+        span = slice(start, start + window_hours)
+        hours = hours_per_city[row][span]
+        end = datetime.strptime(hours[-1]["time"], "%Y-%m-%d %H:%M") + timedelta(hours=1)
+        result.append(
+            {
+                "city": forecasts[row]["location"]["name"],
+                "start": hours[0]["time"],
+                "end": end.strftime("%H:%M"),
+                "score": round(score, 2),
+                "temp_c": round(float(np.mean(temp[row, span])), 1),
+                "chance_of_rain": int(np.max(rain[row, span])),
+                "wind_kph": round(float(np.max(wind[row, span])), 1),
+            }
+        )
+    return result
+
+
 class UserStravaRoutesTool(BaseTool):
     """Tool to get user's Strava routes. Currently requires valid access token and only enables access to athletes routes."""
 
@@ -175,12 +583,13 @@ class UserStravaRoutesTool(BaseTool):
     def url(self) -> str:
         return "https://www.strava.com/api/v3/athlete/routes"
 
+    @coalesce
     def _run(self, query: str = "") -> List[Dict]:
         if not self.access_token:
             raise ValueError("STRAVA_ACCESS_TOKEN environment variable is required")
 
         params = {"per_page": self.max_routes}
-        response = requests.get(self.url, headers=self.headers, params=params)
+        response = http.get(self.url, headers=self.headers, params=params)
         response.raise_for_status()
         routes = response.json()
         if not routes:
@@ -198,7 +607,322 @@ class UserStravaRoutesTool(BaseTool):
         return result
 
 
+class StravaClimbsTool(BaseTool):
+    """Tool to detect climbs in the user's Strava routes or activities from their elevation streams."""
+
+    name: str = "strava_climbs"
+    description: str = (
+        "Detect the climbs on the user's own Strava routes or activities. "
+        "Returns each climb's distance (in km), elevation gain (in meters), and average and maximum gradient (in %). "
+        "Pass route or activity IDs, or leave them empty to use the most recent ones. "
+        "Set source to 'routes' or 'activities'. Requires a valid Strava access token. "
+    )
+
+    access_token: str = ""
+    max_items: int = 5
+    max_workers: int = 4
+
+    def __init__(self, max_items: int = 5, max_workers: int = 4, **kwargs):
+        super().__init__(**kwargs)
+        self.access_token = os.getenv("STRAVA_ACCESS_TOKEN", "")
+        self.max_items = max_items
+        self.max_workers = max_workers
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    @property
+    def base_url(self) -> str:
+        return "https://www.strava.com/api/v3"
+
+    def _list_items(self, source: str) -> List[Dict]:
+        url = f"{self.base_url}/athlete/{source}"
+        response = http.get(
+            url, headers=self.headers, params={"per_page": self.max_items}
+        )
+        response.raise_for_status()
+        return [{"id": item["id"], "name": item["name"]} for item in response.json()]
+
+    def _fetch_streams(self, source: str, item_id: int):
+        if source == "routes":
+            url = f"{self.base_url}/routes/{item_id}/streams"
+            params = {}
+        else:
+            url = f"{self.base_url}/activities/{item_id}/streams"
+            params = {"keys": "distance,altitude", "key_by_type": "true"}
+        response = http.get(url, headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    @coalesce
+    def _run(self, ids: Optional[List[int]] = None, source: str = "routes") -> List[Dict]:
+        if not self.access_token:
+            raise ValueError("STRAVA_ACCESS_TOKEN environment variable is required")
+        if source not in ("routes", "activities"):
+            raise ValueError("source must be 'routes' or 'activities'")
+
+        if ids:
+            items = [{"id": item_id, "name": f"{source[:-1]} {item_id}"} for item_id in ids]
+        else:
+            items = self._list_items(source)
+        if not items:
+            return [{"message": f"No {source} found for the user."}]
+
+        def fetch(item):
+            try:
+                return self._fetch_streams(source, item["id"])
+            except requests.Timeout:
+                # Out of time for this item; return the others rather than nothing
+                return None
+
+        # Stream downloads dominate the run time, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            payloads = list(pool.map(bind_deadline(fetch), items))
+
+        result = []
+        for item, payload in zip(items, payloads):
+            if payload is None:
+                result.append(
+                    {"name": item["name"], "id": item["id"], "message": "Skipped: timed out."}
+                )
+                continue
+            arrays = streams_to_arrays(payload)
+            if arrays is None:
+                result.append(
+                    {"name": item["name"], "id": item["id"], "message": "No elevation data."}
+                )
+                continue
+            climbs = [
+                Climb(
+                    name=f"{item['name']} climb {i}",
+                    location=f"km {c['start_km']:.1f}-{c['end_km']:.1f} of {item['name']}",
+                    distance_km=c["distance_km"],
+                    elevation_gain_m=c["elevation_gain_m"],
+                    average_gradient=c["average_gradient"],
+                    max_gradient=c["max_gradient"],
+                ).dict()
+                for i, c in enumerate(detect_climbs(*arrays), 1)
+            ]
+            result.append({"name": item["name"], "id": item["id"], "climbs": climbs})
+        # Items skipped for lack of time are not an answer to share with callers that have more
+        return degraded(result) if any(p is None for p in payloads) else result
+
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+
+def _geocode(location: str) -> Tuple[float, float]:
+    """Resolve a place name, or a "lat, lon" string, to coordinates."""
+    parts = [p.strip() for p in location.split(",")]
+    if len(parts) == 2:
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+
+    response = http.get(
+        NOMINATIM_URL,
+        params={"q": location, "format": "json", "limit": 1},
+        headers={"User-Agent": "cycling_agent"},
+    )
+    places = response.json()
+    if not places:
+        raise ValueError(f"Could not find coordinates for {location}")
+    return float(places[0]["lat"]), float(places[0]["lon"])
+
+
+class RoutesNearTool(BaseTool):
+    """Tool to find which of the user's Strava routes pass near a place, backed by a spatial index."""
+
+    name: str = "user_routes_near"
+    description: str = (
+        "Find which of the user's Strava routes pass near a place (e.g. 'Montserrat' or '41.59, 1.83'), "
+        "or run along a corridor given as an encoded polyline, with radius_km as the corridor half-width. "
+        "Returns only the matching routes with their name, ID, distance (in km) and closest approach (in km), "
+        "or for a corridor the share of each route inside it. "
+        "Requires a valid Strava access token. "
+    )
+
+    access_token: str = ""
+    max_routes: int = 200
+    index_ttl_s: float = 900.0
+
+    _index: Optional[RouteIndex] = PrivateAttr(default=None)
+    _index_built_at: float = PrivateAttr(default=0.0)
+
+    def __init__(self, max_routes: int = 200, **kwargs):
+        super().__init__(**kwargs)
+        self.access_token = os.getenv("STRAVA_ACCESS_TOKEN", "")
+        self.max_routes = max_routes
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    @property
+    def url(self) -> str:
+        return "https://www.strava.com/api/v3/athlete/routes"
+
+    def _fetch_routes(self) -> List[Dict]:
+        routes, page = [], 1
+        per_page = min(self.max_routes, 200)
+        while len(routes) < self.max_routes:
+            params = {"per_page": per_page, "page": page}
+            response = http.get(self.url, headers=self.headers, params=params)
+            response.raise_for_status()
+            batch = response.json()
+            routes.extend(batch)
+            if len(batch) < per_page:
+                break
+            page += 1
+        return routes[: self.max_routes]
+
+    def get_index(self) -> RouteIndex:
+        """Build the route index on first use and rebuild it once it is older than index_ttl_s."""
+        if self._index is None or time.time() - self._index_built_at > self.index_ttl_s:
+            geometries = (
+                RouteGeometry.from_polyline(
+                    r["id"], r["name"], (r.get("map") or {}).get("summary_polyline", "")
+                )
+                for r in self._fetch_routes()
+            )
+            self._index = RouteIndex(geometries)
+            self._index_built_at = time.time()
+        return self._index
+
+    @coalesce
+    def _run(self, location: str = "", radius_km: float = 2.0, corridor: str = "") -> List[Dict]:
+        if not self.access_token:
+            raise ValueError("STRAVA_ACCESS_TOKEN environment variable is required")
+
+        if corridor:
+            return self._run_corridor(corridor, radius_km)
+        if not location:
+            return [{"message": "Provide a location, or a corridor as an encoded polyline."}]
+        lat, lon = _geocode(location)
+        matches = self.get_index().query_point(lat, lon, radius_km)
+        if not matches:
+            return [{"message": f"None of your routes pass within {radius_km} km of {location}."}]
+        return [
+            {
+                "name": route.name,
+                "id": route.route_id,
+                "distance_km": f"{route.distance_km:.1f} km",
+                "closest_km": round(distance, 2),
+            }
+            for route, distance in matches
+        ]
+
+    def _run_corridor(self, corridor: str, width_km: float) -> List[Dict]:
+        path = decode_polyline(corridor)
+        if not len(path):
+            return [{"message": "The corridor polyline is empty."}]
+        matches = self.get_index().query_corridor(path, width_km)
+        if not matches:
+            return [{"message": f"None of your routes run within {width_km} km of the corridor."}]
+        return [
+            {
+                "name": route.name,
+                "id": route.route_id,
+                "distance_km": f"{route.distance_km:.1f} km",
+                "inside_corridor": round(fraction, 2),
+            }
+            for route, fraction in matches
+        ]
+
+
+class ElevationProfileTool(BaseTool):
+    """Tool to compute elevation profiles and climb stats from local DEM tiles instead of web articles."""
+
+    name: str = "elevation_profile"
+    description: str = (
+        "Compute the elevation profile and climb statistics for one of the user's Strava routes (by route_id) "
+        "or for the straight line between two places (start and end, e.g. 'Bourg-d'Oisans' and 'Alpe d'Huez'). "
+        "Returns total distance (in km), elevation gain (in meters), a coarse profile and the detected climbs. "
+        "Uses offline elevation data, so no web search is needed. "
+    )
+
+    dem_dir: str = ""
+    access_token: str = ""
+    profile_points: int = 20
+    smoothing_m: float = 100.0
+
+    _store: Optional[DEMTileStore] = PrivateAttr(default=None)
+
+    def __init__(self, profile_points: int = 20, **kwargs):
+        super().__init__(**kwargs)
+        self.dem_dir = os.getenv("DEM_TILE_DIR", "")
+        self.access_token = os.getenv("STRAVA_ACCESS_TOKEN", "")
+        self.profile_points = profile_points
+
+    @property
+    def store(self) -> DEMTileStore:
+        if self._store is None:
+            self._store = DEMTileStore(self.dem_dir)
+        return self._store
+
+    def _route_coords(self, route_id: int) -> np.ndarray:
+        if not self.access_token:
+            raise ValueError("STRAVA_ACCESS_TOKEN environment variable is required")
+        response = http.get(
+            f"https://www.strava.com/api/v3/routes/{route_id}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+        response.raise_for_status()
+        route_map = response.json().get("map") or {}
+        return decode_polyline(route_map.get("polyline") or route_map.get("summary_polyline", ""))
+
+    @coalesce
+    def _run(self, route_id: Optional[int] = None, start: str = "", end: str = "") -> Dict:
+        if not self.dem_dir:
+            raise ValueError("DEM_TILE_DIR environment variable is required")
+
+        if route_id is not None:
+            coords = self._route_coords(route_id)
+            label = f"route {route_id}"
+        elif start and end:
+            coords = np.array([_geocode(start), _geocode(end)])
+            label = f"{start} to {end}"
+        else:
+            return {"message": "Provide a route_id, or both start and end locations."}
+
+        distance, elevation = self.store.profile(coords)
+        if np.isnan(elevation).all():
+            return {"message": f"No elevation tiles cover {label}."}
+
+        climbs = [
+            Climb(
+                name=f"{label} climb {i}",
+                location=f"km {c['start_km']:.1f}-{c['end_km']:.1f} of {label}",
+                distance_km=c["distance_km"],
+                elevation_gain_m=c["elevation_gain_m"],
+                average_gradient=c["average_gradient"],
+                max_gradient=c["max_gradient"],
+            ).dict()
+            for i, c in enumerate(detect_climbs(distance, elevation), 1)
+        ]
+        # DEM noise of a metre or two per sample adds up over a long route, so the gain is
+        # summed over the same resampled, smoothed altitude that detect_climbs works on
+        step_m = 10.0
+        _, altitude = resample_stream(distance, elevation, step_m)
+        rises = np.diff(smooth(altitude, int(round(self.smoothing_m / step_m))))
+        coarse = np.linspace(0, len(distance) - 1, min(self.profile_points, len(distance))).astype(int)
+        return {
+            "distance_km": round(float(distance[-1]) / 1000.0, 1),
+            "elevation_gain_m": int(rises[rises > 0].sum()),
+            "min_elevation_m": int(np.nanmin(elevation)),
+            "max_elevation_m": int(np.nanmax(elevation)),
+            "profile": [
+                [round(float(distance[i]) / 1000.0, 1), None if np.isnan(elevation[i]) else int(elevation[i])]
+                for i in coarse
+            ],
+            "climbs": climbs,
+        }
+
+
 @tool
+@coalesce
 def find_cycling_climb_articles(location: str, radius_km: int = 50) -> List[str]:
     """Find cycling climbs near a specified geographic location.
     Args:
@@ -210,19 +934,52 @@ def find_cycling_climb_articles(location: str, radius_km: int = 50) -> List[str]
     if not os.getenv("SERPAPI_KEY"):
         return ["SERPAPI_KEY environment variable not set."]
 
+    key = (canonical_location(location), radius_km)
+    _track("search", key, _search_cache, lambda: _search_climb_articles(location, key))
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return list(cached)
+    return _search_climb_articles(location, key)
+
+
+def _search_climb_articles(location: str, key: Tuple) -> List[str]:
+    radius_km = key[1]
     params = {
         "engine": "google",  # Use the general Google search engine
         "q": f"famous cycling climbs within {radius_km} km of {location} stats",
         "api_key": os.getenv("SERPAPI_KEY"),
     }
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    search = serpapi_search(params)
+    results = http.call_bounded(SERPAPI_HOST, search.get_dict)
 
     organic_results = results.get("organic_results", [])
     if not organic_results:
         return [f"No search results found for cycling climbs near {location}."]
 
-    return [result["link"] for result in organic_results[:3] if "link" in result]
+    links = [result["link"] for result in organic_results[:3] if "link" in result]
+    _search_cache.set(key, links)
+    return list(links)
+
+
+@tool
+def search_stored_articles(query: str, k: int = 5) -> List[Dict]:
+    """Search cycling articles that were already read, without a web search.
+
+    Use this BEFORE find_cycling_climb_articles. If the passages contain the climbs
+    and stats needed, answer from them and skip the web search and scraping.
+    Args:
+        query (str): What to look for, e.g. "climbs near Girona steeper than 6%".
+        k (int, optional): Number of passages to return (1-10). Defaults to 5.
+    Returns:
+        List[dict]: Passages with keys url, score (cosine similarity, higher is closer) and text.
+    """
+    store = get_article_store()
+    if store is None:
+        return [{"message": "ARTICLE_STORE_DIR environment variable not set."}]
+    if len(store) == 0:
+        return [{"message": "No articles stored yet; use find_cycling_climb_articles."}]
+    passages = store.search(query, k=max(1, min(int(k), 10)))
+    return [{"url": p.url, "score": p.score, "text": p.text} for p in passages]
 
 
 class Climb(BaseModel):
@@ -240,6 +997,9 @@ class Climb(BaseModel):
     max_gradient: Optional[float] = Field(
         default=None, description="Maximum gradient of the climb in percentage"
     )
+    top_altitude_m: Optional[int] = Field(
+        default=None, description="Altitude of the top of the climb in meters"
+    )
 
 
 class ClimbList(BaseModel):
@@ -247,6 +1007,7 @@ class ClimbList(BaseModel):
 
 
 @tool
+@coalesce
 def scrape_and_extract_climb_stats(url: str) -> List[dict]:
     """Extract detailed climb statistics from ONE webpage URL at a time.
 
@@ -269,52 +1030,206 @@ def scrape_and_extract_climb_stats(url: str) -> List[dict]:
 
     Returns:
         List[dict]: Climb dictionaries with keys: name, location, distance_km,
-                   elevation_gain_m, average_gradient, max_gradient
+                   elevation_gain_m, average_gradient, max_gradient, top_altitude_m
     """
-    # 1. Scrape the webpage content
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        # Remove script and style elements
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
+    remaining = remaining_time()
+    if remaining is not None and remaining < SCRAPE_MIN_BUDGET_S:
+        return degraded([f"Skipped {url}: not enough time left in this turn to read it."])
 
-        text_content = soup.get_text(separator=" ", strip=True)
-        # Limit content size to avoid excessive token usage
-        text_content = text_content[:8000]
+    # 1. Scrape the webpage content, reading only as much of the page as we use
+    remaining = remaining_time()
+    short = remaining is not None and remaining < SCRAPE_SHORT_BUDGET_S
+    try:
+        # Limit content size to avoid excessive token usage, and more so when short on time
+        text_content = fetch_text(
+            url,
+            max_chars=3000 if short else 8000,
+            max_bytes=SCRAPE_MAX_BYTES,
+            pool=get_parse_pool(),
+            timeout=remaining_time(),
+        ).text
 
     except requests.RequestException as e:
         return [f"Error fetching URL: {e}"]
+    except TimeoutError:
+        return degraded([f"Ran out of time reading {url}."])
+    _ingest_article(url, text_content)
 
+    def finish(climbs: List) -> List:
+        climbs = _catalogue(url, climbs)
+        # A shortened read is only good enough for a caller that is short on time itself
+        return degraded(climbs) if short else climbs
+
+    # 2. Reuse the extraction of a near-duplicate article seen before
+    signature = _article_index.fingerprint(text_content)
+    if signature is None:
+        return finish(_extract_climbs(url, text_content))
+    owner, entry = _article_index.claim(url, signature)
+    if not owner:
+        # The copy may still be extracting in another thread; wait for it within the budget
+        climbs = entry.wait(remaining_time())
+        if climbs is not None:
+            return finish([dict(c) for c in climbs])
+        return finish(_extract_climbs(url, text_content))
+
+    result = None
+    try:
+        result = _extract_climbs(url, text_content)
+        return finish(result)
+    finally:
+        if not short and result is not None and all(isinstance(c, dict) for c in result):
+            _article_index.publish(entry, [dict(c) for c in result])
+        else:
+            # Errors and shortened reads are not worth remembering; the next copy tries again
+            _article_index.abandon(entry)
+
+
+def _catalogue(url: str, climbs: List) -> List:
+    """Record an article's climbs in the session's catalogue for query_climbs and pass them through."""
+    catalog = current_catalog()
+    if catalog is not None:
+        catalog.add(url, [dict(c) for c in climbs if isinstance(c, dict)])
+    return climbs
+
+
+def _extract_climbs(url: str, text_content: str) -> List:
+    """Ask the local model for the climbs in one article's text."""
     prompt = get_climb_extraction_prompt(
         schema=ClimbList.schema_json(indent=2), webpage_text=text_content
     )
 
     # --- Call Ollama ---
-    response = ollama.chat(
-        model="mistral", messages=[{"role": "user", "content": prompt}]
-    )
+    try:
+        with phase("llm:ollama extraction"):
+            response = get_model_manager().chat(
+                model="mistral",
+                messages=[{"role": "user", "content": prompt}],
+                timeout_s=remaining_time(),
+            )
+    except TimeoutError:
+        return [f"Ran out of time extracting climbs from {url}."]
     output = response["message"]["content"].strip()
 
     try:
-        data = json.loads(output)
+        with phase("json_parse"):
+            data = json.loads(output)
 
-        # Handle full schema wrapper if present
-        if "properties" in data and "climbs" in data["properties"]:
-            climbs_data = data["properties"]["climbs"]
-        elif "climbs" in data:
-            climbs_data = data["climbs"]
-        else:
-            # fallback if output structure is unexpected
-            climbs_data = []
+            # Handle full schema wrapper if present
+            if "properties" in data and "climbs" in data["properties"]:
+                climbs_data = data["properties"]["climbs"]
+            elif "climbs" in data:
+                climbs_data = data["climbs"]
+            else:
+                # fallback if output structure is unexpected
+                climbs_data = []
 
-        # Convert each climb dict to Climb model (handles optional fields)
-        climbs_validated = [Climb(**c).dict() for c in climbs_data]
+            # Convert each climb dict to Climb model (handles optional fields)
+            climbs_validated = [Climb(**c).dict() for c in climbs_data]
 
         return climbs_validated
 
     except json.JSONDecodeError:
         # If parsing fails, return raw output for inspection
         return ["Error parsing JSON from LLM output", output]
+
+
+# Geocoded places, shared by all sessions; only definite answers are kept, never upstream failures
+_place_cache = TTLCache(ttl_s=7 * 24 * 3600, max_entries=4096)
+_NOT_FOUND = ()
+
+
+def _place_coordinates(location: str) -> Optional[Tuple[float, float]]:
+    """Coordinates of a climb's location, or None when it cannot be found in this turn's budget."""
+    key = canonical_location(location)
+    cached = _place_cache.get(key)
+    if cached is not None:
+        return cached or None
+    remaining = remaining_time()
+    if remaining is not None and remaining < LOW_BUDGET_S:
+        return None
+    try:
+        point = _geocode(location)
+    except requests.RequestException as e:
+        # Timeouts, open breakers and bad responses may well succeed next time
+        logger.info("Could not locate %r: %s", location, e)
+        return None
+    except ValueError as e:
+        logger.info("Could not locate %r: %s", location, e)
+        _place_cache.set(key, _NOT_FOUND)
+        return None
+    _place_cache.set(key, point)
+    return point
+
+
+@tool
+def query_climbs(
+    near: str = "",
+    within_km: Optional[float] = None,
+    min_gradient: Optional[float] = None,
+    max_gradient: Optional[float] = None,
+    min_length_km: Optional[float] = None,
+    max_length_km: Optional[float] = None,
+    min_gain_m: Optional[float] = None,
+    max_gain_m: Optional[float] = None,
+    min_fiets: Optional[float] = None,
+    min_category: Optional[str] = None,
+    sort_by: str = "fiets",
+    ascending: bool = False,
+    k: int = 10,
+) -> List[Dict]:
+    """Filter, sort and rank every climb extracted so far, and return only the matching climbs.
+
+    Use this AFTER scrape_and_extract_climb_stats instead of filtering climbs yourself.
+    Climbs from all scraped articles are merged, and each gets a FIETS difficulty
+    score (higher is harder; about 2 for a short hill, over 10 for a big Alpine col)
+    and a category (4, 3, 2, 1 or HC, hardest last).
+    Args:
+        near (str, optional): A place (e.g. 'Girona' or '41.98, 2.82') to measure distance from.
+        within_km (float, optional): Only climbs within this many km of `near`.
+        min_gradient, max_gradient (float, optional): Average gradient bounds in %.
+        min_length_km, max_length_km (float, optional): Length bounds in km.
+        min_gain_m, max_gain_m (float, optional): Elevation gain bounds in meters.
+        min_fiets (float, optional): Minimum FIETS score.
+        min_category (str, optional): Minimum category: '4', '3', '2', '1' or 'HC'.
+        sort_by (str, optional): One of fiets, average_gradient, max_gradient, distance_km,
+            elevation_gain_m or distance_from_km (needs `near`). Defaults to fiets.
+        ascending (bool, optional): Smallest first instead of largest first. Defaults to False.
+        k (int, optional): Number of climbs to return (1-25). Defaults to 10.
+    Returns:
+        List[dict]: The best matching climbs with name, location, stats, fiets, category,
+                   distance_from_km (with `near`) and sources (article URLs).
+    """
+    catalog = current_catalog()
+    if catalog is None or not len(catalog):
+        return [{"message": "No climbs extracted yet; use scrape_and_extract_climb_stats first."}]
+    if sort_by not in SORT_COLUMNS:
+        return [{"message": f"sort_by must be one of {', '.join(SORT_COLUMNS)}."}]
+
+    table = catalog.table()
+    point = None
+    if near:
+        point = _place_coordinates(near)
+        if point is None:
+            return [{"message": f"Could not find coordinates for {near}."}]
+        table = table.located(_place_coordinates)
+    try:
+        rows = table.query(
+            min_gradient=min_gradient,
+            max_gradient=max_gradient,
+            min_length_km=min_length_km,
+            max_length_km=max_length_km,
+            min_gain_m=min_gain_m,
+            max_gain_m=max_gain_m,
+            min_fiets=min_fiets,
+            min_category=min_category,
+            near=point,
+            within_km=within_km,
+            sort_by=sort_by,
+            descending=not ascending,
+            k=max(1, min(int(k), 25)),
+        )
+    except ValueError as e:
+        return [{"message": f"{e}."}]
+    if not rows:
+        return [{"message": f"None of the {len(table)} climbs found so far match."}]
+    return rows
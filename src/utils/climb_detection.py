@@ -0,0 +1,157 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+def resample_stream(
+    distance_m: np.ndarray, altitude_m: np.ndarray, step_m: float = 10.0
+) -> tuple:
+    """Resample a distance/altitude stream onto a regular distance grid.
+
+    Strava streams are sampled by time, so the distance between points varies with
+    speed. Working on a fixed grid keeps smoothing and gradients independent of pace.
+
+    Args:
+        distance_m (np.ndarray): Cumulative distance in meters.
+        altitude_m (np.ndarray): Altitude in meters for each distance sample.
+        step_m (float, optional): Grid spacing in meters. Defaults to 10 m.
+    Returns:
+        tuple: (grid distances, altitudes on the grid) as float64 arrays.
+    """
+    distance = np.asarray(distance_m, dtype=np.float64)
+    altitude = np.asarray(altitude_m, dtype=np.float64)
+    if distance.shape != altitude.shape:
+        raise ValueError("distance and altitude streams must have the same length")
+
+    valid = np.isfinite(distance) & np.isfinite(altitude)
+    distance, altitude = distance[valid], altitude[valid]
+    if distance.size < 2:
+        return np.empty(0), np.empty(0)
+
+    # GPS distance can jitter backwards; np.interp needs a non-decreasing x-axis
+    distance = np.maximum.accumulate(distance)
+    grid = np.arange(distance[0], distance[-1], step_m)
+    return grid, np.interp(grid, distance, altitude)
+
+
+def smooth(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving average computed with a cumulative sum (O(n), no Python loop).
+
+    Edges use a shrinking window so the output keeps the input length.
+    """
+    if window <= 1 or values.size == 0:
+        return values
+    half = window // 2
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(values.size)
+    lo = np.clip(idx - half, 0, values.size)
+    hi = np.clip(idx + half + 1, 0, values.size)
+    return (csum[hi] - csum[lo]) / (hi - lo)
+
+
+def compute_gradient(altitude: np.ndarray, step_m: float) -> np.ndarray:
+    """Percent gradient between consecutive grid points."""
+    return np.diff(altitude) / step_m * 100.0
+
+
+def _runs(mask: np.ndarray) -> tuple:
+    """Start (inclusive) and end (exclusive) indices of every True run in mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_climbs(
+    distance_m: np.ndarray,
+    altitude_m: np.ndarray,
+    min_gradient: float = 3.0,
+    min_length_m: float = 500.0,
+    min_gain_m: float = 25.0,
+    max_gap_m: float = 200.0,
+    smoothing_m: float = 100.0,
+    step_m: float = 10.0,
+) -> List[Dict]:
+    """Detect climbs in an elevation stream.
+
+    Every stage is vectorized: the stream is resampled onto a regular grid, the
+    altitude is smoothed, gradients are thresholded into runs, runs separated by
+    short flat sections are merged, and per-climb stats are reduced with
+    np.maximum.reduceat. A 100k point activity is processed in a few milliseconds.
+
+    Args:
+        distance_m (np.ndarray): Cumulative distance in meters.
+        altitude_m (np.ndarray): Altitude in meters.
+        min_gradient (float, optional): Gradient (%) a section must reach to count as climbing.
+        min_length_m (float, optional): Minimum climb length in meters.
+        min_gain_m (float, optional): Minimum elevation gain in meters.
+        max_gap_m (float, optional): Flatter sections shorter than this are merged into the climb.
+        smoothing_m (float, optional): Width of the altitude smoothing window in meters.
+        step_m (float, optional): Resampling grid spacing in meters.
+    Returns:
+        List[dict]: One dict per climb with keys start_km, end_km, distance_km,
+                    elevation_gain_m, average_gradient, max_gradient.
+    """
+    grid, altitude = resample_stream(distance_m, altitude_m, step_m)
+    if grid.size < 2:
+        return []
+
+    altitude = smooth(altitude, int(round(smoothing_m / step_m)))
+    gradient = compute_gradient(altitude, step_m)
+
+    starts, ends = _runs(gradient >= min_gradient)
+    if starts.size == 0:
+        return []
+
+    # Merge runs whose gap is short enough to be a false flat within the same climb
+    gaps = (starts[1:] - ends[:-1]) * step_m
+    new_group = np.concatenate(([True], gaps > max_gap_m))
+    group_first = np.flatnonzero(new_group)
+    group_last = np.concatenate((group_first[1:] - 1, [starts.size - 1]))
+    starts, ends = starts[group_first], ends[group_last]
+
+    # Gradient index i spans grid points i..i+1, so a run [s, e) climbs from s to e
+    length_m = (ends - starts) * step_m
+    gain_m = altitude[ends] - altitude[starts]
+    # Interleave start/end boundaries so every even reduceat slice is exactly one climb;
+    # the sentinel keeps an end index equal to gradient.size in bounds
+    bounds = np.column_stack((starts, ends)).ravel()
+    padded = np.concatenate((gradient, [-np.inf]))
+    max_gradient = np.maximum.reduceat(padded, bounds)[::2]
+
+    keep = (length_m >= min_length_m) & (gain_m >= min_gain_m)
+    start_km = grid[starts[keep]] / 1000.0
+    end_km = grid[ends[keep]] / 1000.0
+    length_m, gain_m, max_gradient = length_m[keep], gain_m[keep], max_gradient[keep]
+
+    return [
+        {
+            "start_km": round(float(s), 2),
+            "end_km": round(float(e), 2),
+            "distance_km": round(float(length / 1000.0), 2),
+            "elevation_gain_m": int(round(float(gain))),
+            "average_gradient": round(float(gain / length * 100.0), 1),
+            "max_gradient": round(float(peak), 1),
+        }
+        for s, e, length, gain, peak in zip(
+            start_km, end_km, length_m, gain_m, max_gradient
+        )
+    ]
+
+
+def streams_to_arrays(streams) -> Optional[tuple]:
+    """Pull distance and altitude arrays out of a Strava streams payload.
+
+    Route streams come back as a list of {"type": ..., "data": [...]} objects while
+    activity streams requested with key_by_type=true come back keyed by type.
+    Returns None when either stream is missing.
+    """
+    if isinstance(streams, list):
+        streams = {s.get("type"): s for s in streams if isinstance(s, dict)}
+    if not isinstance(streams, dict):
+        return None
+    distance = streams.get("distance", {}).get("data")
+    altitude = streams.get("altitude", {}).get("data")
+    if not distance or not altitude:
+        return None
+    return (
+        np.asarray(distance, dtype=np.float64),
+        np.asarray(altitude, dtype=np.float64),
+    )
@@ -0,0 +1,232 @@
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Stats merged numerically: (relative tolerance, absolute tolerance) for two sources to agree
+NUMERIC_FIELDS = {
+    "distance_km": (0.1, 0.3),
+    "elevation_gain_m": (0.1, 30),
+    "average_gradient": (0.1, 0.5),
+    "max_gradient": (0.1, 1.0),
+    "top_altitude_m": (0.05, 30),
+}
+TEXT_FIELDS = ("location",)
+# Two records of one name whose lengths differ more than this are different ascents
+MAX_DISTANCE_SPREAD = 0.25
+
+_PAREN = re.compile(r"[(\[]([^)\]]*)[)\]]")
+_QUALIFIER = re.compile(r"\b(?:from|via|depuis|par|desde|da)\s+(.+)$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Leading words that say what kind of climb it is rather than which one
+_GENERIC = frozenset(
+    "the l le la les el els los las il lo de du des del della di d "
+    "col coll colle collada passo puerto port alto cote monte mont mount climb pass".split()
+)
+
+
+def _fold(text: str) -> str:
+    """Lower-case ASCII words: accents, apostrophes, hyphens and punctuation removed."""
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def display_name(name: str) -> str:
+    """The name without parenthesised notes, e.g. "L'Alpe d'Huez (from Bourg)" -> "L'Alpe d'Huez"."""
+    return " ".join(_PAREN.sub(" ", name).split())
+
+
+def name_key(name: str) -> Tuple[str, str]:
+    """Normalized (name, qualifier) for matching.
+
+    The qualifier is the ascent a name singles out ("from Bourg", "(north
+    side)"). Leading articles and words like "Col de" are dropped, so
+    "Col de la Madeleine" and "La Madeleine" share a key.
+    """
+    notes = " ".join(_PAREN.findall(name))
+    base = _fold(_PAREN.sub(" ", name))
+    qualifier = _QUALIFIER.search(base)
+    if qualifier:
+        notes = f"{notes} {qualifier.group(1)}"
+        base = base[: qualifier.start()].strip()
+    words = base.split()
+    start = 0
+    while start < len(words) - 1 and words[start] in _GENERIC:
+        start += 1
+    qualifier_words = [w for w in _fold(notes).split() if w not in _GENERIC and w != "from"]
+    return " ".join(words[start:]) or base, " ".join(qualifier_words)
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _agrees(a: float, b: float, tolerance: Tuple[float, float]) -> bool:
+    relative, absolute = tolerance
+    return abs(a - b) <= max(absolute, relative * max(abs(a), abs(b)))
+
+
+@dataclass
+class MergedClimb:
+    """One real climb assembled from every source that mentions it.
+
+    `values` holds the merged stats, `field_sources` the sources that
+    support each value, and `confidence` how well sources agree on it:
+    supporting sources / (sources reporting the field + 1), so a value
+    only one page reports scores 0.5 and three agreeing pages score 0.75.
+    """
+
+    name: str
+    aliases: List[str]
+    sources: List[str]
+    values: Dict[str, Any] = field(default_factory=dict)
+    field_sources: Dict[str, List[str]] = field(default_factory=dict)
+    confidence: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self, detail: bool = False) -> Dict[str, Any]:
+        """Compact record for the model; `detail` adds aliases and per-field attribution."""
+        record: Dict[str, Any] = {"name": self.name, **self.values, "sources": self.sources}
+        if self.confidence:
+            record["confidence"] = round(sum(self.confidence.values()) / len(self.confidence), 2)
+        if detail:
+            record.update(
+                aliases=self.aliases, field_sources=self.field_sources, field_confidence=self.confidence
+            )
+        return record
+
+
+class _Group:
+    __slots__ = ("key", "qualifiers", "observations")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.qualifiers: Set[str] = set()
+        self.observations: List[Tuple[Dict, str]] = []
+
+    def distances(self) -> List[float]:
+        return [c["distance_km"] for c, _ in self.observations if c.get("distance_km") is not None]
+
+
+class ClimbMergeIndex:
+    """Groups climb records that name the same climb, however each source spells it.
+
+    Names are normalized (see `name_key`). An exact key match is a dict
+    lookup; otherwise candidates come from a trigram inverted index and the
+    best one with a Dice similarity of at least `threshold` is used. Either
+    way, lookups only touch groups that share part of the name, not the
+    whole corpus. Groups whose qualifiers name different ascents, or whose
+    lengths are too far apart, are never merged.
+    """
+
+    def __init__(self, threshold: float = 0.75):
+        self.threshold = threshold
+        self._groups: List[_Group] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def _compatible(self, group: _Group, qualifier: str, climb: Dict) -> bool:
+        if qualifier and group.qualifiers and qualifier not in group.qualifiers:
+            return False
+        distance = climb.get("distance_km")
+        if distance is None:
+            return True
+        return all(abs(distance - d) <= MAX_DISTANCE_SPREAD * max(distance, d) for d in group.distances())
+
+    def match(self, climb: Dict) -> Optional[int]:
+        """Index of the group `climb` belongs to, if any."""
+        key, qualifier = name_key(climb["name"])
+        for index in self._by_key.get(key, ()):
+            if self._compatible(self._groups[index], qualifier, climb):
+                return index
+
+        grams = trigrams(key)
+        shared = Counter(index for gram in grams for index in self._postings.get(gram, ()))
+        best, best_score = None, self.threshold
+        for index, count in shared.most_common():
+            group = self._groups[index]
+            score = 2 * count / (len(grams) + len(trigrams(group.key)))
+            if score >= best_score and self._compatible(group, qualifier, climb):
+                best, best_score = index, score
+        return best
+
+    def add(self, climb: Dict, source: str) -> int:
+        """File a climb record from `source`; returns its group index."""
+        index = self.match(climb)
+        key, qualifier = name_key(climb["name"])
+        if index is None:
+            index = len(self._groups)
+            self._groups.append(_Group(key))
+            self._by_key.setdefault(key, []).append(index)
+            for gram in trigrams(key):
+                self._postings.setdefault(gram, []).append(index)
+        group = self._groups[index]
+        if qualifier:
+            group.qualifiers.add(qualifier)
+        group.observations.append((climb, source))
+        return index
+
+    def records(self) -> List[MergedClimb]:
+        """Merged climbs in the order they were first seen.
+
+        Ascents of one mountain keep their qualifier in the name
+        ("Mont Ventoux (from Bédoin)") so they stay distinguishable.
+        """
+        return [_resolve(group, len(self._by_key[group.key]) > 1) for group in self._groups]
+
+
+def _resolve_numeric(observations: List[Tuple[float, str]], tolerance) -> Tuple[float, List[str], float]:
+    # The value most sources agree with (earliest on ties), as the median of that agreeing cluster
+    clusters = [[o for o in observations if _agrees(value, o[0], tolerance)] for value, _ in observations]
+    cluster = max(clusters, key=len)
+    value = median(v for v, _ in cluster)
+    return value, [s for _, s in cluster], round(len(cluster) / (len(observations) + 1), 2)
+
+
+def _resolve(group: _Group, keep_qualifier: bool = False) -> MergedClimb:
+    names = [c["name"] if keep_qualifier else display_name(c["name"]) for c, _ in group.observations]
+    if keep_qualifier:
+        names = [n for n in names if name_key(n)[1]] or names
+    counts = Counter(names)
+    name = max(dict.fromkeys(names), key=lambda n: counts[n])
+    merged = MergedClimb(
+        name=name,
+        aliases=[a for a in dict.fromkeys(c["name"] for c, _ in group.observations) if a != name],
+        sources=list(dict.fromkeys(s for _, s in group.observations)),
+    )
+
+    for stat in TEXT_FIELDS:
+        reported = [(c[stat], s) for c, s in group.observations if c.get(stat)]
+        if not reported:
+            continue
+        votes = Counter(_fold(v) for v, _ in reported)
+        winner = max(dict.fromkeys(_fold(v) for v, _ in reported), key=lambda v: votes[v])
+        supporting = [(v, s) for v, s in reported if _fold(v) == winner]
+        merged.values[stat] = supporting[0][0]
+        merged.field_sources[stat] = list(dict.fromkeys(s for _, s in supporting))
+        merged.confidence[stat] = round(len(supporting) / (len(reported) + 1), 2)
+
+    for stat, tolerance in NUMERIC_FIELDS.items():
+        reported = [(float(c[stat]), s) for c, s in group.observations if c.get(stat) is not None]
+        if not reported:
+            continue
+        value, sources, confidence = _resolve_numeric(reported, tolerance)
+        merged.values[stat] = int(round(value)) if stat == "elevation_gain_m" else round(value, 1)
+        merged.field_sources[stat] = list(dict.fromkeys(sources))
+        merged.confidence[stat] = confidence
+    return merged
+
+
+def merge_climbs(per_source: Iterable[Tuple[str, List[Dict]]], detail: bool = False) -> List[Dict]:
+    """One record per real climb from (source, climbs) pairs, in first-seen order."""
+    index = ClimbMergeIndex()
+    for source, climbs in per_source:
+        for climb in climbs:
+            if isinstance(climb, dict) and climb.get("name"):
+                index.add(climb, source)
+    return [record.to_dict(detail) for record in index.records()]
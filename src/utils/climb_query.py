@@ -0,0 +1,269 @@
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .climb_merge import merge_climbs
+from .deadline import bind_deadline
+from .geometry import haversine_km
+
+NUMERIC_COLUMNS = ("distance_km", "elevation_gain_m", "average_gradient", "max_gradient", "top_altitude_m")
+TEXT_COLUMNS = ("name", "location")
+SORT_COLUMNS = (
+    "fiets",
+    "average_gradient",
+    "max_gradient",
+    "distance_km",
+    "elevation_gain_m",
+    "distance_from_km",
+)
+# Climb categories by length (m) x average gradient (%), hardest first, as cycling apps rate segments
+CATEGORY_THRESHOLDS = (("HC", 80_000), ("1", 64_000), ("2", 32_000), ("3", 16_000), ("4", 8_000))
+CATEGORY_RANK = {name: len(CATEGORY_THRESHOLDS) - i for i, (name, _) in enumerate(CATEGORY_THRESHOLDS)}
+
+
+def _column(records: Sequence[Dict], key: str) -> np.ndarray:
+    return np.array([np.nan if r.get(key) is None else float(r[key]) for r in records], dtype=np.float64)
+
+
+def fiets_index(gain_m: np.ndarray, length_km: np.ndarray, top_altitude_m: Optional[np.ndarray] = None) -> np.ndarray:
+    """FIETS difficulty: H^2 / (D * 10) + max(0, T - 1000) / 1000, with H and D in metres.
+
+    The altitude term only counts when the top altitude T is known.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = gain_m**2 / (length_km * 1000.0 * 10.0)
+    if top_altitude_m is not None:
+        score = score + np.nan_to_num(np.maximum(top_altitude_m - 1000.0, 0.0) / 1000.0)
+    return np.where(length_km > 0, score, np.nan)
+
+
+def category_rank(length_km: np.ndarray, gradient: np.ndarray) -> np.ndarray:
+    """0 for uncategorized up to 5 for HC; -1 where length or gradient is unknown."""
+    score = length_km * 1000.0 * gradient
+    rank = np.zeros(len(score), dtype=np.int8)
+    for name, threshold in reversed(CATEGORY_THRESHOLDS):
+        rank[score >= threshold] = CATEGORY_RANK[name]
+    rank[np.isnan(score)] = -1
+    return rank
+
+
+_CATEGORY_NAMES = {rank: name for name, rank in CATEGORY_RANK.items()}
+
+
+class ClimbTable:
+    """Climbs as NumPy columns, with vectorized difficulty scores, filters and top-k.
+
+    Missing stats are derived where the other two are known (gradient from
+    gain and length, and so on). Filters are strict: a climb whose value is
+    unknown does not pass a filter on that value.
+    """
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        records = [r for r in records if isinstance(r, dict) and r.get("name")]
+        self.records = records
+        self.text = {key: np.array([r.get(key) or "" for r in records], dtype=object) for key in TEXT_COLUMNS}
+        cols = {key: _column(records, key) for key in NUMERIC_COLUMNS + ("lat", "lon")}
+
+        length, gain, gradient = cols["distance_km"], cols["elevation_gain_m"], cols["average_gradient"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gradient = np.where(np.isnan(gradient), gain / (length * 10.0), gradient)
+            gain = np.where(np.isnan(gain), length * gradient * 10.0, gain)
+            length = np.where(np.isnan(length), gain / (gradient * 10.0), length)
+        for values in (gradient, gain, length):
+            values[~np.isfinite(values)] = np.nan
+        cols.update(distance_km=length, elevation_gain_m=gain, average_gradient=gradient)
+        cols["fiets"] = fiets_index(gain, length, cols["top_altitude_m"])
+        self.columns = cols
+        self.category = category_rank(length, gradient)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def located(
+        self,
+        geocode: Callable[[str], Optional[Tuple[float, float]]],
+        limit: int = 10,
+        max_workers: int = 4,
+    ) -> "ClimbTable":
+        """A copy with unknown coordinates filled from each climb's location, geocoding at most `limit` places.
+
+        Distinct places are geocoded concurrently, each under the caller's deadline.
+        The table itself is left alone, so it can be shared between threads.
+        """
+        lat, lon = self.columns["lat"].copy(), self.columns["lon"].copy()
+        missing = np.isnan(lat) & (self.text["location"] != "")
+        places = list(dict.fromkeys(self.text["location"][missing]))[:limit]
+        if len(places) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(len(places), max_workers)) as pool:
+                points = list(pool.map(bind_deadline(geocode), places))
+        else:
+            points = [geocode(place) for place in places]
+        for place, point in zip(places, points):
+            if point is not None:
+                rows = missing & (self.text["location"] == place)
+                lat[rows], lon[rows] = point
+        table = copy.copy(self)
+        table.columns = {**self.columns, "lat": lat, "lon": lon}
+        return table
+
+    def query(
+        self,
+        min_gradient: Optional[float] = None,
+        max_gradient: Optional[float] = None,
+        min_length_km: Optional[float] = None,
+        max_length_km: Optional[float] = None,
+        min_gain_m: Optional[float] = None,
+        max_gain_m: Optional[float] = None,
+        min_fiets: Optional[float] = None,
+        min_category: Optional[str] = None,
+        near: Optional[Tuple[float, float]] = None,
+        within_km: Optional[float] = None,
+        sort_by: str = "fiets",
+        descending: bool = True,
+        k: int = 10,
+    ) -> List[Dict]:
+        """The top-k matching climbs as compact dicts, best first."""
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_COLUMNS)}")
+        if sort_by == "distance_from_km" and near is None:
+            raise ValueError("Sorting by distance_from_km needs a point to measure from")
+        cols = self.columns
+        mask = np.ones(len(self), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for column, low, high in (
+                ("average_gradient", min_gradient, max_gradient),
+                ("distance_km", min_length_km, max_length_km),
+                ("elevation_gain_m", min_gain_m, max_gain_m),
+                ("fiets", min_fiets, None),
+            ):
+                if low is not None:
+                    mask &= cols[column] >= low
+                if high is not None:
+                    mask &= cols[column] <= high
+            if min_category is not None:
+                if min_category not in CATEGORY_RANK:
+                    raise ValueError(f"min_category must be one of {', '.join(CATEGORY_RANK)}")
+                mask &= self.category >= CATEGORY_RANK[min_category]
+
+            distance = None
+            if near is not None:
+                distance = haversine_km(cols["lat"], cols["lon"], near[0], near[1])
+                if within_km is not None:
+                    mask &= distance <= within_km
+
+        rows = np.flatnonzero(mask)
+        key = (distance if sort_by == "distance_from_km" else cols[sort_by])[rows]
+        # Unknown values sort last either way
+        key = np.where(np.isnan(key), -np.inf if descending else np.inf, key)
+        key = -key if descending else key
+        if len(rows) > k:
+            top = np.argpartition(key, k - 1)[:k]
+            rows, key = rows[top], key[top]
+        rows = rows[np.argsort(key, kind="stable")]
+        return [self._row(i, distance) for i in rows]
+
+    def _row(self, i: int, distance: Optional[np.ndarray]) -> Dict:
+        cols = self.columns
+        row = {"name": self.text["name"][i]}
+        if self.text["location"][i]:
+            row["location"] = self.text["location"][i]
+        for column, digits in (
+            ("distance_km", 1),
+            ("elevation_gain_m", 0),
+            ("average_gradient", 1),
+            ("max_gradient", 1),
+            ("fiets", 1),
+        ):
+            value = cols[column][i]
+            if not np.isnan(value):
+                row[column] = int(round(value)) if digits == 0 else round(float(value), digits)
+        if self.category[i] > 0:
+            row["category"] = _CATEGORY_NAMES[int(self.category[i])]
+        if distance is not None and not np.isnan(distance[i]):
+            row["distance_from_km"] = round(float(distance[i]), 1)
+        if self.records[i].get("sources"):
+            row["sources"] = self.records[i]["sources"]
+        return row
+
+
+class ClimbCatalog:
+    """Every climb extracted in one session, merged across sources, queryable as a ClimbTable.
+
+    The table is rebuilt lazily after new pages are added, so repeated
+    queries between scrapes reuse the same columns. Sources older than
+    `max_age_s` are dropped, so a long session does not keep answering
+    from pages read hours ago.
+    """
+
+    def __init__(self, max_sources: int = 500, max_age_s: Optional[float] = 6 * 3600):
+        self.max_sources = max_sources
+        self.max_age_s = max_age_s
+        self._per_source: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._table: Optional[ClimbTable] = None
+        self._lock = threading.Lock()
+
+    def add(self, source: str, climbs: List[Dict]) -> None:
+        climbs = [c for c in climbs if isinstance(c, dict) and c.get("name")]
+        if not climbs:
+            return
+        with self._lock:
+            self._per_source.pop(source, None)
+            self._per_source[source] = (time.monotonic(), climbs)
+            while len(self._per_source) > self.max_sources:
+                del self._per_source[next(iter(self._per_source))]
+            self._table = None
+
+    def _expire(self) -> None:
+        if self.max_age_s is None:
+            return
+        cutoff = time.monotonic() - self.max_age_s
+        # Sources are kept in insertion order, oldest first
+        while self._per_source:
+            source, (added_at, _) = next(iter(self._per_source.items()))
+            if added_at >= cutoff:
+                break
+            del self._per_source[source]
+            self._table = None
+
+    def table(self) -> ClimbTable:
+        with self._lock:
+            self._expire()
+            if self._table is None:
+                self._table = ClimbTable(
+                    merge_climbs((source, climbs) for source, (_, climbs) in self._per_source.items())
+                )
+            return self._table
+
+    def clear(self) -> None:
+        with self._lock:
+            self._per_source.clear()
+            self._table = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._per_source)
+
+
+_current_catalog: ContextVar[Optional[ClimbCatalog]] = ContextVar("climb_catalog", default=None)
+
+
+def current_catalog() -> Optional[ClimbCatalog]:
+    """The climb catalogue of the session running in this context, if any."""
+    return _current_catalog.get()
+
+
+@contextmanager
+def catalog_scope(catalog: Optional[ClimbCatalog]) -> Iterator[Optional[ClimbCatalog]]:
+    """Record and query climbs in `catalog` for everything run in this context."""
+    token = _current_catalog.set(catalog)
+    try:
+        yield catalog
+    finally:
+        _current_catalog.reset(token)
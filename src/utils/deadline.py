@@ -0,0 +1,73 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """A point in time by which the current turn should be answered."""
+
+    def __init__(self, seconds: float):
+        self.budget_s = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s of {self.budget_s:.2f}s)"
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("turn_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline of the turn running in this context, if any."""
+    return _current_deadline.get()
+
+
+def remaining_time(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the current deadline, or `default` when no deadline is set."""
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.remaining()
+
+
+def bounded_timeout(timeout_s: float) -> float:
+    """A timeout that never outlives the current deadline."""
+    remaining = remaining_time()
+    return timeout_s if remaining is None else min(timeout_s, remaining)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Set a deadline for everything run in this context. None means no deadline."""
+    deadline = Deadline(seconds) if seconds is not None else None
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def bind_deadline(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap fn so it sees the caller's deadline when run in a worker thread.
+
+    Plain ThreadPoolExecutor workers do not inherit context variables, so
+    the caller's whole context is carried over (the deadline, and the turn
+    profile when profiling). Each call runs in its own copy, so the wrapper
+    can run in several workers at once.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
@@ -0,0 +1,121 @@
+import math
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .geometry import haversine_km
+
+# SRTM .hgt files are big-endian signed 16-bit heights; voids are stored as -32768
+HGT_DTYPE = np.dtype(">i2")
+HGT_VOID = -32768
+
+
+def tile_name(lat: float, lon: float) -> str:
+    """SRTM tile name for the 1x1 degree cell whose south-west corner is floor(lat, lon)."""
+    lat0, lon0 = math.floor(lat), math.floor(lon)
+    ns = "N" if lat0 >= 0 else "S"
+    ew = "E" if lon0 >= 0 else "W"
+    return f"{ns}{abs(lat0):02d}{ew}{abs(lon0):03d}.hgt"
+
+
+class DEMTileStore:
+    """Reads SRTM-style height tiles through memory maps and keeps an LRU of open tiles.
+
+    Opening a tile is just an mmap call, so only the pages a query touches are read
+    from disk. Tiles missing from the directory sample as NaN.
+    """
+
+    def __init__(self, directory: str, cache_size: int = 16):
+        self.directory = directory
+        self.cache_size = cache_size
+        self._tiles: "OrderedDict[Tuple[int, int], Optional[np.memmap]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, lat0: int, lon0: int) -> Optional[np.memmap]:
+        path = os.path.join(self.directory, tile_name(lat0, lon0))
+        if not os.path.exists(path):
+            return None
+        samples = os.path.getsize(path) // HGT_DTYPE.itemsize
+        size = math.isqrt(samples)
+        if size * size != samples:
+            raise ValueError(f"{path} is not a square SRTM tile")
+        return np.memmap(path, dtype=HGT_DTYPE, mode="r", shape=(size, size))
+
+    def tile(self, lat0: int, lon0: int) -> Optional[np.memmap]:
+        """The tile with south-west corner (lat0, lon0), or None if it is not available."""
+        key = (lat0, lon0)
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+            tile = self._load(lat0, lon0)
+            self._tiles[key] = tile
+            if len(self._tiles) > self.cache_size:
+                self._tiles.popitem(last=False)
+            return tile
+
+    def sample(self, lats, lons) -> np.ndarray:
+        """Bilinearly interpolated elevations (m) for arrays of coordinates.
+
+        Points are grouped by tile so each tile is interpolated with one set of
+        array operations, however many points fall inside it.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out = np.full(lats.shape, np.nan)
+
+        # Pack each 1x1 degree cell into one integer; a 1-D unique is far cheaper than axis=0.
+        # lon0 runs from -180 to 180 inclusive, hence 361 cells per row.
+        lat0s = np.floor(lats).astype(np.int64)
+        lon0s = np.floor(lons).astype(np.int64)
+        cells = (lat0s + 90) * 361 + (lon0s + 180)
+        unique_cells = np.unique(cells)
+        for cell in unique_cells:
+            lat0, lon0 = divmod(int(cell), 361)
+            lat0, lon0 = lat0 - 90, lon0 - 180
+            tile = self.tile(lat0, lon0)
+            if tile is None:
+                continue
+            if unique_cells.size == 1:
+                out[:] = self._bilinear(tile, lats - lat0, lons - lon0)
+            else:
+                mask = cells == cell
+                out[mask] = self._bilinear(tile, lats[mask] - lat0, lons[mask] - lon0)
+        return out
+
+    @staticmethod
+    def _bilinear(tile: np.memmap, dlat: np.ndarray, dlon: np.ndarray) -> np.ndarray:
+        size = tile.shape[0]
+        # Row 0 is the northern edge of the tile
+        row = (1.0 - dlat) * (size - 1)
+        col = dlon * (size - 1)
+        r0 = np.clip(np.floor(row).astype(np.int64), 0, size - 2)
+        c0 = np.clip(np.floor(col).astype(np.int64), 0, size - 2)
+        fr = row - r0
+        fc = col - c0
+
+        corners = np.stack(
+            (tile[r0, c0], tile[r0, c0 + 1], tile[r0 + 1, c0], tile[r0 + 1, c0 + 1])
+        ).astype(np.float64)
+        corners[corners == HGT_VOID] = np.nan
+        top = corners[0] * (1 - fc) + corners[1] * fc
+        bottom = corners[2] * (1 - fc) + corners[3] * fc
+        return top * (1 - fr) + bottom * fr
+
+    def profile(self, coords: np.ndarray, step_m: float = 30.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Elevation profile along a (lat, lon) polyline, resampled every step_m meters.
+
+        Returns:
+            tuple: (cumulative distance in m, elevation in m) arrays.
+        """
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if len(coords) < 2:
+            raise ValueError("A profile needs at least two coordinates")
+        legs = haversine_km(coords[:-1, 0], coords[:-1, 1], coords[1:, 0], coords[1:, 1])
+        cumulative = np.concatenate(([0.0], np.cumsum(legs) * 1000.0))
+        distance = np.append(np.arange(0.0, cumulative[-1], step_m), cumulative[-1])
+        lats = np.interp(distance, cumulative, coords[:, 0])
+        lons = np.interp(distance, cumulative, coords[:, 1])
+        return distance, self.sample(lats, lons)
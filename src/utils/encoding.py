@@ -0,0 +1,157 @@
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List
+
+TRUNCATION_MARKER = "…[truncated {count} more {unit}]"
+
+
+@lru_cache(maxsize=1)
+def _encoder():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when available, otherwise the usual ~4 characters per token."""
+    encoder = _encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4) if text else 0
+
+
+def serialize_raw(result: Any) -> str:
+    """How the agent would serialize the result without this layer (as LangChain does)."""
+    if isinstance(result, str):
+        return result
+    try:
+        return json.dumps(result, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+def drop_nulls(value: Any) -> Any:
+    """Recursively remove None, empty strings and empty containers."""
+    if isinstance(value, dict):
+        cleaned = {k: drop_nulls(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        cleaned = [drop_nulls(v) for v in value]
+        return [v for v in cleaned if v not in (None, "", [], {})]
+    return value
+
+
+def _flatten(row: Dict, prefix: str = "") -> Dict:
+    flat = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def to_table(rows: List[Dict]) -> List[str]:
+    """Render dicts as a header line plus one pipe-separated line per row.
+
+    Column names are written once instead of once per row, nested dicts become
+    dotted columns, and a column only appears if some row has a value for it.
+    """
+    flat_rows = [_flatten(r) for r in rows]
+    columns = list(dict.fromkeys(k for r in flat_rows for k in r))
+    lines = [" | ".join(columns)]
+    for r in flat_rows:
+        lines.append(" | ".join(_cell(r[c]) if c in r else "" for c in columns))
+    return lines
+
+
+def to_compact_lines(result: Any) -> List[str]:
+    """Compact line-oriented encoding of a tool result with null fields removed."""
+    result = drop_nulls(result)
+    if isinstance(result, str):
+        return result.splitlines() or [""]
+    if isinstance(result, list):
+        if result and all(isinstance(r, dict) for r in result):
+            return to_table(result)
+        return [_cell(r) if not isinstance(r, dict) else serialize_raw(r) for r in result]
+    if isinstance(result, dict):
+        lines = []
+        for key, value in result.items():
+            if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+                lines.append(f"{key}:")
+                lines.extend(to_table(value))
+            else:
+                lines.append(f"{key}: {_cell(value)}")
+        return lines
+    return [_cell(result)]
+
+
+def truncate_lines(lines: List[str], budget: int, unit: str = "lines") -> List[str]:
+    """Keep as many whole lines as fit in the token budget and mark what was dropped.
+
+    Tables keep their header line. A single line that is too long on its own is
+    cut by characters instead.
+    """
+    if estimate_tokens("\n".join(lines)) <= budget:
+        return lines
+
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            if not kept:
+                # Even the first line is over budget; cut it to roughly fit
+                chars = max(1, budget * 4)
+                return [line[:chars] + TRUNCATION_MARKER.format(count=len(line) - chars, unit="characters")]
+            kept.append(TRUNCATION_MARKER.format(count=len(lines) - i, unit=unit))
+            return kept
+        kept.append(line)
+        used += cost
+    return kept
+
+
+@dataclass
+class EncodedResult:
+    text: str
+    raw_tokens: int
+    tokens: int
+    truncated: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.raw_tokens - self.tokens
+
+
+def encode_result(result: Any, budget: int = 400) -> EncodedResult:
+    """Encode a tool result compactly and enforce a token budget.
+
+    Args:
+        result (Any): The raw tool output (str, list, dict, ...).
+        budget (int, optional): Maximum number of tokens for the encoded text.
+    Returns:
+        EncodedResult: The encoded text with raw and encoded token counts.
+    """
+    raw_tokens = estimate_tokens(serialize_raw(result))
+    lines = to_compact_lines(result)
+    unit = "rows" if len(lines) > 1 and isinstance(result, list) else "lines"
+    kept = truncate_lines(lines, budget, unit=unit)
+    text = "\n".join(kept)
+    return EncodedResult(
+        text=text,
+        raw_tokens=raw_tokens,
+        tokens=estimate_tokens(text),
+        truncated=kept != lines,
+    )
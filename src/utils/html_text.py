@@ -0,0 +1,181 @@
+import codecs
+import itertools
+import re
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from .profiling import current_profile
+from .resilience import http
+
+if TYPE_CHECKING:
+    from .parse_pool import ParsePool
+
+# Elements whose content is never visible text
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+_WHITESPACE = re.compile(r"\s+")
+_CHARSET = re.compile(r"charset=[\"']?([\w-]+)", re.IGNORECASE)
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+_META_CHARSET = re.compile(r"<meta[^>]*?charset\s*=\s*[\"']?\s*([\w-]+)", re.IGNORECASE)
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML-to-text parser that stops once it has enough text.
+
+    Text inside SKIP_TAGS is ignored. Strings are whitespace-collapsed and
+    joined with single spaces, like BeautifulSoup's
+    get_text(separator=" ", strip=True).
+    """
+
+    def __init__(self, max_chars: int = 8000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.chars = 0
+        self._skip_depth = 0
+        # Data for the current text node; a node can arrive in several feed() calls
+        self._pending: List[str] = []
+        self._pending_chars = 0
+
+    @property
+    def done(self) -> bool:
+        return self.chars + self._pending_chars >= self.max_chars
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = _WHITESPACE.sub(" ", "".join(self._pending)).strip()
+        self._pending.clear()
+        self._pending_chars = 0
+        if text:
+            self.parts.append(text)
+            self.chars += len(text) + 1
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        self._pending.append(data)
+        self._pending_chars += len(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def text(self) -> str:
+        self._flush()
+        return " ".join(self.parts)[: self.max_chars]
+
+
+@dataclass
+class PageText:
+    text: str
+    bytes_read: int
+    # Why reading stopped: "complete", "enough_text" or "byte_cap"
+    stopped: str
+
+
+def extract_text(
+    chunks: Iterable[Union[bytes, memoryview, str]],
+    max_chars: int = 8000,
+    max_bytes: Optional[int] = None,
+    encoding: str = "utf-8",
+) -> PageText:
+    """Parse HTML chunks as they arrive, stopping at max_chars of text or max_bytes of input."""
+    parser = TextExtractor(max_chars)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    # Parsing is timed apart from waiting for chunks, and only when the turn is profiled
+    profile = current_profile()
+    parse_s = 0.0
+    bytes_read = 0
+    stopped = "complete"
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            bytes_read += len(chunk)
+        else:
+            # bytes, or a memoryview into a shared page buffer
+            if max_bytes is not None and bytes_read + len(chunk) > max_bytes:
+                chunk = chunk[: max_bytes - bytes_read]
+                stopped = "byte_cap"
+            bytes_read += len(chunk)
+            chunk = decoder.decode(chunk)
+        if profile is None:
+            parser.feed(chunk)
+        else:
+            start = time.perf_counter()
+            parser.feed(chunk)
+            parse_s += time.perf_counter() - start
+        if parser.done:
+            stopped = "enough_text"
+            break
+        if stopped == "byte_cap":
+            break
+    parser.close()
+    if profile is not None:
+        profile.add("html_parse", parse_s)
+    return PageText(parser.text(), bytes_read, stopped)
+
+
+def _encoding(headers: Dict[str, str], head: bytes = b"") -> str:
+    """The charset from the Content-Type header, else from a <meta> tag in the page's first bytes."""
+    match = _CHARSET.search(headers.get("Content-Type", "") or "")
+    if match is None:
+        match = _META_CHARSET.search(bytes(head).decode("ascii", errors="replace"))
+    if match:
+        try:
+            name = codecs.lookup(match.group(1)).name
+        except LookupError:
+            return "utf-8"
+        # A page that could be read as ASCII to find the tag is not UTF-16 (as browsers assume)
+        return "utf-8" if name.startswith("utf-16") else name
+    return "utf-8"
+
+
+def fetch_text(
+    url: str,
+    max_chars: int = 8000,
+    max_bytes: int = 2_000_000,
+    chunk_size: int = 16 * 1024,
+    headers: Optional[Dict[str, str]] = None,
+    pool: Optional["ParsePool"] = None,
+    timeout: Optional[float] = None,
+) -> PageText:
+    """Stream a page and return its visible text without reading more than needed.
+
+    The connection is closed as soon as max_chars of text have been parsed or
+    max_bytes have been read, whichever comes first. With a `pool`, the page
+    (up to max_bytes) is parsed in a worker process instead, waiting at most
+    `timeout` seconds for it.
+
+    Raises:
+        requests.RequestException: If the page cannot be fetched.
+        TimeoutError: If the pool cannot parse the page within `timeout`.
+    """
+    response = http.get(url, headers=headers or {"User-Agent": "Mozilla/5.0"}, stream=True)
+    try:
+        chunks = response.iter_content(chunk_size=chunk_size)
+        # Peek at the first chunk for a <meta> charset, then hand it on with the rest
+        head = next(chunks, b"")
+        encoding = _encoding(response.headers, head)
+        chunks = itertools.chain([head], chunks)
+        if pool is not None:
+            return pool.parse(
+                chunks,
+                max_chars=max_chars,
+                max_bytes=max_bytes,
+                encoding=encoding,
+                timeout=timeout,
+            )
+        return extract_text(chunks, max_chars=max_chars, max_bytes=max_bytes, encoding=encoding)
+    finally:
+        response.close()
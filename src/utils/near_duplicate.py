@@ -0,0 +1,178 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SHIFT = np.uint64(32)
+
+
+def shingles(text: str, k: int = 5) -> Set[str]:
+    """Overlapping k-word shingles of lower-cased text, ignoring punctuation and markup noise."""
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+def _hash64(values: Set[str]) -> np.ndarray:
+    """Stable 64-bit hashes (unlike hash(), the same in every process)."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(v.encode(), digest_size=8).digest(), "little") for v in values),
+        dtype=np.uint64,
+        count=len(values),
+    )
+
+
+class MinHasher:
+    """MinHash signatures with multiply-shift hash functions.
+
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the two shingle sets.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make multiply-shift a universal hash family
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, text: str, k: int = 5) -> Optional[np.ndarray]:
+        """The text's signature, or None if it has no words."""
+        items = shingles(text, k)
+        if not items:
+            return None
+        hashes = _hash64(items)
+        # (num_perm, n_shingles); uint64 products wrap around, which is what multiply-shift wants
+        with np.errstate(over="ignore"):
+            permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> _SHIFT
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(a == b))
+
+
+class _Entry:
+    __slots__ = ("key", "signature", "value", "ready")
+
+    def __init__(self, key: Hashable, signature: np.ndarray):
+        self.key = key
+        self.signature = signature
+        self.value: Any = None
+        self.ready = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """The published value, or None if it was abandoned or did not arrive in time."""
+        self.ready.wait(timeout)
+        return self.value
+
+
+class NearDuplicateIndex:
+    """Finds documents whose text nearly matches one seen before.
+
+    Signatures are split into `bands` bands. Documents sharing any band
+    become candidates, and a candidate matches when its estimated Jaccard
+    similarity is at least `threshold` (locality-sensitive hashing). Entries
+    hold a value, such as an extraction result. A caller can claim a new
+    document before computing its value, so a near duplicate that arrives
+    in the meantime waits for that value instead of computing it again.
+    Least recently used entries are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8, max_entries: int = 512):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def fingerprint(self, text: str) -> Optional[np.ndarray]:
+        return self.hasher.signature(text)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _find(self, signature: np.ndarray) -> Optional[Tuple[_Entry, float]]:
+        candidates: Set[Hashable] = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        best: Optional[Tuple[_Entry, float]] = None
+        for key in candidates:
+            entry = self._entries[key]
+            score = similarity(signature, entry.signature)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (entry, score)
+        return best
+
+    def _insert(self, entry: _Entry) -> None:
+        self._remove(entry.key)
+        self._entries[entry.key] = entry
+        for band, key in zip(self._buckets, self._band_keys(entry.signature)):
+            band.setdefault(key, set()).add(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, band_key in zip(self._buckets, self._band_keys(entry.signature)):
+            members = band.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del band[band_key]
+
+    def find(self, signature: np.ndarray) -> Optional[Tuple[Hashable, float]]:
+        """Key and similarity of the closest near duplicate, if any."""
+        with self._lock:
+            match = self._find(signature)
+        return (match[0].key, match[1]) if match else None
+
+    def claim(self, key: Hashable, signature: np.ndarray) -> Tuple[bool, _Entry]:
+        """Register a document, or return the near duplicate already registered.
+
+        Returns (True, entry) when the caller owns the new entry and must
+        `publish` or `abandon` it, or (False, entry) for an existing near
+        duplicate whose value can be awaited with entry.wait().
+        """
+        with self._lock:
+            match = self._find(signature)
+            if match is not None:
+                self._entries.move_to_end(match[0].key)
+                return False, match[0]
+            entry = _Entry(key, signature)
+            self._insert(entry)
+            return True, entry
+
+    def publish(self, entry: _Entry, value: Any) -> None:
+        entry.value = value
+        entry.ready.set()
+
+    def abandon(self, entry: _Entry) -> None:
+        """Drop a claimed entry whose value could not be computed; waiters get None."""
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                self._remove(entry.key)
+        entry.ready.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.ready.set()
+            self._entries.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,228 @@
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, List, Optional, Tuple
+
+from .html_text import PageText, extract_text
+from .profiling import phase
+
+logger = logging.getLogger(__name__)
+
+# ProcessPoolExecutor(max_tasks_per_child=...) is new in Python 3.11
+_NATIVE_RECYCLING = sys.version_info >= (3, 11)
+
+
+def _parse_shared(name: str, size: int, max_chars: int, encoding: str, chunk_size: int) -> PageText:
+    """Worker side: parse a page straight out of a shared memory block, without copying it."""
+    shm = SharedMemory(name=name)
+    try:
+        view = shm.buf[:size]
+        chunks = (view[i : i + chunk_size] for i in range(0, size, chunk_size))
+        try:
+            return extract_text(chunks, max_chars=max_chars, encoding=encoding)
+        finally:
+            # Every view into the block must be gone before it can be closed
+            chunks.close()
+            view.release()
+    finally:
+        shm.close()
+
+
+class ParsePool:
+    """Parses HTML in worker processes, so page parsing never holds this process's GIL.
+
+    Pages are read in growing windows: the first is about as many bytes as
+    a page needs for `max_chars` of text (`bytes_per_char`), and each later
+    one is four times larger. After each window the bytes read so far are
+    copied into a shared memory block of that size, which the worker parses
+    in place; only the extracted text comes back. Reading stops as soon as
+    the text is long enough, so a long page is not downloaded to the end
+    just to keep its first paragraphs. At most `max_pending` pages are in
+    flight: further callers wait for a slot (up to their timeout), which
+    keeps a burst of scrapes from piling raw pages into memory. Each worker
+    is replaced after `max_tasks_per_child` parses, so parser garbage and
+    fragmentation cannot grow without bound, and a crashed pool is rebuilt
+    while the page that broke it is parsed inline.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = 200,
+        chunk_size: int = 16 * 1024,
+        bytes_per_char: int = 16,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.chunk_size = chunk_size
+        self.bytes_per_char = bytes_per_char
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._submitted = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Worker recycling needs a start method other than fork
+                options = {"mp_context": multiprocessing.get_context("spawn")}
+                if _NATIVE_RECYCLING:
+                    options["max_tasks_per_child"] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(self.workers, **options)
+                self._submitted = 0
+            return self._executor
+
+    def _submit(self, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        pool = self._pool()
+        future = pool.submit(_parse_shared, *args)
+        if not _NATIVE_RECYCLING and self.max_tasks_per_child:
+            # Before Python 3.11 the whole pool is replaced once its workers have done their share;
+            # parses already submitted to it still finish
+            with self._lock:
+                self._submitted += 1
+                retire = self._executor is pool and self._submitted >= self.workers * self.max_tasks_per_child
+                if retire:
+                    self._executor = None
+            if retire:
+                pool.shutdown(wait=False)
+        return pool, future
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def parse(
+        self,
+        chunks: Iterable[bytes],
+        max_chars: int = 8000,
+        max_bytes: int = 2_000_000,
+        encoding: str = "utf-8",
+        timeout: Optional[float] = None,
+    ) -> PageText:
+        """Read a page from `chunks` until it has max_chars of text or max_bytes, parsing it in a worker.
+
+        Raises:
+            TimeoutError: If no slot frees up, or the worker does not finish, within `timeout`.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Too many pages waiting to be parsed")
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        chunks = iter(chunks)
+        buffered: List[bytes] = []
+        size, exhausted = 0, False
+        window = max(self.chunk_size, max_chars * self.bytes_per_char)
+        future: Optional[Future] = None
+        try:
+            while True:
+                while size < min(window, max_bytes):
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    chunk = chunk[: max_bytes - size]
+                    buffered.append(chunk)
+                    size += len(chunk)
+                if size == 0:
+                    return PageText("", 0, "complete")
+
+                remaining = None if expires_at is None else max(0.0, expires_at - time.monotonic())
+                holders, pool, future = self._submit_window(buffered, size, max_chars, encoding)
+                page = self._wait(holders, pool, future, size, max_chars, encoding, remaining)
+                if page.stopped == "enough_text" or exhausted:
+                    return page
+                if size >= max_bytes:
+                    page.stopped = "byte_cap"
+                    return page
+                window *= 4
+        finally:
+            if future is None:
+                self._slots.release()
+            else:
+                # The slot is held until the last parse is over, even if we stop waiting for it
+                future.add_done_callback(lambda _future: self._slots.release())
+
+    def _submit_window(
+        self, buffered: List[bytes], size: int, max_chars: int, encoding: str
+    ) -> Tuple["_Holders", ProcessPoolExecutor, Future]:
+        """Hand the first `size` bytes of a page to a worker, through a block of exactly that size."""
+        shm = SharedMemory(create=True, size=size)
+        try:
+            offset = 0
+            for chunk in buffered:
+                shm.buf[offset : offset + len(chunk)] = chunk
+                offset += len(chunk)
+            pool, future = self._submit(shm.name, size, max_chars, encoding, self.chunk_size)
+        except BaseException:
+            _release(shm)
+            raise
+
+        # The block is freed once both this caller and the worker are done with it, even if we stop waiting
+        holders = _Holders(shm)
+        future.add_done_callback(lambda _future: holders.release())
+        return holders, pool, future
+
+    def _wait(
+        self,
+        holders: "_Holders",
+        pool: ProcessPoolExecutor,
+        future: Future,
+        size: int,
+        max_chars: int,
+        encoding: str,
+        timeout: Optional[float],
+    ) -> PageText:
+        shm = holders.shm
+        try:
+            with phase("html_parse"):
+                page = future.result(timeout)
+        except FuturesTimeoutError:
+            # Before Python 3.11 this is not the built-in TimeoutError that callers catch
+            raise TimeoutError("HTML parse worker did not finish in time") from None
+        except BrokenProcessPool:
+            logger.warning("HTML parse worker died; restarting the pool and parsing this page inline")
+            self._reset(pool)
+            page = extract_text([bytes(shm.buf[:size])], max_chars=max_chars, encoding=encoding)
+        finally:
+            holders.release()
+        return page
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _Holders:
+    """Frees a shared memory block when its second holder lets go."""
+
+    def __init__(self, shm: SharedMemory, count: int = 2):
+        self.shm = shm
+        self.count = count
+        self._lock = threading.Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            self.count -= 1
+            last = self.count == 0
+        if last:
+            _release(self.shm)
+
+
+def _release(shm: SharedMemory) -> None:
+    try:
+        shm.close()
+        shm.unlink()
+    except (BufferError, FileNotFoundError):
+        pass
@@ -0,0 +1,55 @@
+import time
+from typing import Any, Dict, Set
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from .profiling import TurnProfile, _profile_callback
+
+# Every LangChain run started while a profile is active reports to its callback
+register_configure_hook(_profile_callback, inheritable=True)
+
+
+class ProfileCallback(BaseCallbackHandler):
+    """Times LLM and tool runs as "llm:<model class>" and "tool:<name>" phases."""
+
+    def __init__(self, profile: TurnProfile):
+        self.profile = profile
+        self._started: Dict[Any, tuple] = {}
+        self._nested: Set[Any] = set()
+
+    def _start(self, run_id, name: str) -> None:
+        self._started[run_id] = (name, time.perf_counter())
+
+    def _end(self, run_id) -> None:
+        if run_id in self._nested:
+            self._nested.discard(run_id)
+            return
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.profile.add(started[0], time.perf_counter() - started[1])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, f"llm:{(serialized or {}).get('name', 'chat_model')}")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, f"llm:{(serialized or {}).get('name', 'llm')}")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id in self._started and self._started[parent_run_id][0].startswith("tool:"):
+            # A wrapped tool run by its wrapper (CompactResultTool) is timed as part of the wrapper
+            self._nested.add(run_id)
+            return
+        self._start(run_id, f"tool:{(serialized or {}).get('name') or kwargs.get('name', 'tool')}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
@@ -0,0 +1,193 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Profile every turn, including batch mode, without typing /profile
+PROFILE_ENV = "PROFILE_TURNS"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+class TurnProfile:
+    """Wall time per phase of one turn: LLM calls, each tool, parsing and rendering.
+
+    Phases nest (a tool's time includes the HTML parsing and LLM call it
+    makes), so the rows do not add up to the turn's wall time.
+    """
+
+    def __init__(self, label: str = "turn"):
+        self.label = label
+        self.started = time.perf_counter()
+        self.wall_s: Optional[float] = None
+        self.stacks_path: Optional[str] = None
+        self._phases: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._phases.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def finish(self) -> None:
+        self.wall_s = time.perf_counter() - self.started
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Phases by total time, longest first."""
+        wall = self.wall_s or (time.perf_counter() - self.started)
+        with self._lock:
+            rows = [
+                {"phase": name, "calls": calls, "seconds": round(total, 3), "share": round(total / wall, 3)}
+                for name, (calls, total) in self._phases.items()
+            ]
+        return sorted(rows, key=lambda r: r["seconds"], reverse=True)
+
+
+_current_profile: ContextVar[Optional[TurnProfile]] = ContextVar("turn_profile", default=None)
+# Holds a ProfileCallback (see profile_callback.py, which imports LangChain) while a profile is active
+_profile_callback: ContextVar[Optional[Any]] = ContextVar("profile_callback", default=None)
+
+
+def current_profile() -> Optional[TurnProfile]:
+    return _current_profile.get()
+
+
+class _Phase:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: TurnProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Time a block as `name` in the current turn's profile; a no-op when not profiling."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NO_PHASE
+    return _Phase(profile, name)
+
+
+def _frame_label(frame) -> str:
+    module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def _is_idle_worker(frame) -> bool:
+    """A thread-pool worker blocked waiting for work, which only adds noise to a wall-clock profile."""
+    while frame is not None and os.path.basename(frame.f_code.co_filename) in ("threading.py", "queue.py"):
+        frame = frame.f_back
+    return frame is not None and frame.f_code.co_name == "_worker"
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    The result is written in the "folded" format (one `frame;frame;frame
+    count` line per distinct stack) that flamegraph.pl, speedscope and
+    inferno read. Samples cover the whole process, not just one turn.
+    """
+
+    def __init__(self, interval_s: float = 0.005, max_depth: int = 128):
+        self.interval_s = interval_s
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or _is_idle_worker(frame):
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def profiling_requested() -> bool:
+    return os.getenv(PROFILE_ENV, "0") not in ("", "0", "false", "no")
+
+
+@contextmanager
+def profile_turn(
+    enabled: bool, label: str = "turn", directory: Optional[str] = None
+) -> Iterator[Optional[TurnProfile]]:
+    """Profile everything run in this block when `enabled`; otherwise yield None and do nothing.
+
+    Worker threads see the profile when their work is wrapped with
+    `bind_deadline`, which carries the caller's context.
+    """
+    if not enabled:
+        yield None
+        return
+
+    from .profile_callback import ProfileCallback
+
+    profile = TurnProfile(label)
+    sampler = StackSampler().start()
+    profile_token = _current_profile.set(profile)
+    callback_token = _profile_callback.set(ProfileCallback(profile))
+    try:
+        yield profile
+    finally:
+        _profile_callback.reset(callback_token)
+        _current_profile.reset(profile_token)
+        sampler.stop()
+        profile.finish()
+        safe_label = re.sub(r"[^\w.-]+", "_", label)
+        name = f"{safe_label}-{datetime.now():%Y%m%d-%H%M%S-%f}.folded"
+        try:
+            profile.stacks_path = sampler.write_folded(os.path.join(directory or PROFILE_DIR, name))
+        except OSError as e:
+            logger.warning("Could not write stack samples: %s", e)
@@ -0,0 +1,212 @@
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+def canonical_location(text: str) -> str:
+    """One spelling per place for cache keys: "Girona,  Spain" and "girona spain" match, as do "Olot" and "Olòt"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+class DecayingCounter:
+    """Request counts per key that halve every `half_life_s`, so recent demand dominates.
+
+    A key requested at a steady rate r settles at a score of r / decay, so
+    `rate()` recovers the request rate from the score alone. Only
+    `max_keys` keys are kept; the coldest are dropped first.
+    """
+
+    def __init__(self, half_life_s: float = 3600.0, max_keys: int = 4096):
+        self.decay = math.log(2) / half_life_s
+        self.max_keys = max_keys
+        self._scores: Dict[Hashable, tuple] = {}
+
+    def _current(self, key: Hashable, now: float) -> float:
+        score, at = self._scores.get(key, (0.0, now))
+        return score * math.exp(-self.decay * (now - at))
+
+    def add(self, key: Hashable, now: float, amount: float = 1.0) -> None:
+        self._scores[key] = (self._current(key, now) + amount, now)
+        if len(self._scores) > self.max_keys:
+            self.prune(now, keep=self.max_keys * 3 // 4)
+
+    def rate(self, key: Hashable, now: float) -> float:
+        """Estimated requests per second."""
+        return self._current(key, now) * self.decay
+
+    def prune(self, now: float, floor: float = 0.0, keep: Optional[int] = None) -> List[Hashable]:
+        """Forget keys scoring below `floor`, then all but the `keep` hottest. Returns the forgotten keys."""
+        scores = {key: self._current(key, now) for key in self._scores}
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        kept = {key for key in ranked[:keep] if scores[key] >= floor}
+        dropped = [key for key in ranked if key not in kept]
+        for key in dropped:
+            del self._scores[key]
+        return dropped
+
+    def clear(self) -> None:
+        self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+@dataclass
+class _Tracked:
+    tool: str
+    cache: TTLCache
+    refresh: Callable[[], Any]
+
+
+class RefreshScheduler:
+    """Refreshes popular cache entries shortly before they expire.
+
+    Tools call `track` on every request, hit or miss, with the cache key and
+    a function that refetches the entry. A background thread wakes every
+    `interval_s` and refreshes entries expiring within `lead_s`, hottest
+    first, but only for keys expected to be requested at least
+    `min_expected` times during the refreshed entry's lifetime. Those keys
+    would be fetched again by a user soon after expiry anyway, so a refresh
+    replaces that fetch instead of adding one. Refreshes are further capped
+    at `budget_per_hour` (a token bucket) to stay inside upstream rate
+    limits. Cold keys are left to expire and are forgotten once their
+    score decays away.
+    """
+
+    def __init__(
+        self,
+        budget_per_hour: float = 120.0,
+        lead_s: float = 60.0,
+        interval_s: float = 15.0,
+        half_life_s: float = 3600.0,
+        min_expected: float = 1.0,
+        max_keys: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.budget_per_hour = budget_per_hour
+        self.lead_s = lead_s
+        self.interval_s = interval_s
+        self.min_expected = min_expected
+        self.clock = clock
+        self.counter = DecayingCounter(half_life_s, max_keys)
+        self.refreshed = 0
+        self.failed = 0
+        self.over_budget = 0
+        self._tracked: Dict[Hashable, _Tracked] = {}
+        self._tokens = self._capacity
+        self._tokens_at = clock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def _capacity(self) -> float:
+        # Ten minutes of budget can be spent at once, e.g. when several hot keys expire together
+        return max(1.0, self.budget_per_hour / 6)
+
+    def track(self, tool: str, key: Hashable, cache: TTLCache, refresh: Callable[[], Any]) -> None:
+        """Count one request for `key`; `refresh` refetches the entry and stores it in `cache`."""
+        with self._lock:
+            self.counter.add((tool, key), self.clock())
+            self._tracked[(tool, key)] = _Tracked(tool, cache, refresh)
+        if self._thread is None:
+            self.start()
+
+    def due(self) -> List[Hashable]:
+        """Tracked keys worth refreshing now, hottest first."""
+        now = self.clock()
+        with self._lock:
+            # Forget keys too cold to ever be refreshed again
+            for key in self.counter.prune(now, floor=0.01):
+                self._tracked.pop(key, None)
+            candidates = []
+            for key, tracked in self._tracked.items():
+                expires_in = tracked.cache.expires_in(key[1])
+                if expires_in is None or expires_in > self.lead_s:
+                    continue
+                rate = self.counter.rate(key, now)
+                if rate * tracked.cache.ttl_s >= self.min_expected:
+                    candidates.append((rate, key))
+        return [key for _, key in sorted(candidates, key=lambda c: c[0], reverse=True)]
+
+    def _take_token(self) -> bool:
+        now = self.clock()
+        with self._lock:
+            self._tokens = min(self._capacity, self._tokens + (now - self._tokens_at) * self.budget_per_hour / 3600)
+            self._tokens_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def run_once(self) -> int:
+        """Refresh the entries that are due, within budget. Returns how many were refreshed."""
+        done = 0
+        for key in self.due():
+            if not self._take_token():
+                self.over_budget += 1
+                logger.debug("Refresh budget spent; %s will expire and be fetched on demand", key)
+                break
+            tracked = self._tracked.get(key)
+            if tracked is None:
+                continue
+            try:
+                tracked.refresh()
+                done += 1
+            except Exception as e:
+                # The entry expires as usual and the next request fetches it
+                self.failed += 1
+                logger.debug("Refreshing %s failed: %s", key, e)
+        self.refreshed += done
+        return done
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Cache refresh pass failed")
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.counter.clear()
+            self._tracked.clear()
+            self._tokens = self._capacity
+            self.refreshed = self.failed = self.over_budget = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked": len(self._tracked),
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+                "over_budget": self.over_budget,
+            }
@@ -0,0 +1,270 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from typing import Any, Callable, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .deadline import remaining_time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the host while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after consecutive failures, then lets one probe through after a cooldown."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout_s:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent successful request latencies per host, used to pick the hedge delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, host: str, latency_s: float) -> None:
+        with self._lock:
+            self._samples.setdefault(host, deque(maxlen=self._window)).append(latency_s)
+
+    def percentile(self, host: str, q: float = 0.95) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(host, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _is_host_failure(error: BaseException) -> bool:
+    """Connection problems, timeouts and 5xx responses count against a host; 4xx do not."""
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class ResilientHTTP:
+    """HTTP requests with per-turn deadlines, hedging and per-host circuit breakers.
+
+    Idempotent GETs that have not answered within the host's p95 latency get one
+    duplicate request; whichever answers first wins. A host that keeps failing
+    trips its breaker and further calls fail fast with CircuitOpenError, which
+    callers can answer from cache.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float = 15.0,
+        default_hedge_delay_s: float = 1.0,
+        min_hedge_delay_s: float = 0.05,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        max_workers: int = 16,
+    ):
+        self.timeout_s = timeout_s
+        self.default_hedge_delay_s = default_hedge_delay_s
+        self.min_hedge_delay_s = min_hedge_delay_s
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.latency = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-http")
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout_s)
+            return self._breakers[host]
+
+    def reset(self) -> None:
+        """Forget breaker state and latency history for every host."""
+        with self._lock:
+            self._breakers.clear()
+        self.latency = LatencyTracker()
+
+    def hedge_delay(self, host: str) -> float:
+        p95 = self.latency.percentile(host)
+        delay = self.default_hedge_delay_s if p95 is None else p95
+        return max(delay, self.min_hedge_delay_s)
+
+    def _timeout(self, requested: Optional[float]) -> Optional[float]:
+        """The request timeout: the caller's or the default, capped by the turn deadline when one is set."""
+        remaining = remaining_time()
+        if remaining is None:
+            return requested or self.timeout_s
+        if remaining <= 0:
+            raise requests.Timeout("Turn deadline exceeded before the request was sent")
+        return min(requested or self.timeout_s, remaining)
+
+    def call(self, host: str, fn: Callable[[], Any]) -> Any:
+        """Run any upstream call under the host's circuit breaker."""
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {host}; failing fast")
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            if _is_host_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        self.latency.record(host, time.perf_counter() - start)
+        return result
+
+    def call_bounded(self, host: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Like `call`, for clients that take no timeout: fn runs in the pool and is abandoned
+        when the deadline-bounded timeout passes.
+
+        Raises:
+            requests.Timeout: When fn has not returned in time; it counts against the host.
+        """
+        timeout = self._timeout(timeout)
+
+        def bounded() -> Any:
+            future = self._pool.submit(fn)
+            try:
+                return future.result(timeout=timeout)
+            except FuturesTimeoutError as e:
+                future.cancel()
+                raise requests.Timeout(f"Request to {host} timed out after {timeout:.1f}s") from e
+
+        return self.call(host, bounded)
+
+    def get(self, url: str, hedge: bool = True, **kwargs: Any) -> requests.Response:
+        """requests.get with deadline-bounded timeout, hedging and a circuit breaker.
+
+        Raises:
+            requests.HTTPError: For error status codes (raise_for_status is applied).
+            CircuitOpenError: When the host's breaker is open.
+        """
+        host = urlparse(url).netloc
+        timeout = self._timeout(kwargs.pop("timeout", None))
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        def attempt() -> requests.Response:
+            response = requests.get(url, **kwargs)
+            response.raise_for_status()
+            return response
+
+        if not hedge or kwargs.get("stream"):
+            return self.call(host, attempt)
+        return self.call(host, lambda: self._hedged(host, attempt, timeout))
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """requests.post with deadline-bounded timeout and a circuit breaker. POSTs are never hedged.
+
+        Raises:
+            requests.HTTPError: For error status codes (raise_for_status is applied).
+            CircuitOpenError: When the host's breaker is open.
+        """
+        host = urlparse(url).netloc
+        kwargs["timeout"] = self._timeout(kwargs.pop("timeout", None))
+
+        def attempt() -> requests.Response:
+            response = requests.post(url, **kwargs)
+            response.raise_for_status()
+            return response
+
+        return self.call(host, attempt)
+
+    def _hedged(self, host: str, attempt: Callable[[], requests.Response], timeout: Optional[float]):
+        delay = self.hedge_delay(host)
+        primary = self._pool.submit(attempt)
+        done, _ = wait([primary], timeout=delay if timeout is None else min(delay, timeout))
+        if done:
+            return primary.result()
+
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            # No time left for a second attempt to help
+            try:
+                return primary.result(timeout=remaining)
+            except FuturesTimeoutError as e:
+                _discard(primary)
+                raise requests.Timeout(f"Request to {host} timed out at the turn deadline") from e
+
+        logger.info("Hedging request to %s after %.2fs", host, delay)
+        hedge = self._pool.submit(attempt)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while pending:
+            wait_s = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=wait_s, return_when=FIRST_COMPLETED)
+            if not done:
+                for future in pending:
+                    _discard(future)
+                raise requests.Timeout(f"Hedged request to {host} timed out")
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending | (done - {future}):
+                        _discard(loser)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+
+def _discard(future: Future) -> None:
+    """Cancel a losing attempt, or close its response once it arrives so the connection is reused."""
+    if future.cancel():
+        return
+
+    def close(done: Future) -> None:
+        if done.exception() is None:
+            done.result().close()
+
+    future.add_done_callback(close)
+
+
+# Shared client for all tools, so breakers and latency history are process-wide
+http = ResilientHTTP()
@@ -0,0 +1,88 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass
+class RideWeights:
+    """User-tunable weights and comfort limits for scoring riding hours."""
+
+    temperature: float = 1.0
+    precipitation: float = 1.0
+    wind: float = 1.0
+    daylight: float = 1.0
+    ideal_temp_c: float = 18.0
+    temp_tolerance_c: float = 10.0
+    max_wind_kph: float = 40.0
+
+
+def score_hours(
+    temp_c: np.ndarray,
+    chance_of_rain: np.ndarray,
+    wind_kph: np.ndarray,
+    is_day: np.ndarray,
+    weights: RideWeights = RideWeights(),
+) -> np.ndarray:
+    """Score every hour between 0 (stay home) and 1 (perfect riding weather).
+
+    Each factor is mapped to [0, 1] and the factors are combined as a weighted
+    mean, so inputs of any shape (e.g. cities x hours) are scored in one pass.
+    NaN inputs (padding) produce NaN scores.
+    """
+    temp_score = np.clip(
+        1.0 - np.abs(temp_c - weights.ideal_temp_c) / weights.temp_tolerance_c, 0.0, 1.0
+    )
+    rain_score = 1.0 - np.clip(chance_of_rain, 0.0, 100.0) / 100.0
+    wind_score = np.clip(1.0 - wind_kph / weights.max_wind_kph, 0.0, 1.0)
+    daylight_score = np.asarray(is_day, dtype=np.float64)
+
+    factor_weights = np.array(
+        [weights.temperature, weights.precipitation, weights.wind, weights.daylight],
+        dtype=np.float64,
+    )
+    if factor_weights.sum() <= 0:
+        raise ValueError("At least one ride weight must be positive")
+    factors = np.stack((temp_score, rain_score, wind_score, daylight_score), axis=-1)
+    return factors @ factor_weights / factor_weights.sum()
+
+
+def rolling_mean(scores: np.ndarray, window: int) -> np.ndarray:
+    """Mean over every run of `window` consecutive hours along the last axis.
+
+    Windows that include a NaN hour are NaN, so padded hours never win.
+    """
+    if window < 1:
+        raise ValueError("window must be at least one hour")
+    if scores.shape[-1] < window:
+        return np.empty(scores.shape[:-1] + (0,))
+    # A NaN would poison every later cumulative sum, so sum the NaNs separately
+    missing = np.isnan(scores)
+    zeros = np.zeros(scores.shape[:-1] + (1,))
+    csum = np.concatenate((zeros, np.cumsum(np.where(missing, 0.0, scores), axis=-1)), axis=-1)
+    nans = np.concatenate((zeros, np.cumsum(missing, axis=-1)), axis=-1)
+    means = (csum[..., window:] - csum[..., :-window]) / window
+    means[nans[..., window:] - nans[..., :-window] > 0] = np.nan
+    return means
+
+
+def top_windows(window_scores: np.ndarray, window: int, k: int) -> List[Tuple[int, int, float]]:
+    """Best non-overlapping windows across all rows of a (rows x starts) score matrix.
+
+    Returns:
+        List[tuple]: (row, start hour index, score) triples, best first.
+    """
+    if window < 1:
+        raise ValueError("window must be at least one hour")
+    flat = window_scores.ravel()
+    order = np.argsort(np.where(np.isnan(flat), -np.inf, flat))[::-1]
+    n_starts = window_scores.shape[-1]
+
+    picked: List[Tuple[int, int, float]] = []
+    for idx in order:
+        if np.isnan(flat[idx]) or len(picked) == k:
+            break
+        row, start = divmod(int(idx), n_starts)
+        if any(r == row and abs(s - start) < window for r, s, _ in picked):
+            continue
+        picked.append((row, start, float(flat[idx])))
+    return picked
@@ -0,0 +1,188 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from .geometry import (
+    KM_PER_DEGREE,
+    bounding_box,
+    decode_polyline,
+    path_length_km,
+    point_segment_distances,
+    project,
+    simplify,
+)
+
+
+@dataclass(frozen=True)
+class RouteGeometry:
+    """A simplified route stored as a compact float32 (lat, lon) array."""
+
+    route_id: int
+    name: str
+    coords: np.ndarray
+    bbox: Tuple[float, float, float, float]
+    distance_km: float
+
+    @classmethod
+    def from_polyline(
+        cls, route_id: int, name: str, polyline: str, tolerance_m: float = 25.0
+    ) -> Optional["RouteGeometry"]:
+        """Decode and simplify an encoded polyline; returns None for empty geometries."""
+        coords = decode_polyline(polyline)
+        if len(coords) == 0:
+            return None
+        distance_km = path_length_km(coords)
+        coords = simplify(coords, tolerance_m)
+        return cls(
+            route_id=route_id,
+            name=name,
+            coords=coords.astype(np.float32),
+            bbox=bounding_box(coords),
+            distance_km=round(distance_km, 1),
+        )
+
+
+class RTree:
+    """Static R-tree over bounding boxes, bulk-loaded with Sort-Tile-Recursive packing.
+
+    Each level is stored as a (n, 4) array of node boxes plus the [start, end)
+    range of its children in the level below, so a query walks the tree one level
+    at a time with vectorized box intersection tests instead of per-node recursion.
+    """
+
+    def __init__(self, boxes: np.ndarray, node_capacity: int = 16):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.node_capacity = node_capacity
+        self.size = len(boxes)
+        # levels[0] is the leaf level (one entry per item); levels[-1] is the root
+        self._boxes: List[np.ndarray] = []
+        self._children: List[np.ndarray] = []
+        self._order = np.arange(self.size)
+        if self.size == 0:
+            return
+
+        order = self._str_order(boxes)
+        self._order = order
+        level = boxes[order]
+        self._boxes.append(level)
+        self._children.append(np.empty((0, 2), dtype=np.int64))
+        while len(level) > 1:
+            level, children = self._pack(level)
+            self._boxes.append(level)
+            self._children.append(children)
+
+    def _str_order(self, boxes: np.ndarray) -> np.ndarray:
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        n_slices = max(1, math.ceil(math.sqrt(math.ceil(len(boxes) / self.node_capacity))))
+        slice_size = n_slices * self.node_capacity
+        by_lon = np.argsort(centers[:, 1], kind="stable")
+        order = []
+        for start in range(0, len(boxes), slice_size):
+            chunk = by_lon[start : start + slice_size]
+            order.append(chunk[np.argsort(centers[chunk, 0], kind="stable")])
+        return np.concatenate(order)
+
+    def _pack(self, level: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        starts = np.arange(0, len(level), self.node_capacity)
+        ends = np.minimum(starts + self.node_capacity, len(level))
+        mins = np.minimum.reduceat(level[:, :2], starts, axis=0)
+        maxs = np.maximum.reduceat(level[:, 2:], starts, axis=0)
+        return np.hstack((mins, maxs)), np.column_stack((starts, ends))
+
+    def query(self, box: Tuple[float, float, float, float]) -> np.ndarray:
+        """Indices (into the original boxes) of every box intersecting the query box."""
+        if self.size == 0:
+            return np.empty(0, dtype=np.int64)
+        qmin_lat, qmin_lon, qmax_lat, qmax_lon = box
+        candidates = np.arange(len(self._boxes[-1]))
+        for depth in range(len(self._boxes) - 1, -1, -1):
+            nodes = self._boxes[depth][candidates]
+            hit = (
+                (nodes[:, 0] <= qmax_lat)
+                & (nodes[:, 2] >= qmin_lat)
+                & (nodes[:, 1] <= qmax_lon)
+                & (nodes[:, 3] >= qmin_lon)
+            )
+            candidates = candidates[hit]
+            if depth == 0 or candidates.size == 0:
+                break
+            ranges = self._children[depth][candidates]
+            candidates = np.concatenate([np.arange(s, e) for s, e in ranges])
+        return self._order[candidates]
+
+
+def _expand_box(box, radius_km: float) -> Tuple[float, float, float, float]:
+    min_lat, min_lon, max_lat, max_lon = box
+    lat_pad = radius_km / KM_PER_DEGREE
+    widest = max(abs(min_lat), abs(max_lat))
+    lon_pad = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(widest)), 1e-6))
+    return min_lat - lat_pad, min_lon - lon_pad, max_lat + lat_pad, max_lon + lon_pad
+
+
+class RouteIndex:
+    """Spatial index answering point-radius and corridor queries over many routes."""
+
+    def __init__(self, routes: Iterable[RouteGeometry], node_capacity: int = 16):
+        self.routes: List[RouteGeometry] = [r for r in routes if r is not None]
+        boxes = np.array([r.bbox for r in self.routes], dtype=np.float64)
+        self._tree = RTree(boxes, node_capacity=node_capacity)
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def _min_distances(self, route: RouteGeometry, planar_points: np.ndarray, origin_lat: float) -> np.ndarray:
+        coords = project(route.coords, origin_lat)
+        if len(coords) == 1:
+            return np.linalg.norm(planar_points - coords[0], axis=1)
+        return point_segment_distances(planar_points, coords[:-1], coords[1:]).min(axis=1)
+
+    def query_point(self, lat: float, lon: float, radius_km: float) -> List[Tuple[RouteGeometry, float]]:
+        """Routes passing within radius_km of a point, closest first.
+
+        Returns:
+            List[tuple]: (route, closest approach in km) pairs.
+        """
+        candidates = self._tree.query(_expand_box((lat, lon, lat, lon), radius_km))
+        point = project(np.array([[lat, lon]]), lat)
+        matches = []
+        for idx in candidates:
+            route = self.routes[idx]
+            distance = float(self._min_distances(route, point, lat)[0])
+            if distance <= radius_km:
+                matches.append((route, distance))
+        return sorted(matches, key=lambda m: m[1])
+
+    def query_corridor(
+        self, path: np.ndarray, width_km: float, min_fraction: float = 0.0
+    ) -> List[Tuple[RouteGeometry, float]]:
+        """Routes running along a corridor of width_km around a (lat, lon) path.
+
+        Args:
+            path (np.ndarray): (N, 2) corridor centre line as (lat, lon) pairs.
+            width_km (float): Half-width of the corridor in km.
+            min_fraction (float, optional): Minimum share of a route's vertices that must
+                lie inside the corridor. 0 means touching the corridor is enough.
+        Returns:
+            List[tuple]: (route, fraction inside corridor) pairs, highest fraction first.
+        """
+        path = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+        origin_lat = float(path[:, 0].mean())
+        planar_path = project(path, origin_lat)
+        candidates = self._tree.query(_expand_box(bounding_box(path), width_km))
+
+        matches = []
+        for idx in candidates:
+            route = self.routes[idx]
+            points = project(route.coords, origin_lat)
+            if len(planar_path) == 1:
+                distances = np.linalg.norm(points - planar_path[0], axis=1)
+            else:
+                distances = point_segment_distances(
+                    points, planar_path[:-1], planar_path[1:]
+                ).min(axis=1)
+            inside = distances <= width_km
+            fraction = float(inside.mean())
+            if inside.any() and fraction >= min_fraction:
+                matches.append((route, fraction))
+        return sorted(matches, key=lambda m: -m[1])
@@ -0,0 +1,183 @@
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+from .deadline import remaining_time
+
+
+class Degraded:
+    """A result cut short by the caller's own turn deadline; see `degraded`."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def degraded(value: Any) -> Degraded:
+    """Mark a coalesced function's result as cut short by the turn deadline.
+
+    The caller that ran the function gets `value`. Callers waiting on the same
+    flight, which may have more time left, run the call again instead of
+    sharing an answer they did not earn.
+    """
+    return Degraded(value)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "retry")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.retry = False
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result, or the same exception. Nothing
+    is cached: once the call finishes the next caller starts a fresh one.
+    Waiters share the result object, so treat it as read-only. A waiter
+    gives up with TimeoutError when its own turn deadline passes, even if
+    the call it is waiting for is still running. Results marked with
+    `degraded`, and TimeoutErrors, belong to the caller whose deadline caused
+    them: waiters run the call again rather than share them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Future"] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) unless an identical call is already in flight in any thread."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+
+            if not leader:
+                if not call.done.wait(remaining_time()):
+                    raise TimeoutError(f"Gave up waiting for an identical call in flight ({key!r})")
+                if call.retry:
+                    continue
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                result = fn(*args, **kwargs)
+                if isinstance(result, Degraded):
+                    call.retry = True
+                    return result.value
+                call.result = result
+                return result
+            except TimeoutError:
+                call.retry = True
+                raise
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+    async def ado(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Async variant: concurrent awaits of the same key on one event loop share one task."""
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        while True:
+            with self._lock:
+                future = self._async_calls.get(loop_key)
+                # A finished task may not have been forgotten yet
+                leader = future is None or future.done()
+                if leader:
+                    future = loop.create_task(fn(*args, **kwargs))
+                    self._async_calls[loop_key] = future
+
+                    def _forget(done, loop_key=loop_key):
+                        with self._lock:
+                            if self._async_calls.get(loop_key) is done:
+                                del self._async_calls[loop_key]
+
+                    future.add_done_callback(_forget)
+            # shield so one cancelled or timed-out waiter does not cancel the shared call for everyone else
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), remaining_time())
+            except (asyncio.TimeoutError, TimeoutError):
+                # Not the same class before Python 3.11
+                if not future.done():
+                    raise TimeoutError(f"Gave up waiting for an identical call in flight ({key!r})") from None
+                if leader:
+                    raise
+                continue
+            if isinstance(result, Degraded):
+                if leader:
+                    return result.value
+                continue
+            return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable stand-in for an argument value, used to build call keys."""
+    if isinstance(value, (str, int, float, bool, bytes, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    # Objects such as tool instances are identified by identity
+    return ("id", id(value))
+
+
+def coalesce(fn: Optional[Callable] = None, *, group: Optional[SingleFlight] = None):
+    """Decorator that coalesces concurrent identical calls of a sync or async function.
+
+    Calls are identical when their bound arguments (defaults applied) are equal.
+    Works under LangChain's @tool, which reads the signature and docstring
+    through functools.wraps.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        flight = group or SingleFlight()
+        signature = inspect.signature(func)
+
+        def key_for(args, kwargs) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (func.__qualname__, _freeze(dict(bound.arguments)))
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.ado(key_for(args, kwargs), func, *args, **kwargs)
+
+            async_wrapper.singleflight = flight
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return flight.do(key_for(args, kwargs), func, *args, **kwargs)
+
+        wrapper.singleflight = flight
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
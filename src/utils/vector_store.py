@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Turns a batch of passages (or one query) into a (n, dim) matrix
+Embedder = Callable[[List[str]], np.ndarray]
+
+
+def chunk_words(text: str, size: int = 120, overlap: int = 30) -> List[str]:
+    """Split text into windows of `size` words, each sharing `overlap` words with the previous one."""
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    return [" ".join(words[i : i + size]) for i in range(0, max(1, len(words) - overlap), step)]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means: unit-length centroids of unit vectors, assigned by cosine similarity."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(k):
+            members = vectors[assignment == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # Re-seed an empty list with a random vector
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+    return centroids
+
+
+def _invert(lists: np.ndarray, nlist: int) -> List[np.ndarray]:
+    """The rows of every IVF list (the inverted lists), each in ascending order."""
+    order = np.argsort(lists, kind="stable")
+    bounds = np.searchsorted(lists[order], np.arange(nlist + 1))
+    return [order[bounds[c] : bounds[c + 1]] for c in range(nlist)]
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if len(scores) > k:
+        part = np.argpartition(scores, -k)[-k:]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(scores[part])[::-1]]
+
+
+def _scores(matrix: np.ndarray, query: np.ndarray, ids: Optional[np.ndarray] = None, batch: int = 65_536) -> np.ndarray:
+    """matrix @ query over the rows in `ids` (all rows by default), a block at a time.
+
+    Only one block of an int8 matrix is converted to float32 at once, so the
+    memory saved by quantizing is not spent again on a full float copy.
+    """
+    rows = len(matrix) if ids is None else len(ids)
+    scores = np.empty(rows, dtype=np.float32)
+    for i in range(0, rows, batch):
+        block = matrix[i : i + batch] if ids is None else matrix[ids[i : i + batch]]
+        scores[i : i + batch] = block.astype(np.float32, copy=False) @ query
+    return scores
+
+
+@dataclass
+class Passage:
+    url: str
+    text: str
+    score: float
+
+
+class VectorStore:
+    """Append-only passage store with cosine top-k search, kept on disk in `directory`.
+
+    Files:
+        vectors.f32     unit-length float32 rows, memory-mapped for search
+        passages.jsonl  one {"url", "chunk", "text"} line per row
+        centroids.npy   IVF centroids once the inverted-file index is built
+        lists.i32       the IVF list of each row
+        codes.i8        int8-quantized rows when `quantize` is on
+
+    Adding a document appends rows to these files and assigns them to the
+    nearest existing IVF centroid, so nothing is rebuilt. The rows of each
+    list are also kept in memory, so a search only touches the rows of the
+    lists it probes. The IVF index is
+    built automatically once the store holds `ivf_min_rows` rows; searches
+    then scan only the `nprobe` lists closest to the query. With `quantize`,
+    the scan reads int8 codes (a quarter of the bytes) and the best
+    candidates are re-scored with the float32 rows. A crash mid-append is
+    repaired on open: rows missing from the passages or the vectors are
+    dropped, and IVF lists and codes are rebuilt from the vectors if needed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        embed: Embedder,
+        chunk_size: int = 120,
+        chunk_overlap: int = 30,
+        ivf_min_rows: int = 20_000,
+        nprobe: int = 8,
+        quantize: bool = False,
+    ):
+        self.directory = directory
+        self.embed = embed
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self.quantize = quantize
+        self.dim: Optional[int] = None
+        self._offsets: List[int] = []
+        self._urls: Set[str] = set()
+        self._vectors: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._lists: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._inverted: Optional[List[np.ndarray]] = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _size(self, name: str) -> int:
+        path = self._path(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _load(self) -> None:
+        meta_path = self._path("meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            self.dim = json.load(f)["dim"]
+
+        urls, end = [], 0
+        with open(self._path("passages.jsonl"), "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._offsets.append(end)
+                urls.append(json.loads(line)["url"])
+                end += len(line)
+        # Passages and vectors are the source of truth; IVF lists and codes are derived from them
+        rows = min(len(self._offsets), self._size("vectors.f32") // (4 * self.dim))
+        if rows < len(self._offsets):
+            end = self._offsets[rows]
+            del self._offsets[rows:]
+        self._urls = set(urls[:rows])
+        self._truncate(rows, end)
+        if os.path.exists(self._path("centroids.npy")):
+            self._centroids = np.load(self._path("centroids.npy"))
+        self._remap(rows)
+        if rows == 0:
+            return
+
+        vectors = np.asarray(self._vectors)
+        if self._centroids is not None and (self._lists is None or len(self._lists) != rows):
+            self._assign(vectors).tofile(self._path("lists.i32"))
+        if self.quantize and self._size("codes.i8") != rows * self.dim:
+            self._write_codes(vectors, append=False)
+        self._remap(rows)
+        if self._lists is not None:
+            self._inverted = _invert(np.asarray(self._lists), len(self._centroids))
+
+    def _truncate(self, rows: int, passages_end: int) -> None:
+        """Drop anything past `rows` that an interrupted append left behind."""
+        sizes = {
+            "passages.jsonl": passages_end,
+            "vectors.f32": rows * 4 * self.dim,
+            "lists.i32": rows * 4,
+            "codes.i8": rows * self.dim,
+        }
+        for name, size in sizes.items():
+            if self._size(name) > size:
+                logger.warning("Truncating %s to %d rows after an interrupted write", name, rows)
+                os.truncate(self._path(name), size)
+
+    def _assign(self, vectors: np.ndarray, batch: int = 65_536) -> np.ndarray:
+        """The IVF list (nearest centroid) of each row."""
+        parts = [np.argmax(vectors[i : i + batch] @ self._centroids.T, axis=1) for i in range(0, len(vectors), batch)]
+        return np.concatenate(parts).astype(np.int32)
+
+    def _remap(self, rows: int) -> None:
+        def mapped(name: str, dtype, shape):
+            if rows == 0 or self._size(name) < int(np.prod(shape)) * np.dtype(dtype).itemsize:
+                return None
+            return np.memmap(self._path(name), dtype=dtype, mode="r", shape=shape)
+
+        self._vectors = mapped("vectors.f32", np.float32, (rows, self.dim))
+        self._lists = mapped("lists.i32", np.int32, (rows,)) if self._centroids is not None else None
+        self._codes = mapped("codes.i8", np.int8, (rows, self.dim)) if self.quantize else None
+
+    def _write_codes(self, vectors: np.ndarray, append: bool = True) -> None:
+        codes = np.clip(np.rint(vectors * 127), -127, 127).astype(np.int8)
+        with open(self._path("codes.i8"), "ab" if append else "wb") as f:
+            f.write(codes.tobytes())
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def add_document(self, url: str, text: str) -> int:
+        """Chunk, embed and append one article. Returns the number of passages added (0 if already stored)."""
+        if url in self._urls:
+            return 0
+        chunks = chunk_words(text, self.chunk_size, self.chunk_overlap)
+        if not chunks:
+            return 0
+        # Embed outside the lock; it is the slow part
+        vectors = _normalize(self.embed(chunks))
+
+        with self._lock:
+            if url in self._urls:
+                return 0
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding size changed from {self.dim} to {vectors.shape[1]}")
+
+            # Passages before vectors: on open, passages without a vector are dropped
+            end = self._size("passages.jsonl")
+            with open(self._path("passages.jsonl"), "ab") as f:
+                for i, chunk in enumerate(chunks):
+                    record = {"url": url, "chunk": i, "text": chunk}
+                    line = (json.dumps(record, ensure_ascii=False) + "\n").encode()
+                    f.write(line)
+                    self._offsets.append(end)
+                    end += len(line)
+            first_row = len(self._offsets) - len(chunks)
+            with open(self._path("vectors.f32"), "ab") as f:
+                f.write(vectors.tobytes())
+            if self._centroids is not None:
+                assignment = self._assign(vectors)
+                with open(self._path("lists.i32"), "ab") as f:
+                    f.write(assignment.tobytes())
+                self._extend_inverted(assignment, first_row)
+            if self.quantize:
+                self._write_codes(vectors)
+            self._urls.add(url)
+            self._remap(len(self._offsets))
+            build = self._centroids is None and len(self._offsets) >= self.ivf_min_rows
+
+        if build:
+            self.build_ivf()
+        return len(chunks)
+
+    def _extend_inverted(self, assignment: np.ndarray, first_row: int) -> None:
+        # A new list of lists, so a search holding the old one never sees rows it has no vectors for
+        inverted = list(self._inverted or [np.empty(0, dtype=np.int64)] * len(self._centroids))
+        rows = first_row + np.arange(len(assignment))
+        for c in np.unique(assignment):
+            inverted[c] = np.concatenate((inverted[c], rows[assignment == c]))
+        self._inverted = inverted
+
+    def build_ivf(self, nlist: Optional[int] = None, sample: int = 50_000) -> None:
+        """(Re)build the IVF index: about sqrt(rows) lists, trained on a sample of rows."""
+        with self._lock:
+            rows = len(self._offsets)
+            if rows == 0:
+                return
+            nlist = min(rows, nlist or max(1, int(np.sqrt(rows))))
+            vectors = np.asarray(self._vectors)
+            rng = np.random.default_rng(0)
+            train = vectors[rng.choice(rows, size=min(rows, sample), replace=False)]
+            self._centroids = kmeans(train, nlist)
+            assignment = self._assign(vectors)
+            assignment.tofile(self._path("lists.i32"))
+            self._inverted = _invert(assignment, nlist)
+            np.save(self._path("centroids.npy"), self._centroids)
+            self._remap(rows)
+        logger.info("Built IVF index with %d lists over %d passages", nlist, rows)
+
+    def _read_rows(self, rows: Sequence[int]) -> List[dict]:
+        with open(self._path("passages.jsonl"), "rb") as f:
+            records = []
+            for row in rows:
+                f.seek(self._offsets[row])
+                records.append(json.loads(f.readline()))
+            return records
+
+    def search_vector(self, query: np.ndarray, k: int = 5) -> List[Passage]:
+        with self._lock:
+            vectors, codes, inverted, centroids = self._vectors, self._codes, self._inverted, self._centroids
+        if vectors is None:
+            return []
+        query = _normalize(np.atleast_2d(query))[0]
+
+        ids = None
+        if centroids is not None and inverted is not None:
+            probe = np.argsort(centroids @ query)[-self.nprobe :]
+            # Sorted, so the memory-mapped rows are read in file order
+            ids = np.sort(np.concatenate([inverted[c] for c in probe]))
+        scores = _scores(codes if codes is not None else vectors, query, ids)
+        if ids is None:
+            ids = np.arange(len(vectors))
+
+        if codes is not None:
+            # Coarse scores from the int8 codes, then exact re-scoring of the best few
+            keep = _top(scores, 4 * k)
+            ids = ids[keep]
+            scores = vectors[ids] @ query
+
+        top = _top(scores, k)
+        hits = [int(ids[i]) for i in top]
+        return [
+            Passage(url=record["url"], text=record["text"], score=round(float(scores[i]), 4))
+            for record, i in zip(self._read_rows(hits), top)
+        ]
+
+    def search(self, query: str, k: int = 5) -> List[Passage]:
+        """The k passages most similar to the query."""
+        if not self._offsets:
+            return []
+        return self.search_vector(self.embed([query]), k)
@@ -0,0 +1,20 @@
+import pytest
+import src.tools.tools as tools
+from src.utils.resilience import http
+
+
+@pytest.fixture(autouse=True)
+def reset_tool_caches():
+    """Keep cached tool results from leaking between tests."""
+    for cache in (tools._weather_cache, tools._search_cache, tools._rental_cache, tools._place_cache):
+        cache.clear()
+    tools._weatherapi_bulk_available = None
+    tools._article_index.clear()
+    http.reset()
+    yield
+    for cache in (tools._weather_cache, tools._search_cache, tools._rental_cache, tools._place_cache):
+        cache.clear()
+    tools._article_index.clear()
+    if tools._refresher is not None:
+        tools._refresher.stop()
+        tools._refresher.clear()
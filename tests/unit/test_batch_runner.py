@@ -0,0 +1,122 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+from langchain.tools import tool
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.messages import AIMessage
+from src.agents.batch_runner import BatchRunner, TraceCallback, completed_ids, read_questions
+from src.tools.result_encoding import CompactResultTool
+from src.utils.deadline import remaining_time
+
+
+class FakeAgent:
+    """Async agent stub that records concurrency and reports a tool call and token usage."""
+
+    def __init__(self, delay=0.05, fail_on=()):
+        self.delay = delay
+        self.fail_on = set(fail_on)
+        self.active = 0
+        self.max_active = 0
+        self.deadlines = []
+
+    async def ainvoke(self, inputs, config=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.deadlines.append(remaining_time())
+        try:
+            trace = config["callbacks"][0]
+            trace.on_tool_start({"name": "get_weather_now"}, "Girona", run_id="t")
+            await asyncio.sleep(self.delay)
+            trace.on_tool_end("Sunny", run_id="t")
+            message = AIMessage(content="ok", usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+            trace.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+            if inputs["input"] in self.fail_on:
+                raise RuntimeError("model down")
+            return {"output": f"answer to {inputs['input']}"}
+        finally:
+            self.active -= 1
+
+
+def session(agent):
+    return MagicMock(router=None, agent=agent, _run_climb_fast_path=MagicMock(return_value=None))
+
+
+def write_questions(path, questions):
+    path.write_text("\n".join(json.dumps(q) for q in questions) + "\n")
+
+
+class TestReadQuestions:
+    def test_accepts_alternative_keys_and_defaults_ids(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        path.write_text('{"request_id": "r1", "body": "a"}\n\n{"input": "b"}\n{"note": "no question"}\n')
+        assert list(read_questions(str(path))) == [
+            {"id": "r1", "question": "a"},
+            {"id": "3", "question": "b"},
+        ]
+
+
+class TestBatchRunner:
+    def test_writes_results_with_traces_and_bounded_concurrency(self, tmp_path):
+        questions, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_questions(questions, [{"id": f"q{i}", "question": f"question {i}"} for i in range(10)])
+        agent = FakeAgent()
+
+        summary = asyncio.run(BatchRunner(session(agent), concurrency=3, deadline_s=30).run(str(questions), str(output)))
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert summary == {"skipped": 0, "answered": 10, "failed": 0}
+        assert sorted(r["id"] for r in records) == sorted(f"q{i}" for i in range(10))
+        assert agent.max_active == 3
+        record = records[0]
+        assert record["output"].startswith("answer to")
+        assert record["tokens"] == {"input": 10, "output": 5, "total": 15}
+        assert record["llm_calls"] == 1
+        assert record["tools"][0]["tool"] == "get_weather_now"
+        assert record["seconds"] > 0
+        assert all(d is not None and d <= 30 for d in agent.deadlines)
+
+    def test_resumes_and_retries_failures(self, tmp_path):
+        questions, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_questions(questions, [{"id": i, "question": f"q{i}"} for i in range(4)])
+        asyncio.run(BatchRunner(session(FakeAgent(fail_on={"q2"}))).run(str(questions), str(output)))
+        # Simulate a crash mid-write
+        with open(output, "a") as f:
+            f.write('{"id": "3", "quest')
+        assert completed_ids(str(output)) == {"0", "1", "3"}
+
+        agent = FakeAgent()
+        summary = asyncio.run(BatchRunner(session(agent)).run(str(questions), str(output)))
+        assert summary == {"skipped": 3, "answered": 1, "failed": 0}
+        assert len(agent.deadlines) == 1
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert records[-1]["id"] == "2" and "error" not in records[-1]
+        # The failed attempt and the cut-short line are gone: one record per id
+        assert sorted(r["id"] for r in records) == ["0", "1", "2", "3"]
+
+    def test_climb_fast_path_is_used_first(self, tmp_path):
+        questions, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+        write_questions(questions, [{"id": "c", "question": "Climbs near Girona"}])
+        agent = FakeAgent()
+        s = session(agent)
+        s._run_climb_fast_path.return_value = {"output": "Rocacorba", "climbs": [], "sources": []}
+        asyncio.run(BatchRunner(s).run(str(questions), str(output)))
+        record = json.loads(output.read_text())
+        assert record["path"] == "climb_fast_path" and record["output"] == "Rocacorba"
+        assert agent.deadlines == []
+        # The fast path reports its tool and model calls to the question's trace
+        trace = s._run_climb_fast_path.call_args.kwargs["config"]["callbacks"][0]
+        assert isinstance(trace, TraceCallback)
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return f"result for {query}"
+
+
+class TestTraceCallback:
+    def test_wrapped_tools_are_traced_once(self):
+        trace = TraceCallback()
+        CompactResultTool(lookup).invoke({"query": "Girona"}, config={"callbacks": [trace]})
+        assert [t["tool"] for t in trace.tools] == ["lookup"]
+        assert "result for Girona" in trace.tools[0]["output"]
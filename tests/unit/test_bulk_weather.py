@@ -0,0 +1,116 @@
+import os
+import time
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from src.utils.cache import TTLCache
+import src.tools.tools as tools
+from src.tools.tools import get_weather_bulk, get_weather_now
+
+
+def current_payload(name, temp=20.0):
+    return {
+        "location": {"name": name, "country": "Spain"},
+        "current": {
+            "condition": {"text": "Sunny"},
+            "temp_c": temp,
+            "humidity": 40,
+            "wind_kph": 10.0,
+        },
+    }
+
+
+def respond_with_city(url, params, **kwargs):
+    response = MagicMock()
+    response.json.return_value = current_payload(params["q"])
+    return response
+
+
+class TestTTLCache:
+    def test_get_and_expiry(self):
+        cache = TTLCache(ttl_s=0.05)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        time.sleep(0.06)
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache and "c" in cache and "b" not in cache
+
+
+class TestBulkWeather:
+    @patch("src.tools.tools.requests.post")
+    @patch("src.tools.tools.requests.get")
+    def test_falls_back_to_concurrent_requests(self, mock_get, mock_post):
+        mock_post.side_effect = requests.HTTPError("403 bulk not on plan")
+        mock_get.side_effect = respond_with_city
+
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            table = get_weather_bulk.invoke({"cities": ["Girona", "Olot", "Vic"]})
+
+        lines = table.splitlines()
+        assert lines[0].startswith("city | condition")
+        assert len(lines) == 4
+        assert mock_get.call_count == 3
+        assert tools._weatherapi_bulk_available is False
+
+    @patch("src.tools.tools.requests.post")
+    @patch("src.tools.tools.requests.get")
+    def test_uses_bulk_request_when_available(self, mock_get, mock_post):
+        bulk_response = MagicMock()
+        bulk_response.json.return_value = {
+            "bulk": [
+                {"query": {"custom_id": "0", "q": "Girona", **current_payload("Girona")}},
+                {"query": {"custom_id": "1", "q": "Olot", **current_payload("Olot")}},
+            ]
+        }
+        mock_post.return_value = bulk_response
+
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            table = get_weather_bulk.invoke({"cities": ["Girona", "Olot"]})
+
+        mock_post.assert_called_once()
+        assert mock_post.call_args[1]["params"]["q"] == "bulk"
+        # Bounded by the client's timeout like every GET
+        assert mock_post.call_args[1]["timeout"] == tools.http.timeout_s
+        mock_get.assert_not_called()
+        assert "Olot | Sunny | 20.0" in table
+
+    @patch("src.tools.tools.requests.post")
+    @patch("src.tools.tools.requests.get")
+    def test_fresh_locations_are_not_refetched(self, mock_get, mock_post):
+        mock_get.side_effect = respond_with_city
+
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            get_weather_now.invoke({"city": "Girona"})
+            get_weather_bulk.invoke({"cities": ["girona", "Olot"]})
+
+        mock_post.assert_not_called()
+        assert [c[1]["params"]["q"] for c in mock_get.call_args_list] == ["Girona", "Olot"]
+
+    @patch("src.tools.tools.requests.post")
+    @patch("src.tools.tools.requests.get")
+    def test_failed_city_does_not_fail_table(self, mock_get, mock_post):
+        mock_post.side_effect = requests.HTTPError("403")
+
+        def respond(url, params, **kwargs):
+            if params["q"] == "Atlantis":
+                raise requests.ConnectionError("boom")
+            return respond_with_city(url, params)
+
+        mock_get.side_effect = respond
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            table = get_weather_bulk.invoke({"cities": ["Girona", "Atlantis"]})
+
+        assert "Girona | Sunny" in table
+        assert "Atlantis | error" in table
+
+    def test_missing_key(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="Missing WEATHERAPI_KEY"):
+                get_weather_bulk.invoke({"cities": ["Girona"]})
@@ -0,0 +1,122 @@
+import time
+import numpy as np
+import pytest
+import os
+from unittest.mock import patch, MagicMock
+from src.utils.climb_detection import detect_climbs, smooth, streams_to_arrays
+from src.tools.tools import StravaClimbsTool
+
+
+def synthetic_stream(n_points=2000, total_km=20.0):
+    """Flat, then a 5 km climb at 6%, then flat again."""
+    distance = np.linspace(0, total_km * 1000, n_points)
+    altitude = np.full_like(distance, 100.0)
+    climbing = (distance >= 5000) & (distance < 10000)
+    altitude[climbing] += (distance[climbing] - 5000) * 0.06
+    altitude[distance >= 10000] += 300.0
+    return distance, altitude
+
+
+class TestClimbDetection:
+    def test_detects_single_climb(self):
+        distance, altitude = synthetic_stream()
+        climbs = detect_climbs(distance, altitude)
+
+        assert len(climbs) == 1
+        climb = climbs[0]
+        assert climb["distance_km"] == pytest.approx(5.0, abs=0.2)
+        assert climb["elevation_gain_m"] == pytest.approx(300, abs=10)
+        assert climb["average_gradient"] == pytest.approx(6.0, abs=0.3)
+        assert climb["max_gradient"] >= climb["average_gradient"]
+        assert climb["start_km"] == pytest.approx(5.0, abs=0.2)
+
+    def test_flat_stream_has_no_climbs(self):
+        distance = np.linspace(0, 10000, 500)
+        altitude = np.full_like(distance, 50.0)
+        assert detect_climbs(distance, altitude) == []
+
+    def test_short_dip_is_merged_into_one_climb(self):
+        distance = np.arange(0, 6000, 5.0)
+        gradient = np.where((distance > 2000) & (distance < 2100), 0.0, 0.08)
+        altitude = np.concatenate(([0.0], np.cumsum(gradient[:-1] * 5.0)))
+        climbs = detect_climbs(distance, altitude, max_gap_m=200)
+        assert len(climbs) == 1
+
+    def test_noise_does_not_create_climbs(self):
+        rng = np.random.default_rng(0)
+        distance = np.linspace(0, 10000, 5000)
+        altitude = 100 + rng.normal(0, 0.5, distance.size)
+        assert detect_climbs(distance, altitude) == []
+
+    def test_mismatched_streams_raise(self):
+        with pytest.raises(ValueError, match="same length"):
+            detect_climbs(np.arange(10), np.arange(5))
+
+    def test_smooth_keeps_length(self):
+        values = np.arange(100, dtype=float)
+        assert smooth(values, 9).shape == values.shape
+
+    def test_large_activity_is_fast(self):
+        distance, altitude = synthetic_stream(n_points=150_000, total_km=200.0)
+        detect_climbs(distance, altitude)  # warm up
+        start = time.perf_counter()
+        climbs = detect_climbs(distance, altitude)
+        elapsed = time.perf_counter() - start
+        assert len(climbs) == 1
+        assert elapsed < 0.25
+
+    def test_streams_to_arrays_formats(self):
+        as_list = [
+            {"type": "distance", "data": [0, 10, 20]},
+            {"type": "altitude", "data": [1, 2, 3]},
+        ]
+        as_dict = {"distance": {"data": [0, 10, 20]}, "altitude": {"data": [1, 2, 3]}}
+        for payload in (as_list, as_dict):
+            distance, altitude = streams_to_arrays(payload)
+            assert distance.tolist() == [0, 10, 20]
+            assert altitude.tolist() == [1, 2, 3]
+        assert streams_to_arrays([{"type": "distance", "data": [0, 1]}]) is None
+
+
+class TestStravaClimbsTool:
+    @patch("src.tools.tools.requests.get")
+    def test_run_with_route_ids(self, mock_get):
+        distance, altitude = synthetic_stream()
+        mock_response = MagicMock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = [
+            {"type": "distance", "data": distance.tolist()},
+            {"type": "altitude", "data": altitude.tolist()},
+        ]
+        mock_get.return_value = mock_response
+
+        with patch.dict(os.environ, {"STRAVA_ACCESS_TOKEN": "valid_token"}):
+            tool = StravaClimbsTool()
+            result = tool._run(ids=[1, 2])
+
+        assert mock_get.call_count == 2
+        assert "routes/1/streams" in mock_get.call_args_list[0][0][0]
+        assert len(result) == 2
+        climb = result[0]["climbs"][0]
+        assert set(climb) >= {"name", "distance_km", "elevation_gain_m", "average_gradient"}
+        assert climb["elevation_gain_m"] == pytest.approx(300, abs=10)
+
+    @patch("src.tools.tools.requests.get")
+    def test_run_lists_activities_when_no_ids(self, mock_get):
+        list_response = MagicMock()
+        list_response.json.return_value = [{"id": 7, "name": "Morning Ride"}]
+        streams_response = MagicMock()
+        streams_response.json.return_value = {"distance": {"data": []}}
+        mock_get.side_effect = [list_response, streams_response]
+
+        with patch.dict(os.environ, {"STRAVA_ACCESS_TOKEN": "valid_token"}):
+            result = StravaClimbsTool()._run(source="activities")
+
+        assert "athlete/activities" in mock_get.call_args_list[0][0][0]
+        assert mock_get.call_args_list[1][1]["params"]["key_by_type"] == "true"
+        assert result[0]["message"] == "No elevation data."
+
+    def test_run_no_access_token(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="STRAVA_ACCESS_TOKEN"):
+                StravaClimbsTool()._run()
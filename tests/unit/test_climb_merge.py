@@ -0,0 +1,87 @@
+from src.utils.climb_merge import ClimbMergeIndex, merge_climbs, name_key
+
+
+def climb(name, **stats):
+    return {"name": name, **stats}
+
+
+class TestNameKey:
+    def test_spellings_of_one_climb_share_a_key(self):
+        keys = {name_key(n)[0] for n in ["Alpe d'Huez", "Alpe-d'Huez", "L'Alpe d'Huez (from Bourg)", "ALPE D’HUEZ"]}
+        assert keys == {"alpe d huez"}
+
+    def test_generic_prefixes_and_accents_are_dropped(self):
+        assert name_key("Col de la Madeleine")[0] == name_key("La Madeleine")[0] == "madeleine"
+        assert name_key("Els Àngels")[0] == "angels"
+
+    def test_qualifier_names_the_ascent(self):
+        assert name_key("Mont Ventoux from Bédoin") == ("ventoux", "bedoin")
+        assert name_key("Mont Ventoux (from Bédoin)") == ("ventoux", "bedoin")
+
+
+class TestMergeClimbs:
+    def test_spelling_variants_become_one_record_with_sources(self):
+        records = merge_climbs(
+            [
+                ("a", [climb("Alpe d'Huez", distance_km=13.8, average_gradient=8.1, location="Isère")]),
+                ("b", [climb("Alpe-d'Huez", distance_km=13.9, average_gradient=8.0, elevation_gain_m=1120)]),
+                ("c", [climb("L'Alpe d'Huez (from Bourg)", distance_km=14.5, average_gradient=7.9)]),
+            ]
+        )
+        assert len(records) == 1
+        record = records[0]
+        assert record["name"] == "Alpe d'Huez"
+        assert record["sources"] == ["a", "b", "c"]
+        assert (record["distance_km"], record["average_gradient"], record["elevation_gain_m"]) == (13.9, 8.0, 1120)
+        assert record["location"] == "Isère"
+
+    def test_field_attribution_and_confidence(self):
+        records = merge_climbs(
+            [
+                ("a", [climb("Rocacorba", distance_km=13.8, max_gradient=15.0)]),
+                ("b", [climb("rocacorba", distance_km=13.8)]),
+                ("c", [climb("Rocacorba", distance_km=12.0)]),
+            ],
+            detail=True,
+        )
+        record = records[0]
+        # Two of three sources agree on the length; the outlier is outvoted
+        assert record["distance_km"] == 13.8
+        assert record["field_sources"]["distance_km"] == ["a", "b"]
+        assert record["field_confidence"] == {"distance_km": 0.5, "max_gradient": 0.5}
+        assert record["aliases"] == ["rocacorba"]
+
+    def test_typos_match_through_the_trigram_index(self):
+        records = merge_climbs([("a", [climb("Mare de Deu del Mont")]), ("b", [climb("Mare de Déu del Mount")])])
+        assert len(records) == 1
+
+    def test_different_ascents_stay_apart(self):
+        records = merge_climbs(
+            [
+                ("a", [climb("Mont Ventoux (from Bédoin)", distance_km=21.5)]),
+                ("b", [climb("Mont Ventoux (from Malaucène)", distance_km=21.2)]),
+                ("c", [climb("Mont Ventoux", distance_km=21.4)]),
+            ]
+        )
+        assert [r["name"] for r in records] == ["Mont Ventoux (from Bédoin)", "Mont Ventoux (from Malaucène)"]
+        assert records[0]["sources"] == ["a", "c"]
+
+    def test_same_name_with_very_different_length_is_another_climb(self):
+        records = merge_climbs(
+            [("a", [climb("Coll de Rates", distance_km=6.5)]), ("b", [climb("Rates", distance_km=14.0)])]
+        )
+        assert len(records) == 2
+
+    def test_non_climb_items_are_ignored(self):
+        assert merge_climbs([("a", ["Error parsing JSON from LLM output", {"name": None}])]) == []
+
+
+class TestClimbMergeIndex:
+    def test_unrelated_names_are_not_candidates(self):
+        index = ClimbMergeIndex()
+        names = ["Rocacorba", "Els Angels", "Santa Pellaia", "Mare de Deu del Mont", "Coll de Rates", "Tourmalet"]
+        for name in names:
+            index.add(climb(name), "a")
+        assert index.match(climb("Madeleine")) is None
+        assert index.match(climb("Col du Tourmalet")) == 5
+        assert index.match(climb("Santa Pellaya")) == 2
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.messages import AIMessage
+from src.agents.climb_pipeline import ClimbPipeline, detect_climb_intent
+
+
+def fake_tool(fn):
+    tool = MagicMock()
+    tool.invoke.side_effect = fn
+    return tool
+
+
+ARTICLES = {
+    "https://a.example/climbs": [
+        {"name": "Rocacorba", "location": "Girona", "distance_km": 13.8, "elevation_gain_m": 800, "average_gradient": 6.5, "max_gradient": None},
+        {"name": "Els Angels", "location": "Girona", "distance_km": 10.5, "elevation_gain_m": 400, "average_gradient": 4.0, "max_gradient": None},
+    ],
+    "https://b.example/climbs": [
+        {"name": "rocacorba", "location": "Girona", "distance_km": 13.8, "elevation_gain_m": 800, "average_gradient": 6.5, "max_gradient": 15.0},
+        "Error parsing JSON from LLM output",
+    ],
+}
+
+
+def pipeline(model=None, urls=None):
+    model = model or MagicMock(invoke=MagicMock(return_value=AIMessage(content="Ride Rocacorba.")))
+    search = fake_tool(lambda args, config=None: urls if urls is not None else list(ARTICLES))
+    extract = fake_tool(lambda args, config=None: ARTICLES[args["url"]])
+    return ClimbPipeline(lambda: model, search_tool=search, extract_tool=extract), model, search, extract
+
+
+class TestDetectClimbIntent:
+    def test_recognises_climb_lookup_with_filters(self):
+        intent = detect_climb_intent("Find climbs near Girona steeper than 5% and longer than 8 km within 30 km")
+        assert intent.location == "Girona"
+        assert intent.min_gradient == 5.0
+        assert intent.min_length_km == 8.0
+        assert intent.radius_km == 30
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "What's the weather like for climbs near Girona?",
+            "Plan a trip with climbs near Girona",
+            "Show the climbs in my routes",
+            "tell me about climbing",
+            "what are good climbs?",
+        ],
+    )
+    def test_unsure_or_mixed_turns_are_left_to_the_agent(self, text):
+        assert detect_climb_intent(text) is None
+
+
+class TestClimbPipeline:
+    def test_single_model_call_over_merged_filtered_climbs(self):
+        climbs, model, search, extract = pipeline()
+        result = climbs.run("Which climbs near Girona are steeper than 5%?")
+
+        assert result["output"] == "Ride Rocacorba."
+        assert model.invoke.call_count == 1
+        assert extract.invoke.call_count == 2
+        assert search.invoke.call_args[0][0]["location"] == "Girona"
+        # Duplicates across articles are merged and missing stats filled in
+        assert [c["name"] for c in result["climbs"]] == ["Rocacorba"]
+        assert result["climbs"][0]["max_gradient"] == 15.0
+        prompt = model.invoke.call_args[0][0][-1][1]
+        assert "Rocacorba" in prompt and "https://b.example/climbs" in prompt
+
+    def test_falls_back_when_intent_unclear(self):
+        climbs, model, search, _ = pipeline()
+        assert climbs.run("Tell me about the weather in Girona") is None
+        search.invoke.assert_not_called()
+        model.invoke.assert_not_called()
+
+    def test_falls_back_when_nothing_found(self):
+        climbs, model, _, _ = pipeline(urls=["No search results found for cycling climbs near Nowhere."])
+        assert climbs.run("Climbs near Nowhere") is None
+        model.invoke.assert_not_called()
+
+
+class TestClimbPipelineStream:
+    def test_pages_are_reported_as_they_finish(self):
+        import threading
+
+        release_slow = threading.Event()
+
+        def extract(args, config=None):
+            if args["url"] == "https://a.example/climbs":
+                release_slow.wait(2)
+            return ARTICLES[args["url"]]
+
+        climbs, model, _, _ = pipeline()
+        climbs.extract_tool = fake_tool(extract)
+        events = climbs.stream("Climbs near Girona")
+
+        assert next(events).kind == "sources"
+        first = next(events)
+        # The fast page arrives while the slow one is still pending
+        assert (first.kind, first.url, first.pending) == ("page", "https://b.example/climbs", 1)
+        assert model.invoke.call_count == 0
+        release_slow.set()
+        rest = list(events)
+        assert [e.kind for e in rest] == ["page", "answer"]
+        # The merge follows search order, not completion order
+        assert rest[-1].climbs[0]["sources"] == ["https://a.example/climbs", "https://b.example/climbs"]
+
+    def test_unclear_turn_streams_a_fallback(self):
+        climbs, _, search, _ = pipeline()
+        assert [e.kind for e in climbs.stream("hello")] == ["fallback"]
+        search.invoke.assert_not_called()
@@ -0,0 +1,177 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+import src.tools.tools as tools
+from src.utils.climb_query import ClimbCatalog, ClimbTable, catalog_scope, category_rank, fiets_index
+from src.utils.deadline import deadline_scope, remaining_time
+
+
+def climb(name, location=None, **stats):
+    return {"name": name, "location": location, **stats}
+
+
+CLIMBS = [
+    climb("Alpe d'Huez", "Bourg-d'Oisans", distance_km=13.8, elevation_gain_m=1071, average_gradient=7.8, top_altitude_m=1850),
+    climb("Rocacorba", "Girona", distance_km=13.8, elevation_gain_m=800, average_gradient=5.8),
+    climb("Els Àngels", "Girona", distance_km=10.7, average_gradient=4.1),
+    climb("Sant Grau", "Tossa de Mar", distance_km=8.2, elevation_gain_m=420),
+    climb("Mystery hill"),
+]
+
+POINTS = {"Girona": (41.98, 2.82), "Bourg-d'Oisans": (45.05, 6.03), "Tossa de Mar": (41.72, 2.93)}
+
+
+def names(rows):
+    return [r["name"] for r in rows]
+
+
+class TestDifficulty:
+    def test_fiets_index_of_alpe_d_huez(self):
+        score = fiets_index(np.array([1071.0]), np.array([13.8]), np.array([1850.0]))
+        assert score[0] == pytest.approx(9.16, abs=0.01)
+
+    def test_altitude_term_only_counts_above_1000_m(self):
+        low = fiets_index(np.array([500.0, 500.0]), np.array([10.0, 10.0]), np.array([800.0, np.nan]))
+        assert low[0] == low[1] == pytest.approx(2.5)
+
+    def test_categories(self):
+        ranks = category_rank(np.array([13.8, 5.0, 2.0, 1.0, np.nan]), np.array([7.8, 7.0, 5.0, 3.0, 6.0]))
+        assert ranks.tolist() == [5, 3, 1, 0, -1]
+
+
+class TestClimbTable:
+    def test_missing_stats_are_derived(self):
+        table = ClimbTable(CLIMBS)
+        rows = {r["name"]: r for r in table.query(k=10)}
+        assert rows["Els Àngels"]["elevation_gain_m"] == 439
+        assert rows["Sant Grau"]["average_gradient"] == 5.1
+        assert set(rows["Mystery hill"]) == {"name"}
+
+    def test_default_order_is_hardest_first_with_unknowns_last(self):
+        rows = ClimbTable(CLIMBS).query()
+        assert names(rows) == ["Alpe d'Huez", "Rocacorba", "Sant Grau", "Els Àngels", "Mystery hill"]
+        assert rows[0]["fiets"] == 9.2 and rows[0]["category"] == "HC"
+
+    def test_filters_exclude_unknown_values(self):
+        table = ClimbTable(CLIMBS)
+        assert names(table.query(min_gradient=5, max_length_km=13.8)) == ["Alpe d'Huez", "Rocacorba", "Sant Grau"]
+        assert names(table.query(min_gain_m=500, max_gain_m=900)) == ["Rocacorba"]
+        assert names(table.query(min_category="1")) == ["Alpe d'Huez", "Rocacorba"]
+
+    def test_top_k_and_ascending_sort(self):
+        table = ClimbTable(CLIMBS)
+        assert names(table.query(sort_by="distance_km", descending=False, k=2)) == ["Sant Grau", "Els Àngels"]
+        assert names(table.query(sort_by="average_gradient", k=1)) == ["Alpe d'Huez"]
+
+    def test_distance_from_a_point(self):
+        shared = ClimbTable(CLIMBS)
+        table = shared.located(POINTS.get)
+        assert np.isnan(shared.columns["lat"]).all()
+        rows = table.query(near=POINTS["Girona"], within_km=50, sort_by="distance_from_km", descending=False)
+        assert names(rows) == ["Rocacorba", "Els Àngels", "Sant Grau"]
+        assert rows[0]["distance_from_km"] == 0.0 and 25 < rows[2]["distance_from_km"] < 35
+
+    def test_places_are_geocoded_concurrently(self):
+        budgets = []
+
+        def slow_geocode(place):
+            budgets.append(remaining_time())
+            time.sleep(0.2)
+            return POINTS.get(place)
+
+        start = time.perf_counter()
+        with deadline_scope(10):
+            table = ClimbTable(CLIMBS).located(slow_geocode)
+        assert time.perf_counter() - start < 0.5
+        assert np.isfinite(table.columns["lat"]).sum() == 4
+        # Three distinct places, each geocoded once under the caller's deadline
+        assert len(budgets) == 3 and all(b is not None for b in budgets)
+
+    def test_bad_arguments(self):
+        table = ClimbTable(CLIMBS)
+        with pytest.raises(ValueError):
+            table.query(sort_by="name")
+        with pytest.raises(ValueError):
+            table.query(sort_by="distance_from_km")
+        with pytest.raises(ValueError):
+            table.query(min_category="5")
+
+
+class TestClimbCatalog:
+    def test_sources_are_merged_and_the_table_is_reused(self):
+        catalog = ClimbCatalog()
+        catalog.add("a", [CLIMBS[1]])
+        catalog.add("b", [dict(CLIMBS[1], name="Rocacorba (from Banyoles)"), "not a climb"])
+        table = catalog.table()
+        assert catalog.table() is table
+        assert table.query()[0]["sources"] == ["a", "b"]
+
+        catalog.add("c", [CLIMBS[0]])
+        assert catalog.table() is not table and len(catalog.table()) == 2
+
+    def test_oldest_sources_are_evicted(self):
+        catalog = ClimbCatalog(max_sources=2)
+        for source, c in zip("abc", CLIMBS):
+            catalog.add(source, [c])
+        assert len(catalog) == 2
+        assert "Alpe d'Huez" not in names(catalog.table().query())
+
+    def test_old_sources_expire(self):
+        catalog = ClimbCatalog(max_age_s=60)
+        catalog.add("a", [CLIMBS[0]])
+        catalog.add("b", [CLIMBS[1]])
+        with patch("src.utils.climb_query.time.monotonic", return_value=catalog._per_source["b"][0] + 61):
+            assert len(catalog) == 0
+            assert len(catalog.table()) == 0
+
+
+@pytest.fixture
+def catalog():
+    with catalog_scope(ClimbCatalog()) as catalog:
+        yield catalog
+
+
+class TestQueryClimbsTool:
+    def test_asks_for_extraction_first(self, catalog):
+        result = tools.query_climbs.invoke({})
+        assert "scrape_and_extract_climb_stats" in result[0]["message"]
+
+    def test_returns_only_matching_rows(self, catalog):
+        catalog.add("https://a.example", CLIMBS[:2])
+        catalog.add("https://b.example", CLIMBS[2:])
+        with patch.object(tools, "_place_coordinates", side_effect=POINTS.get):
+            result = tools.query_climbs.invoke({"near": "Girona", "within_km": 40, "min_gradient": 5})
+        assert names(result) == ["Rocacorba", "Sant Grau"]
+        assert result[0]["sources"] == ["https://a.example"]
+
+    def test_reports_unknown_places_and_empty_results(self, catalog):
+        catalog.add("https://a.example", CLIMBS)
+        with patch.object(tools, "_place_coordinates", return_value=None):
+            assert "Could not find" in tools.query_climbs.invoke({"near": "Atlantis"})[0]["message"]
+        assert "None of the 5 climbs" in tools.query_climbs.invoke({"min_gradient": 20})[0]["message"]
+        assert "sort_by" in tools.query_climbs.invoke({"sort_by": "name"})[0]["message"]
+
+    def test_sessions_do_not_see_each_others_climbs(self, catalog):
+        tools._catalogue("https://a.example", CLIMBS[:1])
+        with catalog_scope(ClimbCatalog()):
+            assert "scrape_and_extract_climb_stats" in tools.query_climbs.invoke({})[0]["message"]
+        assert len(catalog) == 1
+
+    @patch("src.tools.tools.requests.get")
+    def test_places_are_geocoded_through_the_resilient_client_and_cached(self, mock_get):
+        response = MagicMock()
+        response.json.return_value = [{"lat": "41.98", "lon": "2.82"}]
+        mock_get.return_value = response
+
+        assert tools._place_coordinates("Girona") == (41.98, 2.82)
+        assert tools._place_coordinates(" girona ") == (41.98, 2.82)
+        assert mock_get.call_count == 1
+
+    @patch("src.tools.tools.requests.get")
+    def test_geocoding_is_skipped_when_the_turn_is_almost_over(self, mock_get):
+        with deadline_scope(1.0):
+            assert tools._place_coordinates("Girona") is None
+        mock_get.assert_not_called()
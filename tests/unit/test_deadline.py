@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from langchain.tools import tool
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from src.agents.deadline_executor import create_deadline_agent_executor
+from src.tools.result_encoding import compact_tools
+from src.tools.tools import scrape_and_extract_climb_stats
+from src.utils.deadline import bind_deadline, deadline_scope, remaining_time
+
+
+@tool
+def slow_lookup(query: str) -> str:
+    """Look something up slowly."""
+    time.sleep(0.1)
+    return f"result for {query}"
+
+
+def looping_agent():
+    """An agent that never finishes on its own: it always asks for another lookup."""
+    return RunnableLambda(
+        lambda inputs: [AgentAction(tool="slow_lookup", tool_input={"query": inputs["input"]}, log="")]
+    )
+
+
+class TestDeadlineScope:
+    def test_scope_sets_and_resets(self):
+        assert remaining_time() is None
+        with deadline_scope(5.0):
+            assert 4.9 < remaining_time() <= 5.0
+        assert remaining_time() is None
+
+    def test_bind_deadline_carries_into_worker_threads(self):
+        with deadline_scope(5.0):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                plain = pool.submit(remaining_time).result()
+                bound = pool.submit(bind_deadline(remaining_time)).result()
+        assert plain is None
+        assert bound is not None and bound > 4.0
+
+
+class TestDeadlineAgentExecutor:
+    def test_stops_and_answers_from_partial_results(self):
+        model = MagicMock()
+        model.invoke.return_value = AIMessage(content="Partial answer")
+        executor = create_deadline_agent_executor(
+            model, looping_agent(), compact_tools([slow_lookup]), answer_reserve_s=0.0
+        )
+
+        start = time.perf_counter()
+        with deadline_scope(0.35):
+            result = executor.invoke({"input": "Girona"})
+
+        assert time.perf_counter() - start < 1.0
+        assert result["output"] == "Partial answer"
+        messages = model.invoke.call_args[0][0]
+        assert "result for Girona" in messages[-1][1]
+
+    def test_falls_back_to_summary_when_model_fails(self):
+        model = MagicMock()
+        model.invoke.side_effect = RuntimeError("model down")
+        executor = create_deadline_agent_executor(
+            model, looping_agent(), [slow_lookup], answer_reserve_s=0.0
+        )
+        with deadline_scope(0.15):
+            result = executor.invoke({"input": "Olot"})
+        assert "ran out of time" in result["output"]
+        assert "result for Olot" in result["output"]
+
+    def test_no_deadline_behaves_like_agent_executor(self):
+        agent = RunnableLambda(lambda inputs: AgentFinish({"output": "done"}, ""))
+        executor = create_deadline_agent_executor(MagicMock(), agent, [slow_lookup])
+        assert executor.invoke({"input": "x"})["output"] == "done"
+
+
+class TestToolDegradation:
+    def test_tools_are_skipped_once_time_is_up(self):
+        wrapped = compact_tools([slow_lookup])[0]
+        with deadline_scope(0.0):
+            result = wrapped.invoke({"query": "a"})
+        assert result.startswith("Skipped slow_lookup")
+
+    @patch("src.tools.tools.requests.get")
+    def test_scrape_skipped_without_enough_budget(self, mock_get):
+        with deadline_scope(1.0):
+            result = scrape_and_extract_climb_stats.invoke({"url": "https://example.com/climbs"})
+        assert "Skipped" in result[0]
+        mock_get.assert_not_called()
@@ -0,0 +1,109 @@
+import os
+import time
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.utils.dem import DEMTileStore, tile_name, HGT_DTYPE, HGT_VOID
+from src.tools.tools import ElevationProfileTool
+
+
+def write_tile(directory, lat0, lon0, heights):
+    path = os.path.join(directory, tile_name(lat0, lon0))
+    np.asarray(heights, dtype=HGT_DTYPE).tofile(path)
+    return path
+
+
+def ramp_tile(size=121, base=0, rise_per_degree=1000):
+    """Heights increase linearly towards the north of the tile."""
+    rows = np.linspace(rise_per_degree, 0, size)  # row 0 is the north edge
+    return np.round(np.repeat(rows[:, None] + base, size, axis=1))
+
+
+class TestDEMTileStore:
+    def test_tile_name(self):
+        assert tile_name(45.1, 6.0) == "N45E006.hgt"
+        assert tile_name(-0.5, -70.2) == "S01W071.hgt"
+
+    def test_bilinear_sampling(self, tmp_path):
+        write_tile(tmp_path, 45, 6, ramp_tile())
+        store = DEMTileStore(str(tmp_path))
+        heights = store.sample([45.0, 45.25, 45.5, 45.999], [6.5, 6.5, 6.1, 6.9])
+        np.testing.assert_allclose(heights, [0, 250, 500, 999], atol=1.0)
+
+    def test_points_across_tiles(self, tmp_path):
+        write_tile(tmp_path, 45, 6, ramp_tile(base=0))
+        write_tile(tmp_path, 46, 6, ramp_tile(base=1000))
+        store = DEMTileStore(str(tmp_path))
+        heights = store.sample([45.5, 46.5], [6.5, 6.5])
+        np.testing.assert_allclose(heights, [500, 1500], atol=1.0)
+
+    def test_missing_tile_and_voids_are_nan(self, tmp_path):
+        tile = ramp_tile()
+        tile[:, :] = HGT_VOID
+        write_tile(tmp_path, 45, 6, tile)
+        store = DEMTileStore(str(tmp_path))
+        heights = store.sample([45.5, 10.5], [6.5, 10.5])
+        assert np.isnan(heights).all()
+
+    def test_antimeridian_stays_in_its_latitude_row(self, tmp_path):
+        write_tile(tmp_path, 46, -180, ramp_tile(size=11, base=5000))
+        write_tile(tmp_path, 45, 179, ramp_tile(size=11))
+        store = DEMTileStore(str(tmp_path))
+        heights = store.sample([45.5, 45.5], [179.5, 180.0])
+        assert heights[0] == pytest.approx(500, abs=1)
+        assert np.isnan(heights[1])
+
+    def test_lru_evicts_oldest_tile(self, tmp_path):
+        for lat0 in range(3):
+            write_tile(tmp_path, lat0, 0, ramp_tile(size=11))
+        store = DEMTileStore(str(tmp_path), cache_size=2)
+        for lat0 in range(3):
+            store.tile(lat0, 0)
+        assert list(store._tiles) == [(1, 0), (2, 0)]
+
+    def test_profile_of_long_route_is_fast(self, tmp_path):
+        write_tile(tmp_path, 45, 6, ramp_tile(size=1201))
+        store = DEMTileStore(str(tmp_path))
+        coords = np.column_stack((np.linspace(45.01, 45.99, 500), np.linspace(6.01, 6.99, 500)))
+        store.profile(coords)  # opens the tile
+        start = time.perf_counter()
+        distance, elevation = store.profile(coords, step_m=2.0)
+        elapsed = time.perf_counter() - start
+        assert distance.size > 50_000
+        assert elevation[-1] > elevation[0]
+        assert elapsed < 0.1
+
+
+class TestElevationProfileTool:
+    def test_profile_between_points(self, tmp_path):
+        write_tile(tmp_path, 45, 6, ramp_tile(size=1201))
+        with patch.dict(os.environ, {"DEM_TILE_DIR": str(tmp_path)}):
+            tool = ElevationProfileTool()
+            result = tool._run(start="45.1, 6.5", end="45.2, 6.5")
+
+        assert result["distance_km"] == pytest.approx(11.1, abs=0.2)
+        assert result["elevation_gain_m"] == pytest.approx(100, abs=2)
+        assert len(result["profile"]) == 20
+        assert len(result["climbs"]) == 0  # 0.9% is below the climb threshold
+
+    def test_gain_ignores_dem_noise(self, tmp_path):
+        noise = np.random.default_rng(0).integers(-3, 4, (1201, 1201))
+        write_tile(tmp_path, 45, 6, ramp_tile(size=1201) + noise)
+        with patch.dict(os.environ, {"DEM_TILE_DIR": str(tmp_path)}):
+            tool = ElevationProfileTool()
+            result = tool._run(start="45.1, 6.5", end="45.2, 6.5")
+
+        _, elevation = tool.store.profile(np.array([[45.1, 6.5], [45.2, 6.5]]))
+        rises = np.diff(elevation)
+        assert result["elevation_gain_m"] >= 100
+        assert result["elevation_gain_m"] < rises[rises > 0].sum() - 20
+
+    def test_requires_inputs(self, tmp_path):
+        with patch.dict(os.environ, {"DEM_TILE_DIR": str(tmp_path)}):
+            result = ElevationProfileTool()._run()
+        assert "Provide a route_id" in result["message"]
+
+    def test_requires_dem_dir(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="DEM_TILE_DIR"):
+                ElevationProfileTool()._run(start="45, 6", end="45.1, 6")
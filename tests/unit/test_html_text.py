@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock, patch
+from bs4 import BeautifulSoup
+from src.utils.html_text import extract_text, fetch_text
+
+PAGE = (
+    "<html><head><title>Climbs near Girona</title><style>body { color: red }</style></head>"
+    "<body><script>var climbs = ['hidden'];</script>"
+    "<h1>Rocacorba</h1><p>13.8 km at   6.5%&nbsp;average, with\n800 m of gain.</p>"
+    "<noscript>Enable JS</noscript><p>Els &amp; Angels: 10.5 km</p></body></html>"
+)
+
+
+def chunks(text, size):
+    data = text.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestExtractText:
+    def test_matches_beautifulsoup_text(self):
+        soup = BeautifulSoup(PAGE, "html.parser")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        expected = soup.get_text(separator=" ", strip=True)
+        assert extract_text([PAGE.encode()]).text == " ".join(expected.split())
+
+    def test_skips_script_and_style_across_chunk_boundaries(self):
+        page = extract_text(chunks(PAGE, 7))
+        assert "hidden" not in page.text and "color" not in page.text
+        assert "Rocacorba 13.8 km at 6.5% average" in page.text
+        assert page.stopped == "complete"
+
+    def test_multibyte_characters_split_across_chunks(self):
+        page = extract_text(chunks("<p>Coll d’Estenalles – 9.5 km</p>", 3))
+        assert page.text == "Coll d’Estenalles – 9.5 km"
+
+    def test_stops_once_enough_text_is_collected(self):
+        body = "<p>" + "climb " * 50 + "</p>"
+        stream = iter(chunks("<html><body>" + body * 1000, 1024))
+        page = extract_text(stream, max_chars=500)
+        assert len(page.text) == 500
+        assert page.stopped == "enough_text"
+        assert next(stream, None) is not None  # the rest was never read
+
+    def test_byte_cap_is_hard(self):
+        page = extract_text(chunks("<p>" + "x" * 10_000 + "</p>", 4096), max_chars=50_000, max_bytes=5000)
+        assert page.bytes_read == 5000
+        assert page.stopped == "byte_cap"
+
+
+class TestFetchText:
+    @patch("src.tools.tools.requests.get")
+    def test_streams_and_closes_the_response(self, mock_get):
+        response = MagicMock()
+        response.headers = {"Content-Type": "text/html; charset=ISO-8859-1"}
+        response.iter_content.return_value = iter(["<p>Col de la Creu</p>".encode("latin-1")])
+        mock_get.return_value = response
+
+        page = fetch_text("https://example.com/climbs")
+
+        assert page.text == "Col de la Creu"
+        assert mock_get.call_args.kwargs["stream"] is True
+        response.close.assert_called_once()
+
+    @patch("src.tools.tools.requests.get")
+    def test_meta_charset_is_used_without_a_header_charset(self, mock_get):
+        for meta in (
+            '<meta charset="windows-1252">',
+            '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">',
+        ):
+            page = f"<html><head>{meta}</head><body><p>Coll d’Estenalles – 9.5 km</p></body></html>"
+            data = page.encode("windows-1252")
+            response = MagicMock()
+            response.headers = {"Content-Type": "text/html"}
+            response.iter_content.return_value = iter([data[i : i + 100] for i in range(0, len(data), 100)])
+            mock_get.return_value = response
+
+            assert fetch_text("https://example.com/climbs").text == "Coll d’Estenalles – 9.5 km"
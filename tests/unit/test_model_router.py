@@ -0,0 +1,115 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.models.router import ModelRouter, classify_turn, SIMPLE, TOOL, COMPLEX
+
+
+def backend(result="ok", delay=0.0, error=None):
+    runnable = MagicMock()
+
+    def invoke(inputs, **kwargs):
+        time.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    runnable.invoke.side_effect = invoke
+    return runnable
+
+
+class TestClassifyTurn:
+    @pytest.mark.parametrize("text", ["thanks!", "Hello", "ok cool", "Thank you."])
+    def test_small_talk_is_simple(self, text):
+        assert classify_turn(text) == SIMPLE
+
+    @pytest.mark.parametrize(
+        "text", ["What's the weather in Girona?", "Find a bike rental in Gracia, Barcelona", "Any bike rentals in Olot?"]
+    )
+    def test_single_lookup_is_tool(self, text):
+        assert classify_turn(text) == TOOL
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Plan a 3-day trip around Girona with the best climbs",
+            "Compare the weather in Girona and Olot, then recommend where to ride",
+        ],
+    )
+    def test_planning_is_complex(self, text):
+        assert classify_turn(text) == COMPLEX
+
+
+class TestModelRouter:
+    def test_routes_by_turn_kind(self):
+        local, azure = backend("local"), backend("azure")
+        router = ModelRouter({"local": lambda: local, "azure": lambda: azure})
+
+        assert router.invoke("thanks!", {}) == "local"
+        assert router.invoke("Plan a trip with climbs near Girona", {}) == "azure"
+        assert [d.backend for d in router.decisions] == ["local", "azure"]
+
+    def test_backends_are_built_lazily(self):
+        factory = MagicMock(return_value=backend("azure"))
+        router = ModelRouter({"local": lambda: backend("local"), "azure": factory})
+        router.invoke("hi", {})
+        factory.assert_not_called()
+
+    def test_falls_back_when_backend_fails(self):
+        router = ModelRouter(
+            {"local": lambda: backend(error=ConnectionError("ollama down")), "azure": lambda: backend("azure")},
+            max_failures=1,
+        )
+        assert router.invoke("thanks", {}) == "azure"
+        assert router.decisions[-1].fallback_used
+        # The failed backend is now marked down and skipped first
+        assert router.candidates(SIMPLE) == ["azure", "local"]
+
+    def test_falls_back_on_timeout(self):
+        router = ModelRouter(
+            {"local": lambda: backend("local", delay=0.5), "azure": lambda: backend("azure")},
+            timeout_s=0.05,
+        )
+        assert router.invoke("thanks", {}) == "azure"
+        assert "timed out" in router.decisions[0].error
+
+    def test_backend_with_stalled_calls_is_deprioritized(self):
+        router = ModelRouter(
+            {"local": lambda: backend("local", delay=0.3), "azure": lambda: backend("azure")},
+            timeout_s=0.05,
+            max_failures=5,
+        )
+        assert router.invoke("thanks", {}) == "azure"
+        # The timed-out call is still running, so local goes behind azure until it finishes
+        assert router.health["local"].in_flight == 1
+        assert router.stats()["stalled_calls"] == {"local": 1}
+        assert router.candidates(SIMPLE) == ["azure", "local"]
+
+        time.sleep(0.4)
+        assert router.health["local"].in_flight == 0
+        assert router.candidates(SIMPLE) == ["local", "azure"]
+
+    def test_slow_backend_is_deprioritized(self):
+        router = ModelRouter(
+            {"local": lambda: backend("local", delay=0.05), "azure": lambda: backend("azure")},
+            slow_threshold_s=0.01,
+        )
+        assert router.invoke("thanks", {}) == "local"
+        assert router.candidates(SIMPLE)[0] == "azure"
+
+    def test_raises_when_all_backends_fail(self):
+        router = ModelRouter(
+            {"local": lambda: backend(error=RuntimeError("a")), "azure": lambda: backend(error=RuntimeError("b"))}
+        )
+        with pytest.raises(RuntimeError, match="b"):
+            router.invoke("hi", {})
+
+    def test_stats_report_savings(self):
+        router = ModelRouter(
+            {"local": lambda: backend("local"), "azure": lambda: backend("azure", delay=0.05)}
+        )
+        router.invoke("Plan a trip with climbs", {})
+        router.invoke("thanks", {})
+        stats = router.stats()
+        assert stats["backends"]["local"]["turns"] == 1
+        assert stats["backends"]["azure"]["turns"] == 1
+        assert stats["estimated_latency_saved_s"] >= 0
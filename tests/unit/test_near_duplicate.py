@@ -0,0 +1,137 @@
+import json
+import threading
+from unittest.mock import MagicMock, patch
+from src.tools.tools import scrape_and_extract_climb_stats
+from src.utils.near_duplicate import NearDuplicateIndex, shingles
+
+ARTICLE = (
+    "Rocacorba is the classic test climb near Girona. It climbs 13.8 km at an average of 6.5 percent, "
+    "gaining about 800 metres through cork oak forest to the antennas at the top. Els Angels is the "
+    "gentler alternative: 10.5 km at 4.2 percent with views over the city. Further west, the road to "
+    "Santa Pellaia climbs 9.6 km at 4 percent and is a favourite of local clubs on weekday mornings. "
+    "Mare de Deu del Mont is the longest and hardest, 18 km with a final ramp above ten percent."
+)
+
+
+def mirrored(text):
+    """The same article as a syndicating site would serve it: new header, footer and punctuation."""
+    return "Cycling News Network | Home | Subscribe " + text.replace(",", "") + " Share this story. Related posts"
+
+
+class TestNearDuplicateIndex:
+    def test_shingles_ignore_case_and_punctuation(self):
+        assert shingles("Col, de la CREU!", k=2) == shingles("col de la creu", k=2)
+
+    def test_mirror_matches_and_different_article_does_not(self):
+        index = NearDuplicateIndex()
+        owner, entry = index.claim("a", index.fingerprint(ARTICLE))
+        assert owner
+        index.publish(entry, ["climbs"])
+
+        key, score = index.find(index.fingerprint(mirrored(ARTICLE)))
+        assert key == "a" and score >= 0.8
+        other = "The Tourmalet and Aspin are the famous passes of the Pyrenees, " * 3
+        assert index.find(index.fingerprint(other)) is None
+
+    def test_near_duplicate_claim_returns_existing_value(self):
+        index = NearDuplicateIndex()
+        _, entry = index.claim("a", index.fingerprint(ARTICLE))
+        index.publish(entry, ["climbs"])
+        owner, match = index.claim("b", index.fingerprint(mirrored(ARTICLE)))
+        assert not owner and match.wait(0) == ["climbs"]
+
+    def test_abandoned_claim_is_forgotten(self):
+        index = NearDuplicateIndex()
+        _, entry = index.claim("a", index.fingerprint(ARTICLE))
+        index.abandon(entry)
+        assert entry.wait(0) is None
+        assert index.find(index.fingerprint(ARTICLE)) is None
+
+    def test_least_recently_used_entries_are_evicted(self):
+        index = NearDuplicateIndex(max_entries=2)
+        texts = [f"article number {i} about a different climb entirely {i} {i * 7}" for i in range(3)]
+        for i, text in enumerate(texts):
+            index.claim(i, index.fingerprint(text))
+        assert len(index) == 2
+        assert index.find(index.fingerprint(texts[0])) is None
+        assert index.find(index.fingerprint(texts[2]))[0] == 2
+
+    def test_empty_text_has_no_fingerprint(self):
+        assert NearDuplicateIndex().fingerprint("  --  ") is None
+
+
+def page_response(text):
+    response = MagicMock()
+    response.headers = {"Content-Type": "text/html"}
+    response.iter_content.return_value = iter([f"<html><body><p>{text}</p></body></html>".encode()])
+    return response
+
+
+EXTRACTED = {
+    "climbs": [
+        {
+            "name": "Rocacorba",
+            "location": "Girona",
+            "distance_km": 13.8,
+            "elevation_gain_m": 800,
+            "average_gradient": 6.5,
+            "max_gradient": None,
+        }
+    ]
+}
+
+
+class TestScrapeReusesExtractions:
+    @patch("src.tools.tools.get_model_manager")
+    @patch("src.tools.tools.requests.get")
+    def test_mirrored_article_is_not_extracted_again(self, mock_get, mock_manager):
+        mock_get.side_effect = lambda url, **kwargs: page_response(
+            ARTICLE if "original" in url else mirrored(ARTICLE)
+        )
+        mock_manager.return_value.chat.return_value = {"message": {"content": json.dumps(EXTRACTED)}}
+
+        first = scrape_and_extract_climb_stats.invoke({"url": "https://original.example/climbs"})
+        second = scrape_and_extract_climb_stats.invoke({"url": "https://mirror.example/girona"})
+
+        assert first == second and first[0]["name"] == "Rocacorba"
+        assert mock_manager.return_value.chat.call_count == 1
+
+    @patch("src.tools.tools.get_model_manager")
+    @patch("src.tools.tools.requests.get")
+    def test_concurrent_copies_wait_for_one_extraction(self, mock_get, mock_manager):
+        mock_get.side_effect = lambda url, **kwargs: page_response(
+            mirrored(ARTICLE) if "mirror" in url else ARTICLE
+        )
+        release = threading.Event()
+
+        def slow_chat(**kwargs):
+            release.wait(5)
+            return {"message": {"content": json.dumps(EXTRACTED)}}
+
+        mock_manager.return_value.chat.side_effect = slow_chat
+        results = {}
+
+        def scrape(url):
+            results[url] = scrape_and_extract_climb_stats.invoke({"url": url})
+
+        urls = ("https://original.example/a", "https://mirror.example/b")
+        threads = [threading.Thread(target=scrape, args=(u,)) for u in urls]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert results["https://original.example/a"] == results["https://mirror.example/b"]
+        assert mock_manager.return_value.chat.call_count == 1
+
+    @patch("src.tools.tools.get_model_manager")
+    @patch("src.tools.tools.requests.get")
+    def test_parse_errors_are_not_reused(self, mock_get, mock_manager):
+        mock_get.side_effect = lambda url, **kwargs: page_response(ARTICLE)
+        mock_manager.return_value.chat.return_value = {"message": {"content": "not json"}}
+
+        scrape_and_extract_climb_stats.invoke({"url": "https://original.example/a"})
+        scrape_and_extract_climb_stats.invoke({"url": "https://original.example/a"})
+
+        assert mock_manager.return_value.chat.call_count == 2
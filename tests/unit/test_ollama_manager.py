@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from langchain_core.messages import HumanMessage
+from src.models.ollama_manager import OllamaModelManager
+
+
+class StubOllama:
+    """A minimal Ollama API (/api/chat, /api/generate, /api/ps) on a local port."""
+
+    def __init__(self, delay_s: float = 0.0):
+        self.delay_s = delay_s
+        self.requests = []
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._reply({"models": [{"model": "mistral", "name": "mistral"}]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests.append((self.path, payload))
+                    stub._active += 1
+                    stub.max_concurrent = max(stub.max_concurrent, stub._active)
+                time.sleep(stub.delay_s)
+                with stub._lock:
+                    stub._active -= 1
+                common = {"model": payload.get("model"), "created_at": "2024-01-01T00:00:00Z", "done": True}
+                if self.path == "/api/chat":
+                    self._reply({**common, "message": {"role": "assistant", "content": f"hi from {stub.port}"}})
+                else:
+                    self._reply({**common, "response": ""})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama(delay_s=0.05), StubOllama(delay_s=0.05)]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def dead_url():
+    # Bind and release a port so nothing is listening on it
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.server_close()
+    return url
+
+
+class TestOllamaModelManager:
+    def test_requests_carry_keep_alive(self, stubs):
+        manager = OllamaModelManager([stubs[0].url], keep_alive="1h")
+        response = manager.chat("mistral", [{"role": "user", "content": "hi"}])
+        assert response.message.content == f"hi from {stubs[0].port}"
+        assert stubs[0].requests[0][1]["keep_alive"] == "1h"
+
+    def test_concurrent_requests_are_spread_across_hosts(self, stubs):
+        manager = OllamaModelManager([s.url for s in stubs])
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: manager.chat("mistral", [{"role": "user", "content": "x"}]), range(16)))
+        counts = [len(s.requests) for s in stubs]
+        assert sum(counts) == 16
+        assert min(counts) >= 6
+        assert all(entry["outstanding"] == 0 for entry in manager.stats())
+
+    def test_clients_are_shared_per_host(self, stubs):
+        manager = OllamaModelManager([stubs[0].url, stubs[0].url + "/"])
+        assert len(manager.hosts) == 1
+        client = manager.hosts[0].client
+        manager.chat("mistral", [])
+        manager.chat("mistral", [])
+        assert manager.hosts[0].client is client
+
+    def test_fails_over_and_marks_dead_host_down(self, stubs):
+        manager = OllamaModelManager([dead_url(), stubs[0].url], health_interval_s=60)
+        for _ in range(3):
+            manager.chat("mistral", [{"role": "user", "content": "x"}])
+        dead, alive = manager.stats()
+        assert not dead["healthy"] and dead["failures"] == 1
+        assert alive["requests"] == 3
+
+    def test_down_host_is_rechecked_after_interval(self, stubs):
+        manager = OllamaModelManager([stubs[0].url], health_interval_s=0.0)
+        manager.hosts[0].healthy = False
+        manager.chat("mistral", [])
+        assert manager.hosts[0].healthy
+        assert manager.hosts[0].resident == ["mistral"]
+
+    def test_raises_when_no_host_is_reachable(self):
+        manager = OllamaModelManager([dead_url()], health_interval_s=60)
+        with pytest.raises(ConnectionError):
+            manager.chat("mistral", [])
+        with pytest.raises(ConnectionError, match="No healthy Ollama host"):
+            manager.chat("mistral", [])
+
+    def test_timeout_bounds_the_wait(self):
+        slow = StubOllama(delay_s=0.5)
+        try:
+            manager = OllamaModelManager([slow.url])
+            with pytest.raises(TimeoutError):
+                manager.chat("mistral", [], timeout_s=0.05)
+        finally:
+            slow.close()
+
+    def test_host_stays_busy_until_a_timed_out_request_ends(self):
+        slow = StubOllama(delay_s=0.3)
+        try:
+            manager = OllamaModelManager([slow.url])
+            with pytest.raises(TimeoutError):
+                manager.chat("mistral", [], timeout_s=0.05)
+            assert manager.hosts[0].outstanding == 1
+            deadline = time.monotonic() + 5
+            while manager.hosts[0].outstanding and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert manager.hosts[0].outstanding == 0
+        finally:
+            slow.close()
+
+    def test_request_timeout_comes_from_the_environment(self):
+        with patch.dict(os.environ, {"OLLAMA_HOSTS": "http://a:11434", "OLLAMA_TIMEOUT_S": "42"}):
+            assert OllamaModelManager.from_env().hosts[0].timeout_s == 42
+        with patch.dict(os.environ, {"OLLAMA_HOSTS": "http://a:11434", "OLLAMA_TIMEOUT_S": ""}):
+            assert OllamaModelManager.from_env().hosts[0].timeout_s is None
+
+    def test_preload_loads_on_every_host(self, stubs):
+        manager = OllamaModelManager([s.url for s in stubs], keep_alive="-1")
+        manager.preload(["mistral", "llama3.1:8b"])
+        for stub in stubs:
+            loaded = sorted(p["model"] for path, p in stub.requests if path == "/api/generate")
+            assert loaded == ["llama3.1:8b", "mistral"]
+
+    def test_chat_model_is_balanced(self, stubs):
+        manager = OllamaModelManager([s.url for s in stubs])
+        chat = manager.chat_model("mistral")
+        replies = {chat.invoke([HumanMessage(content="hi")]).content for _ in range(4)}
+        assert replies == {f"hi from {s.port}" for s in stubs}
+        assert stubs[0].requests[0][1]["keep_alive"] == manager.keep_alive
+
+    def test_chat_model_fails_over_to_a_live_host(self, stubs):
+        manager = OllamaModelManager([dead_url(), stubs[0].url], health_interval_s=60)
+        chat = manager.chat_model("mistral")
+        replies = {chat.invoke([HumanMessage(content="hi")]).content for _ in range(3)}
+        assert replies == {f"hi from {stubs[0].port}"}
+        dead, alive = manager.stats()
+        assert not dead["healthy"] and dead["failures"] == 1
+        assert dead["outstanding"] == alive["outstanding"] == 0
@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.html_text import PageText, extract_text, fetch_text
+from src.utils.parse_pool import ParsePool
+from tests.unit.test_html_text import PAGE, chunks
+
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # One worker replaced after every second page, to exercise recycling
+    pool = ParsePool(workers=1, max_pending=2, max_tasks_per_child=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestParsePool:
+    def test_matches_inline_parsing_across_recycled_workers(self, pool):
+        before = shared_blocks()
+        expected = extract_text(chunks(PAGE, 7))
+        for _ in range(3):
+            page = pool.parse(chunks(PAGE, 7), timeout=60)
+            assert (page.text, page.bytes_read, page.stopped) == (expected.text, expected.bytes_read, "complete")
+        assert shared_blocks() == before
+
+    def test_multibyte_text_and_limits(self, pool):
+        assert pool.parse(chunks("<p>Coll d’Estenalles</p>", 3), timeout=60).text == "Coll d’Estenalles"
+        page = pool.parse(chunks("<p>" + "x" * 10_000 + "</p>", 4096), max_chars=50_000, max_bytes=5000, timeout=60)
+        assert page.bytes_read == 5000 and page.stopped == "byte_cap"
+        page = pool.parse(chunks("<p>" + "climb " * 5000 + "</p>", 1024), max_chars=500, timeout=60)
+        assert len(page.text) == 500 and page.stopped == "enough_text"
+
+    def test_reading_stops_once_the_text_is_long_enough(self, pool):
+        page_chunks = chunks("<p>" + "climb " * 200_000 + "</p>", 16 * 1024)
+        read = []
+
+        def stream():
+            for chunk in page_chunks:
+                read.append(chunk)
+                yield chunk
+
+        page = pool.parse(stream(), max_chars=2000, timeout=60)
+        assert page.stopped == "enough_text" and len(page.text) == 2000
+        # One window of max_chars * bytes_per_char bytes, not the whole 1.2 MB page
+        assert len(read) <= 3 and page.bytes_read <= 2000 * pool.bytes_per_char
+
+    def test_callers_wait_for_a_free_slot(self):
+        pool = ParsePool(workers=1, max_pending=1)
+        pool._slots.acquire()
+        with pytest.raises(TimeoutError):
+            pool.parse([b"<p>Rocacorba</p>"], timeout=0.05)
+        assert pool._executor is None  # nothing was read or submitted
+
+    def test_broken_pool_is_restarted_and_the_page_parsed_inline(self):
+        pool = ParsePool(workers=1)
+        broken = MagicMock()
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        broken.submit.return_value = future
+        pool._executor = broken
+
+        page = pool.parse([b"<p>Rocacorba</p>"], timeout=1)
+
+        assert page.text == "Rocacorba"
+        assert pool._executor is None
+        broken.shutdown.assert_called_once()
+        # The slot came back
+        assert pool._slots.acquire(timeout=0)
+
+    def test_a_parse_that_takes_too_long_raises_the_builtin_timeout(self):
+        pool = ParsePool(workers=1, max_pending=1)
+        stuck = MagicMock()
+        future = Future()
+        stuck.submit.return_value = future
+        pool._executor = stuck
+
+        with pytest.raises(TimeoutError):
+            pool.parse([b"<p>Rocacorba</p>"], timeout=0.05)
+        # The slot stays taken until the worker is done with the page
+        assert not pool._slots.acquire(timeout=0)
+        future.set_result(PageText("Rocacorba", 16, "complete"))
+        assert pool._slots.acquire(timeout=0)
+
+    @patch("src.utils.parse_pool._NATIVE_RECYCLING", False)
+    def test_pool_is_replaced_by_hand_on_older_pythons(self):
+        pool = ParsePool(workers=1, max_tasks_per_child=2)
+        executor = MagicMock()
+        done = Future()
+        done.set_result(PageText("Rocacorba", 16, "complete"))
+        executor.submit.return_value = done
+        pool._executor = executor
+
+        pool.parse([b"<p>Rocacorba</p>"], timeout=1)
+        assert pool._executor is executor
+        pool.parse([b"<p>Rocacorba</p>"], timeout=1)
+        assert pool._executor is None
+        executor.shutdown.assert_called_once_with(wait=False)
+
+    @patch("src.tools.tools.requests.get")
+    def test_fetch_text_hands_the_page_to_the_pool(self, mock_get):
+        response = MagicMock()
+        response.headers = {"Content-Type": "text/html; charset=ISO-8859-1"}
+        response.iter_content.return_value = iter(["<p>Col de la Creu</p>".encode("latin-1")])
+        mock_get.return_value = response
+        pool = MagicMock()
+
+        fetch_text("https://example.com/climbs", pool=pool, timeout=5)
+
+        assert pool.parse.call_args.kwargs["encoding"] == "iso8859-1"
+        assert pool.parse.call_args.kwargs["timeout"] == 5
+        response.close.assert_called_once()
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.tools import tool
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.tools.result_encoding import CompactResultTool
+from src.utils.deadline import bind_deadline
+from src.utils.html_text import extract_text
+from src.utils.profiling import StackSampler, current_profile, phase, profile_turn
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return f"result for {query}"
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def phases(profile):
+    return {row["phase"]: row for row in profile.summary()}
+
+
+class TestProfileTurn:
+    def test_disabled_profiling_is_a_no_op(self):
+        with profile_turn(False) as profile:
+            assert profile is None and current_profile() is None
+            assert phase("render") is phase("json_parse")
+
+    def test_langchain_llm_and_tool_runs_are_timed(self, tmp_path):
+        model = FakeListChatModel(responses=["hi"])
+        with profile_turn(True, directory=str(tmp_path)) as profile:
+            model.invoke("hello")
+            lookup.invoke({"query": "Girona"})
+            with phase("render"):
+                pass
+        rows = phases(profile)
+        assert rows["llm:FakeListChatModel"]["calls"] == 1
+        assert rows["tool:lookup"]["calls"] == 1
+        assert rows["render"]["calls"] == 1
+        assert profile.wall_s > 0
+        # Runs after the turn are not recorded
+        lookup.invoke({"query": "later"})
+        assert phases(profile)["tool:lookup"]["calls"] == 1
+
+    def test_wrapped_tools_are_timed_once(self, tmp_path):
+        with profile_turn(True, directory=str(tmp_path)) as profile:
+            CompactResultTool(lookup).invoke({"query": "Girona"})
+        assert phases(profile)["tool:lookup"]["calls"] == 1
+
+    def test_worker_threads_report_to_the_turn(self, tmp_path):
+        def work(_):
+            with phase("json_parse"):
+                return current_profile() is not None
+
+        with profile_turn(True, directory=str(tmp_path)) as profile:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                seen = list(pool.map(bind_deadline(work), range(4)))
+        assert all(seen)
+        assert phases(profile)["json_parse"]["calls"] == 4
+
+    def test_html_parsing_is_timed(self, tmp_path):
+        with profile_turn(True, directory=str(tmp_path)) as profile:
+            extract_text([b"<p>Rocacorba</p>", b"<p>Els Angels</p>"])
+        assert phases(profile)["html_parse"]["calls"] == 1
+
+    def test_stacks_are_written_in_folded_format(self, tmp_path):
+        with profile_turn(True, label="q 1/2", directory=str(tmp_path)) as profile:
+            busy_wait(0.1)
+        lines = open(profile.stacks_path).read().splitlines()
+        assert profile.stacks_path.startswith(str(tmp_path / "q_1_2-"))
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("test_profiling:busy_wait" in line for line in lines)
+        assert not any(line.startswith("stack-sampler") for line in lines)
+
+
+class TestStackSampler:
+    def test_idle_pool_workers_are_skipped(self):
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="idle-pool") as pool:
+            pool.submit(lambda: None).result()
+            sampler = StackSampler(interval_s=0.001).start()
+            time.sleep(0.05)
+            sampler.stop()
+        assert sampler.samples
+        assert not any(stack.startswith("idle-pool") for stack in sampler.samples)
@@ -0,0 +1,143 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import src.tools.tools as tools
+from src.tools.tools import find_bike_rentals
+from src.utils.cache import TTLCache
+from src.utils.refresh import DecayingCounter, RefreshScheduler, canonical_location
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    # Every cached entry counts as about to expire, so only demand and budget decide
+    scheduler = RefreshScheduler(budget_per_hour=3600, lead_s=1000, interval_s=3600, half_life_s=60, clock=clock)
+    yield scheduler
+    scheduler.stop()
+
+
+def request(scheduler, cache, key, times=1):
+    refresh = MagicMock(side_effect=lambda: cache.set(key, "fresh"))
+    for _ in range(times):
+        scheduler.track("weather", key, cache, refresh)
+    return refresh
+
+
+def test_canonical_location():
+    assert canonical_location("Girona,  Spain") == canonical_location(" girona spain ") == "girona spain"
+    assert canonical_location("Olòt") == "olot"
+    assert canonical_location("Sant Feliu de Guíxols") == "sant feliu de guixols"
+
+
+def test_counter_decays_and_estimates_rate():
+    counter = DecayingCounter(half_life_s=60)
+    for _ in range(8):
+        counter.add("girona", now=0)
+    assert counter.rate("girona", now=60) == pytest.approx(4 * counter.decay)
+    counter.add("olot", now=60)
+    assert counter.prune(now=300, floor=0.1) == ["olot"]
+    assert len(counter) == 1
+
+
+def test_counter_keeps_only_the_hottest_keys():
+    counter = DecayingCounter(max_keys=4)
+    for i in range(5):
+        for _ in range(i + 1):
+            counter.add(i, now=0)
+    assert len(counter) <= 4
+    assert counter.rate(0, now=0) == 0
+    assert counter.rate(4, now=0) > 0
+
+
+def test_hot_keys_are_refreshed_and_cold_keys_expire(scheduler, clock):
+    cache = TTLCache(ttl_s=100)
+    cache.set("girona", "old")
+    cache.set("olot", "old")
+    hot = request(scheduler, cache, "girona", times=10)
+    cold = request(scheduler, cache, "olot", times=1)
+    clock.now += 200
+
+    assert scheduler.run_once() == 1
+    hot.assert_called_once()
+    cold.assert_not_called()
+    assert cache.get("girona") == "fresh"
+
+
+def test_keys_not_in_the_cache_are_not_refreshed(scheduler):
+    refresh = request(scheduler, TTLCache(ttl_s=100), "girona", times=10)
+    assert scheduler.run_once() == 0
+    refresh.assert_not_called()
+
+
+def test_refreshes_stay_within_budget(clock):
+    scheduler = RefreshScheduler(budget_per_hour=6, lead_s=1000, interval_s=3600, clock=clock)
+    cache = TTLCache(ttl_s=1000)
+    refreshes = []
+    for city in ("girona", "olot", "banyoles"):
+        cache.set(city, "old")
+        refreshes.append(request(scheduler, cache, city, times=10))
+    scheduler.stop()
+
+    assert scheduler.run_once() == 1
+    assert scheduler.stats()["over_budget"] == 1
+    # The bucket refills at the budgeted rate
+    clock.now += 600
+    assert scheduler.run_once() == 1
+    assert sum(r.call_count for r in refreshes) == 2
+
+
+def test_failed_refresh_leaves_the_entry_to_expire(scheduler):
+    cache = TTLCache(ttl_s=100)
+    cache.set("girona", "old")
+    for _ in range(10):
+        scheduler.track("weather", "girona", cache, MagicMock(side_effect=ConnectionError("down")))
+    assert scheduler.run_once() == 0
+    assert scheduler.stats()["failed"] == 1
+    assert cache.get("girona") == "old"
+
+
+@patch("src.tools.tools.serpapi_search")
+def test_rentals_are_cached_and_refreshed_by_canonical_location(mock_search):
+    mock_search.return_value.get_dict.return_value = {"local_results": [{"title": "Bike Tours Girona"}]}
+
+    with patch.dict(os.environ, {"SERPAPI_KEY": "test_key"}):
+        first = find_bike_rentals.invoke({"city": "Girona"})
+        second = find_bike_rentals.invoke({"city": " girona "})
+        assert mock_search.call_count == 1
+        assert first == second
+
+        tracked = tools._refresher._tracked[("rentals", ("girona", ""))]
+        tracked.refresh()
+    assert mock_search.call_count == 2
+
+
+@patch("src.tools.tools.requests.post", side_effect=requests.HTTPError("403 bulk not on plan"))
+@patch("src.tools.tools.requests.get")
+def test_each_weather_request_is_counted_once(mock_get, mock_post):
+    mock_get.side_effect = lambda url, params, **kwargs: MagicMock(json=MagicMock(return_value={"q": params["q"]}))
+
+    def scores():
+        counter = tools._refresher.counter
+        return {key[1][1]: round(counter._current(key, tools._refresher.clock())) for key in counter._scores}
+
+    tools._weatherapi_get_many("current.json", ["Girona", "Olot"], "test_key")
+    assert scores() == {"girona": 1, "olot": 1}
+    # Served from the cache this time
+    tools._weatherapi_get_many("current.json", ["Girona", "Olot"], "test_key")
+    assert scores() == {"girona": 2, "olot": 2}
+    assert mock_get.call_count == 2
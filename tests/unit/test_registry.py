@@ -0,0 +1,72 @@
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from langchain_core.runnables import RunnableLambda
+from src.agents.conversational_agent import ConversationalCyclingAgent
+from src.models.registry import Registry, get_registry
+
+
+class TestRegistry:
+    def test_builds_once_under_concurrent_first_use(self):
+        registry = Registry()
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: registry.get("model", build), range(8)))
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+
+    def test_warmup_builds_registered_factories_and_reports_failures(self):
+        registry = Registry()
+        registry.register("ok", lambda: "client")
+        registry.register("bad", lambda: (_ for _ in ()).throw(RuntimeError("no creds")))
+        failures = registry.warmup()
+        assert "ok" in registry and "bad" not in registry
+        assert [key for key, _ in failures] == ["bad"]
+
+    def test_unknown_key_raises(self):
+        with pytest.raises(KeyError):
+            Registry().get("missing")
+
+    def test_close_releases_clients_and_allows_rebuild(self):
+        registry = Registry()
+        closable = MagicMock()
+        openai_like = MagicMock(spec=["root_client"])
+        registry.get("a", lambda: closable)
+        registry.get("b", lambda: openai_like)
+        registry.close()
+        closable.close.assert_called_once()
+        openai_like.root_client.close.assert_called_once()
+        assert "a" not in registry
+        assert registry.get("a") is closable  # the factory stays registered
+
+
+class TestSharedSessions:
+    @pytest.fixture(autouse=True)
+    def clean_registry(self):
+        get_registry().close()
+        yield
+        get_registry().close()
+
+    def test_sessions_share_models_and_agents(self):
+        def fake_model(provider):
+            model = MagicMock()
+            model.bind_tools.return_value = RunnableLambda(lambda x: x)
+            return model
+
+        with patch.object(ConversationalCyclingAgent, "_create_model", side_effect=fake_model) as create:
+            first = ConversationalCyclingAgent("azure_openai")
+            start = time.perf_counter()
+            second = ConversationalCyclingAgent("azure_openai")
+            elapsed = time.perf_counter() - start
+
+        assert create.call_count == 1
+        assert second.model is first.model and second.agent is first.agent
+        assert second.conversation_history is not first.conversation_history
+        assert elapsed < 0.01
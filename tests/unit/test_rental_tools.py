@@ -5,7 +5,7 @@ from src.tools.tools import find_bike_rentals
 
 
 class TestRentalTools:
-    @patch("src.tools.tools.GoogleSearch")
+    @patch("src.tools.tools.serpapi_search")
     def test_find_bike_rentals_success(self, mock_search_class):
         # Mock GoogleSearch instance
         mock_search_instance = MagicMock()
@@ -34,7 +34,7 @@ class TestRentalTools:
         assert result[0]["title"] == "Best Bikes"
         assert result[0]["rating"] == 4.5
         
-    @patch('src.tools.tools.GoogleSearch')
+    @patch('src.tools.tools.serpapi_search')
     def test_find_bike_rentals_no_results(self, mock_search_class):
         mock_search_instance = MagicMock()
         mock_search_class.return_value = mock_search_instance
@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from src.utils.cache import TTLCache
+from src.utils.deadline import deadline_scope, remaining_time
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, ResilientHTTP
+from src.tools.tools import get_weather_now
+
+
+def ok_response(payload=None):
+    response = MagicMock()
+    response.json.return_value = payload or {}
+    return response
+
+
+def server_error():
+    response = MagicMock()
+    response.status_code = 503
+    response.raise_for_status.side_effect = requests.HTTPError("503", response=response)
+    return response
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_probes_after_cooldown(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=0.05)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()  # the single half-open probe
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestResilientHTTP:
+    @patch("requests.get")
+    def test_server_errors_open_the_circuit(self, mock_get):
+        mock_get.return_value = server_error()
+        client = ResilientHTTP(failure_threshold=3)
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                client.get("https://api.example.com/x", hedge=False)
+        with pytest.raises(CircuitOpenError):
+            client.get("https://api.example.com/x", hedge=False)
+        assert mock_get.call_count == 3
+        # Other hosts are unaffected
+        mock_get.return_value = ok_response()
+        client.get("https://other.example.com/x", hedge=False)
+
+    @patch("requests.get")
+    def test_client_errors_do_not_trip_the_breaker(self, mock_get):
+        response = MagicMock()
+        response.status_code = 404
+        response.raise_for_status.side_effect = requests.HTTPError("404", response=response)
+        mock_get.return_value = response
+        client = ResilientHTTP(failure_threshold=1)
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                client.get("https://api.example.com/missing", hedge=False)
+        assert client.breaker("api.example.com").state == CircuitBreaker.CLOSED
+
+    @patch("requests.get")
+    def test_slow_request_is_hedged_and_fastest_wins(self, mock_get):
+        calls = []
+        lock = threading.Lock()
+
+        def respond(url, **kwargs):
+            with lock:
+                calls.append(url)
+                first = len(calls) == 1
+            time.sleep(0.5 if first else 0.01)
+            return ok_response({"attempt": "first" if first else "hedge"})
+
+        mock_get.side_effect = respond
+        client = ResilientHTTP(default_hedge_delay_s=0.05)
+        start = time.perf_counter()
+        response = client.get("https://api.example.com/slow")
+        assert response.json() == {"attempt": "hedge"}
+        assert time.perf_counter() - start < 0.3
+        assert len(calls) == 2
+        response.close.assert_not_called()
+
+    @patch("requests.get")
+    def test_losing_hedge_response_is_closed(self, mock_get):
+        responses = [ok_response({"attempt": "first"}), ok_response({"attempt": "hedge"})]
+        attempts = iter(zip([0.3, 0.01], responses))
+        lock = threading.Lock()
+
+        def respond(url, **kwargs):
+            with lock:
+                delay, response = next(attempts)
+            time.sleep(delay)
+            return response
+
+        mock_get.side_effect = respond
+        client = ResilientHTTP(default_hedge_delay_s=0.05)
+        assert client.get("https://api.example.com/slow").json() == {"attempt": "hedge"}
+        time.sleep(0.4)
+        responses[0].close.assert_called_once()
+        responses[1].close.assert_not_called()
+
+    @patch("requests.get")
+    def test_fast_request_is_not_hedged(self, mock_get):
+        mock_get.return_value = ok_response()
+        client = ResilientHTTP(default_hedge_delay_s=0.2)
+        client.get("https://api.example.com/fast")
+        assert mock_get.call_count == 1
+
+    def test_hedge_delay_tracks_p95(self):
+        client = ResilientHTTP(default_hedge_delay_s=1.0)
+        assert client.hedge_delay("h") == 1.0
+        for i in range(100):
+            client.latency.record("h", 0.1 if i < 95 else 2.0)
+        assert client.hedge_delay("h") == pytest.approx(2.0)
+        client.latency = type(client.latency)()
+        for _ in range(50):
+            client.latency.record("h", 0.1)
+        assert client.hedge_delay("h") == pytest.approx(0.1)
+
+    @patch("requests.get")
+    def test_timeout_is_capped_by_deadline(self, mock_get):
+        mock_get.return_value = ok_response()
+        client = ResilientHTTP()
+        with deadline_scope(0.5):
+            client.get("https://api.example.com/x", hedge=False, timeout=10)
+        assert mock_get.call_args.kwargs["timeout"] <= 0.5
+
+    @patch("requests.post")
+    def test_posts_are_bounded_and_counted_by_the_breaker(self, mock_post):
+        mock_post.return_value = server_error()
+        client = ResilientHTTP(failure_threshold=1)
+        with deadline_scope(0.5):
+            with pytest.raises(requests.HTTPError):
+                client.post("https://api.example.com/bulk", json={})
+        assert mock_post.call_args.kwargs["timeout"] <= 0.5
+        with pytest.raises(CircuitOpenError):
+            client.post("https://api.example.com/bulk", json={})
+        assert mock_post.call_count == 1
+
+    @patch("requests.get")
+    def test_default_timeout_applies_without_a_deadline(self, mock_get):
+        mock_get.return_value = ok_response()
+        client = ResilientHTTP(timeout_s=7)
+        client.get("https://api.example.com/x", hedge=False)
+        assert mock_get.call_args.kwargs["timeout"] == 7
+
+    @patch("requests.get")
+    def test_slow_primary_near_the_deadline_is_a_host_timeout(self, mock_get):
+        def slow(url, **kwargs):
+            time.sleep(0.5)
+            return ok_response()
+
+        mock_get.side_effect = slow
+        client = ResilientHTTP(failure_threshold=1)
+        with deadline_scope(0.2):
+            with pytest.raises(requests.Timeout):
+                client.get("https://api.example.com/x")
+        assert mock_get.call_count == 1
+        with pytest.raises(CircuitOpenError):
+            client.get("https://api.example.com/x")
+
+    def test_bounded_call_times_out_and_counts_against_the_host(self):
+        client = ResilientHTTP(failure_threshold=1)
+        start = time.perf_counter()
+        with deadline_scope(0.1):
+            with pytest.raises(requests.Timeout):
+                client.call_bounded("serpapi.com", lambda: time.sleep(0.5))
+        assert time.perf_counter() - start < 0.4
+        assert client.breaker("serpapi.com").state == CircuitBreaker.OPEN
+        assert client.call_bounded("other.com", lambda: "ok") == "ok"
+
+    @patch("requests.get")
+    def test_expired_deadline_fails_without_request(self, mock_get):
+        client = ResilientHTTP()
+        with deadline_scope(0.0):
+            with pytest.raises(requests.Timeout):
+                client.get("https://api.example.com/x")
+        mock_get.assert_not_called()
+        assert remaining_time() is None
+
+
+class TestStaleCache:
+    def test_allow_stale_returns_expired_entries(self):
+        cache = TTLCache(ttl_s=0.01)
+        cache.set("k", "v")
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.get("k", allow_stale=True) == "v"
+
+    @patch("src.tools.tools.requests.get")
+    def test_weather_served_from_stale_cache_when_upstream_down(self, mock_get):
+        import src.tools.tools as tools
+
+        mock_get.return_value = ok_response(
+            {
+                "location": {"name": "Girona", "country": "Spain"},
+                "current": {"condition": {"text": "Sunny"}, "temp_c": 20.0, "humidity": 40, "wind_kph": 5.0},
+            }
+        )
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            get_weather_now.invoke({"city": "Girona"})
+            key = tools._weather_cache_key("current.json", "Girona", {})
+            tools._weather_cache.set(key, tools._weather_cache.get(key), ttl_s=0)
+
+            mock_get.side_effect = requests.ConnectionError("down")
+            assert "Sunny" in get_weather_now.invoke({"city": "Girona"})
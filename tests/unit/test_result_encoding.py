@@ -0,0 +1,97 @@
+import pytest
+from langchain.tools import tool
+from src.utils.encoding import drop_nulls, encode_result, estimate_tokens, to_compact_lines
+from src.agents.tool_selection import INTENT_TOOLS
+from src.tools.result_encoding import TOOL_TOKEN_BUDGETS, CompactResultTool, compact_tools
+from src.tools.tools import find_bike_rentals, StravaClimbsTool
+
+
+def shops(n):
+    return [
+        {
+            "title": f"Shop {i}",
+            "gps_coordinates": {"latitude": 41.4 + i / 100, "longitude": 2.1},
+            "rating": 4.5,
+            "type": "Bicycle rental service",
+            "address": f"Carrer {i}, Barcelona",
+            "open_state": None,
+            "phone": None,
+            "website": None,
+        }
+        for i in range(n)
+    ]
+
+
+@tool
+def echo_shops(n: int) -> list:
+    """Return n fake bike shops."""
+    return shops(n)
+
+
+class TestEncoding:
+    def test_drop_nulls(self):
+        assert drop_nulls({"a": None, "b": "", "c": [None], "d": {"e": None}, "f": 0}) == {"f": 0}
+
+    def test_list_of_dicts_becomes_table(self):
+        lines = to_compact_lines(shops(2))
+        assert lines[0] == "title | gps_coordinates.latitude | gps_coordinates.longitude | rating | type | address"
+        assert lines[1].startswith("Shop 0 | 41.4 | 2.1 | 4.5")
+        assert "None" not in "\n".join(lines)
+
+    def test_dict_with_nested_rows(self):
+        lines = to_compact_lines({"distance_km": 12.5, "climbs": [{"name": "A", "max_gradient": None}]})
+        assert lines == ["distance_km: 12.5", "climbs:", "name", "A"]
+
+    def test_compact_is_smaller_than_json(self):
+        encoded = encode_result(shops(5), budget=1000)
+        assert encoded.tokens < encoded.raw_tokens
+        assert encoded.tokens_saved > 0
+        assert not encoded.truncated
+
+    def test_budget_truncates_rows_with_marker(self):
+        encoded = encode_result(shops(50), budget=100)
+        assert encoded.truncated
+        assert encoded.tokens <= 110
+        assert encoded.text.splitlines()[0].startswith("title |")
+        assert "more rows]" in encoded.text.splitlines()[-1]
+
+    def test_long_single_string_is_cut(self):
+        encoded = encode_result("word " * 2000, budget=50)
+        assert encoded.truncated
+        assert "more characters]" in encoded.text
+        assert estimate_tokens(encoded.text) < 100
+
+
+class TestCompactResultTool:
+    def test_keeps_name_description_and_schema(self):
+        wrapped = CompactResultTool(find_bike_rentals)
+        assert wrapped.name == find_bike_rentals.name
+        assert wrapped.description == find_bike_rentals.description
+        assert wrapped.args == find_bike_rentals.args
+        assert wrapped.token_budget == 300
+
+    def test_every_agent_tool_has_its_own_budget(self):
+        names = {name for tools in INTENT_TOOLS.values() for name in tools}
+        assert names - set(TOOL_TOKEN_BUDGETS) == set()
+
+    def test_base_tool_schema_is_preserved(self):
+        wrapped = CompactResultTool(StravaClimbsTool())
+        assert set(wrapped.args) == {"ids", "source"}
+
+    def test_invoke_returns_compact_text_and_records_stats(self):
+        wrapped = compact_tools([echo_shops], budgets={"echo_shops": 1000})[0]
+        text = wrapped.invoke({"n": 3})
+        assert isinstance(text, str)
+        assert len(text.splitlines()) == 4
+        stats = wrapped.stats
+        assert stats["calls"] == 1
+        assert stats["tokens_saved"] > 0
+
+    def test_errors_propagate(self):
+        @tool
+        def broken(x: int) -> str:
+            """Always fails."""
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError, match="upstream down"):
+            CompactResultTool(broken).invoke({"x": 1})
@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pytest
+import requests
+from unittest.mock import patch, MagicMock
+from src.utils.ride_planner import RideWeights, rolling_mean, score_hours, top_windows
+from src.tools.tools import plan_ride_windows
+
+
+def hourly_forecast(name, temps, rain, wind, start_epoch=1_700_000_000):
+    hours = [
+        {
+            "time": f"2023-10-01 {h:02d}:00",
+            "time_epoch": start_epoch + h * 3600,
+            "temp_c": temps[h],
+            "chance_of_rain": rain[h],
+            "wind_kph": wind[h],
+            "is_day": int(7 <= h <= 19),
+        }
+        for h in range(24)
+    ]
+    return {
+        "location": {"name": name, "localtime_epoch": start_epoch},
+        "forecast": {"forecastday": [{"date": "2023-10-01", "hour": hours}]},
+    }
+
+
+class TestRidePlanner:
+    def test_score_prefers_ideal_conditions(self):
+        scores = score_hours(
+            np.array([18.0, 35.0, 18.0]),
+            np.array([0.0, 0.0, 90.0]),
+            np.array([5.0, 5.0, 5.0]),
+            np.array([1, 1, 1]),
+        )
+        assert scores[0] > scores[1]
+        assert scores[0] > scores[2]
+        assert 0.0 <= scores.min() and scores.max() <= 1.0
+
+    def test_weights_change_ranking(self):
+        args = (np.array([18.0, 30.0]), np.array([60.0, 0.0]), np.array([5.0, 5.0]), np.array([1, 1]))
+        rain_averse = score_hours(*args, RideWeights(precipitation=10.0))
+        heat_averse = score_hours(*args, RideWeights(temperature=10.0))
+        assert rain_averse[1] > rain_averse[0]
+        assert heat_averse[0] > heat_averse[1]
+
+    def test_zero_weights_raise(self):
+        with pytest.raises(ValueError):
+            score_hours(np.ones(1), np.ones(1), np.ones(1), np.ones(1), RideWeights(0, 0, 0, 0))
+
+    def test_rolling_mean_and_nan_padding(self):
+        scores = np.array([[1.0, 2.0, 3.0, np.nan]])
+        np.testing.assert_allclose(rolling_mean(scores, 2), [[1.5, 2.5, np.nan]])
+
+    def test_rolling_mean_nan_only_spoils_its_own_windows(self):
+        scores = np.array([[1.0, np.nan, 3.0, 4.0, 5.0]])
+        np.testing.assert_allclose(rolling_mean(scores, 2), [[np.nan, np.nan, 3.5, 4.5]])
+
+    def test_top_windows_do_not_overlap(self):
+        window_scores = np.array([[0.9, 0.95, 0.9, 0.1, 0.8], [0.5, 0.2, 0.2, 0.2, 0.2]])
+        picked = top_windows(window_scores, window=2, k=3)
+        assert picked[0] == (0, 1, 0.95)
+        assert (0, 0, 0.9) not in picked and (0, 2, 0.9) not in picked
+        assert [p[:2] for p in picked[1:]] == [(0, 4), (1, 0)]
+
+    def test_top_windows_rejects_empty_window(self):
+        with pytest.raises(ValueError):
+            top_windows(np.ones((1, 3)), window=0, k=1)
+
+
+class TestPlanRideWindowsTool:
+    @patch("src.tools.tools.requests.post")
+    @patch("src.tools.tools.requests.get")
+    def test_returns_best_windows_across_cities(self, mock_get, mock_post):
+        mock_post.side_effect = requests.HTTPError("bulk not available")
+        wet = hourly_forecast("Wetville", [18.0] * 24, [90] * 24, [10.0] * 24)
+        rain = [80] * 24
+        rain[10:12] = [0, 0]
+        dry = hourly_forecast("Sunnyton", [18.0] * 24, rain, [10.0] * 24)
+
+        def respond(url, params, **kwargs):
+            response = MagicMock()
+            response.json.return_value = wet if params["q"] == "Wetville" else dry
+            return response
+
+        mock_get.side_effect = respond
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            result = plan_ride_windows.invoke(
+                {"cities": ["Wetville", "Sunnyton"], "days": 1, "window_hours": 2, "top_k": 3}
+            )
+
+        assert mock_get.call_count == 2
+        assert result[0]["city"] == "Sunnyton"
+        assert result[0]["start"] == "2023-10-01 10:00"
+        assert result[0]["end"] == "12:00"
+        assert result[0]["chance_of_rain"] == 0
+        assert len(result) == 3
+
+    @pytest.mark.parametrize("window_hours, calls", [(0, 0), (-2, 0), (25, 1)])
+    @patch("src.tools.tools.requests.post", side_effect=requests.HTTPError("bulk not available"))
+    @patch("src.tools.tools.requests.get")
+    def test_window_hours_out_of_range(self, mock_get, mock_post, window_hours, calls):
+        forecast = hourly_forecast("Girona", [18.0] * 24, [0] * 24, [10.0] * 24)
+        mock_get.return_value.json.return_value = forecast
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            result = plan_ride_windows.invoke({"cities": ["Girona"], "days": 1, "window_hours": window_hours})
+
+        assert len(result) == 1 and "window_hours must be" in result[0]["message"]
+        assert mock_get.call_count == calls
+
+    @pytest.mark.parametrize(
+        "weights",
+        [
+            {"rain_weight": -1.0},
+            {"temperature_weight": 0.0, "rain_weight": 0.0, "wind_weight": 0.0, "daylight_weight": 0.0},
+        ],
+    )
+    @patch("src.tools.tools.requests.get")
+    def test_invalid_weights_return_a_message(self, mock_get, weights):
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            result = plan_ride_windows.invoke({"cities": ["Girona"], **weights})
+
+        assert "Ride weights" in result[0]["message"]
+        mock_get.assert_not_called()
+
+    def test_missing_key(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match="Missing WEATHERAPI_KEY"):
+                plan_ride_windows.invoke({"cities": ["London"]})
@@ -0,0 +1,171 @@
+import os
+import time
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+from src.utils.geometry import decode_polyline, encode_polyline, simplify
+from src.utils.route_index import RouteGeometry, RouteIndex, RTree
+from src.tools.tools import RoutesNearTool
+
+
+def straight_route(start, end, n=200):
+    lats = np.linspace(start[0], end[0], n)
+    lons = np.linspace(start[1], end[1], n)
+    return np.column_stack((lats, lons))
+
+
+class TestGeometry:
+    def test_decode_known_polyline(self):
+        # Example from the Google encoded polyline documentation
+        coords = decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+        expected = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+        np.testing.assert_allclose(coords, expected)
+
+    def test_round_trip(self):
+        coords = np.array([[41.3851, 2.1734], [41.5934, 1.8372], [41.6, 1.84]])
+        np.testing.assert_allclose(decode_polyline(encode_polyline(coords)), coords, atol=1e-5)
+
+    def test_decode_empty(self):
+        assert decode_polyline("").shape == (0, 2)
+
+    def test_simplify_straight_line(self):
+        coords = straight_route((41.0, 2.0), (41.1, 2.1))
+        simplified = simplify(coords, tolerance_m=5)
+        assert len(simplified) == 2
+        np.testing.assert_allclose(simplified[[0, -1]], coords[[0, -1]])
+
+    def test_simplify_keeps_corners(self):
+        leg1 = straight_route((41.0, 2.0), (41.1, 2.0), 50)
+        leg2 = straight_route((41.1, 2.0), (41.1, 2.1), 50)
+        simplified = simplify(np.vstack((leg1, leg2[1:])), tolerance_m=5)
+        assert len(simplified) == 3
+
+
+class TestRouteIndex:
+    def make_index(self, n_routes=300):
+        rng = np.random.default_rng(1)
+        routes = []
+        for i in range(n_routes):
+            start = rng.uniform([40.0, 0.0], [43.0, 3.0])
+            end = start + rng.uniform(-0.2, 0.2, 2)
+            polyline = encode_polyline(straight_route(start, end))
+            routes.append(RouteGeometry.from_polyline(i, f"Route {i}", polyline))
+        montserrat = encode_polyline(straight_route((41.55, 1.80), (41.62, 1.86)))
+        routes.append(RouteGeometry.from_polyline(999, "Montserrat loop", montserrat))
+        return RouteIndex(routes)
+
+    def test_rtree_matches_brute_force(self):
+        rng = np.random.default_rng(2)
+        mins = rng.uniform(0, 100, (1000, 2))
+        boxes = np.hstack((mins, mins + rng.uniform(0, 5, (1000, 2))))
+        tree = RTree(boxes, node_capacity=8)
+        query = (20.0, 20.0, 30.0, 35.0)
+        expected = np.flatnonzero(
+            (boxes[:, 0] <= query[2])
+            & (boxes[:, 2] >= query[0])
+            & (boxes[:, 1] <= query[3])
+            & (boxes[:, 3] >= query[1])
+        )
+        assert sorted(tree.query(query).tolist()) == expected.tolist()
+
+    def test_empty_index(self):
+        index = RouteIndex([])
+        assert index.query_point(41.0, 2.0, 5.0) == []
+
+    def test_query_point(self):
+        index = self.make_index()
+        matches = index.query_point(41.593, 1.837, 1.0)
+        assert any(route.route_id == 999 for route, _ in matches)
+        assert all(distance <= 1.0 for _, distance in matches)
+        assert [d for _, d in matches] == sorted(d for _, d in matches)
+
+    def test_query_corridor(self):
+        index = self.make_index()
+        path = np.array([[41.55, 1.80], [41.62, 1.86]])
+        matches = index.query_corridor(path, width_km=0.5, min_fraction=0.9)
+        assert matches[0][0].route_id == 999
+        assert matches[0][1] == pytest.approx(1.0)
+
+    def test_query_is_fast(self):
+        index = self.make_index(n_routes=500)
+        start = time.perf_counter()
+        for _ in range(20):
+            index.query_point(41.593, 1.837, 2.0)
+        assert (time.perf_counter() - start) / 20 < 0.05
+
+    def test_geometry_is_compact(self):
+        route = RouteGeometry.from_polyline(
+            1, "Line", encode_polyline(straight_route((41.0, 2.0), (41.2, 2.2), 1000))
+        )
+        assert route.coords.dtype == np.float32
+        assert len(route.coords) == 2
+        assert route.distance_km == pytest.approx(27.5, abs=0.5)
+
+
+class TestRoutesNearTool:
+    @patch("src.tools.tools.requests.get")
+    def test_run_returns_only_matching_routes(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {
+                "id": 1,
+                "name": "Montserrat loop",
+                "map": {"summary_polyline": encode_polyline(straight_route((41.55, 1.80), (41.62, 1.86)))},
+            },
+            {
+                "id": 2,
+                "name": "Coast ride",
+                "map": {"summary_polyline": encode_polyline(straight_route((41.30, 2.10), (41.40, 2.20)))},
+            },
+        ]
+        mock_get.return_value = mock_response
+
+        with patch.dict(os.environ, {"STRAVA_ACCESS_TOKEN": "valid_token"}):
+            tool = RoutesNearTool()
+            result = tool._run(location="41.593, 1.837", radius_km=2.0)
+            tool._run(location="41.35, 2.15", radius_km=2.0)
+
+        assert [r["name"] for r in result] == ["Montserrat loop"]
+        # The index is built once and reused for later queries
+        mock_get.assert_called_once()
+
+    @patch("src.tools.tools.requests.get")
+    def test_run_no_matches(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json.return_value = []
+        mock_get.return_value = mock_response
+
+        with patch.dict(os.environ, {"STRAVA_ACCESS_TOKEN": "valid_token"}):
+            result = RoutesNearTool()._run(location="0, 0")
+
+        assert "None of your routes" in result[0]["message"]
+
+    @patch("src.tools.tools.requests.get")
+    def test_run_along_corridor(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.json.return_value = [
+            {
+                "id": 1,
+                "name": "Valley road",
+                "map": {"summary_polyline": encode_polyline(straight_route((41.50, 1.80), (41.60, 1.80)))},
+            },
+            {
+                "id": 2,
+                "name": "Up the valley and beyond",
+                "map": {"summary_polyline": encode_polyline(straight_route((41.55, 1.80), (41.75, 1.80)))},
+            },
+            {
+                "id": 3,
+                "name": "Coast ride",
+                "map": {"summary_polyline": encode_polyline(straight_route((41.30, 2.10), (41.40, 2.20)))},
+            },
+        ]
+        mock_get.return_value = mock_response
+        corridor = encode_polyline(np.array([[41.49, 1.801], [41.61, 1.801]]))
+
+        with patch.dict(os.environ, {"STRAVA_ACCESS_TOKEN": "valid_token"}):
+            result = RoutesNearTool()._run(corridor=corridor, radius_km=1.0)
+
+        assert [r["name"] for r in result] == ["Valley road", "Up the valley and beyond"]
+        assert result[0]["inside_corridor"] == 1.0
+        assert 0 < result[1]["inside_corridor"] < 1.0
@@ -0,0 +1,255 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from src.utils.deadline import deadline_scope, remaining_time
+from src.utils.singleflight import SingleFlight, coalesce, degraded
+from src.tools.tools import get_weather_now
+
+
+class TestSingleFlight:
+    def test_concurrent_threads_share_one_call(self):
+        calls = []
+
+        @coalesce
+        def slow_lookup(city, days=3):
+            calls.append(city)
+            time.sleep(0.1)
+            return {"city": city}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: slow_lookup("Girona"), range(8)))
+
+        assert calls == ["Girona"]
+        assert all(r is results[0] for r in results)
+
+    def test_different_arguments_are_not_coalesced(self):
+        calls = []
+
+        @coalesce
+        def lookup(city, days=3):
+            calls.append((city, days))
+            time.sleep(0.05)
+            return city
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda args: lookup(*args), [("A", 3), ("A", 4), ("B", 3), ("A", 3)]))
+
+        assert sorted(calls) == [("A", 3), ("A", 4), ("B", 3)]
+
+    def test_defaults_and_keywords_map_to_same_key(self):
+        calls = []
+        release = threading.Event()
+
+        @coalesce
+        def lookup(city, days=3):
+            calls.append(city)
+            release.wait(1)
+            return city
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(lookup, "A")
+            time.sleep(0.05)
+            second = pool.submit(lookup, city="A", days=3)
+            time.sleep(0.05)
+            release.set()
+            assert first.result() == second.result() == "A"
+        assert calls == ["A"]
+
+    def test_errors_propagate_to_all_waiters(self):
+        @coalesce
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(failing) for _ in range(4)]
+            for future in futures:
+                with pytest.raises(RuntimeError, match="upstream down"):
+                    future.result()
+
+    def test_waiters_give_up_at_their_own_deadline(self):
+        release = threading.Event()
+        flight = SingleFlight()
+
+        def wait_in_turn(seconds):
+            with deadline_scope(seconds):
+                return flight.do("k", release.wait, 5)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "k", release.wait, 5)
+            time.sleep(0.05)
+            start = time.perf_counter()
+            with pytest.raises(TimeoutError):
+                pool.submit(wait_in_turn, 0.1).result()
+            assert time.perf_counter() - start < 1
+            release.set()
+            assert leader.result() is True
+
+    def test_async_waiters_give_up_at_their_own_deadline(self):
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.3)
+            return "done"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.ado("k", slow))
+            await asyncio.sleep(0)
+            with deadline_scope(0.05):
+                with pytest.raises(TimeoutError):
+                    await flight.ado("k", slow)
+            # The shared call keeps running for everyone else
+            return await leader
+
+        assert asyncio.run(main()) == "done"
+
+    def test_degraded_results_are_not_shared_with_waiters(self):
+        calls = []
+
+        @coalesce
+        def lookup(city):
+            calls.append(city)
+            time.sleep(0.1)
+            if remaining_time() < 1:
+                return degraded("skipped")
+            return "full"
+
+        def in_turn(seconds):
+            with deadline_scope(seconds):
+                return lookup("Girona")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            hurried = pool.submit(in_turn, 0.5)
+            time.sleep(0.05)
+            relaxed = pool.submit(in_turn, 10)
+            assert hurried.result() == "skipped"
+            assert relaxed.result() == "full"
+        assert calls == ["Girona", "Girona"]
+
+    def test_timeouts_are_not_shared_with_waiters(self):
+        flight = SingleFlight()
+        attempts = []
+
+        def fetch():
+            attempts.append(remaining_time())
+            time.sleep(0.1)
+            if remaining_time() < 1:
+                raise TimeoutError("out of time")
+            return "full"
+
+        def in_turn(seconds):
+            with deadline_scope(seconds):
+                return flight.do("k", fetch)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            hurried = pool.submit(in_turn, 0.5)
+            time.sleep(0.05)
+            relaxed = pool.submit(in_turn, 10)
+            with pytest.raises(TimeoutError):
+                hurried.result()
+            assert relaxed.result() == "full"
+        assert len(attempts) == 2
+
+    def test_async_degraded_results_are_not_shared_with_waiters(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def lookup():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return degraded("skipped") if remaining_time() < 1 else "full"
+
+        async def in_turn(seconds):
+            with deadline_scope(seconds):
+                return await flight.ado("k", lookup)
+
+        async def main():
+            hurried = asyncio.ensure_future(in_turn(0.5))
+            await asyncio.sleep(0.01)
+            return await asyncio.gather(hurried, in_turn(10))
+
+        assert asyncio.run(main()) == ["skipped", "full"]
+        assert len(calls) == 2
+
+    def test_next_call_after_completion_runs_again(self):
+        flight = SingleFlight()
+        fn = MagicMock(return_value=1)
+        flight.do("k", fn)
+        flight.do("k", fn)
+        assert fn.call_count == 2
+        assert flight.in_flight() == 0
+
+    def test_asyncio_callers_share_one_task(self):
+        calls = []
+
+        @coalesce
+        async def fetch(url):
+            calls.append(url)
+            await asyncio.sleep(0.05)
+            return url.upper()
+
+        async def main():
+            return await asyncio.gather(*(fetch("a") for _ in range(5)), fetch("b"))
+
+        results = asyncio.run(main())
+        assert results == ["A"] * 5 + ["B"]
+        assert sorted(calls) == ["a", "b"]
+
+    def test_asyncio_errors_propagate(self):
+        @coalesce
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad")
+
+        async def main():
+            return await asyncio.gather(fetch(), fetch(), return_exceptions=True)
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+
+
+class TestCoalescedTools:
+    @patch("src.tools.tools.requests.get")
+    def test_concurrent_identical_tool_calls_hit_upstream_once(self, mock_get):
+        def respond(url, params, **kwargs):
+            time.sleep(0.1)
+            response = MagicMock()
+            response.json.return_value = {
+                "location": {"name": "Girona", "country": "Spain"},
+                "current": {"condition": {"text": "Sunny"}, "temp_c": 20.0, "humidity": 40, "wind_kph": 5.0},
+            }
+            return response
+
+        mock_get.side_effect = respond
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                results = list(pool.map(lambda _: get_weather_now.invoke({"city": "Girona"}), range(6)))
+
+        assert mock_get.call_count == 1
+        assert len(set(results)) == 1
+
+    @patch("src.tools.tools.requests.get")
+    def test_async_tool_calls_are_coalesced(self, mock_get):
+        def respond(url, params, **kwargs):
+            time.sleep(0.1)
+            response = MagicMock()
+            response.json.return_value = {
+                "location": {"name": "Olot", "country": "Spain"},
+                "current": {"condition": {"text": "Cloudy"}, "temp_c": 12.0, "humidity": 70, "wind_kph": 9.0},
+            }
+            return response
+
+        mock_get.side_effect = respond
+
+        async def main():
+            return await asyncio.gather(*(get_weather_now.ainvoke({"city": "Olot"}) for _ in range(4)))
+
+        with patch.dict(os.environ, {"WEATHERAPI_KEY": "test_key"}):
+            results = asyncio.run(main())
+
+        assert mock_get.call_count == 1
+        assert all("Cloudy" in r for r in results)
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from src.agents.conversational_agent import ConversationalCyclingAgent
+from src.models.registry import get_registry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# Modules that take most of the startup time; none is needed to show the prompt
+HEAVY = ("langchain", "langchain_core", "langchain_openai", "langchain_ollama", "ollama", "serpapi", "bs4", "openai")
+
+
+def imported_after(statement: str):
+    """Top-level packages a fresh interpreter has loaded after running `statement`."""
+    code = f"import sys; {statement}; print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "src")]))
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    def test_cli_module_imports_no_heavy_packages(self):
+        assert not imported_after("import src.agents.conversational_agent") & set(HEAVY)
+
+    def test_tools_import_no_model_or_search_clients(self):
+        loaded = imported_after("import src.tools.tools")
+        assert not loaded & {"langchain_openai", "langchain_ollama", "ollama", "serpapi", "bs4", "openai"}
+
+
+def fake_model(provider):
+    model = MagicMock()
+    model.bind_tools.return_value = RunnableLambda(lambda x: x)
+    return model
+
+
+class TestBackgroundBuild:
+    @pytest.fixture(autouse=True)
+    def clean_registry(self):
+        get_registry().close()
+        yield
+        get_registry().close()
+
+    def test_model_is_built_off_the_calling_thread(self):
+        release = threading.Event()
+        built_on = []
+
+        def slow_model(provider):
+            built_on.append(threading.current_thread().name)
+            release.wait(5)
+            return fake_model(provider)
+
+        with patch.object(ConversationalCyclingAgent, "_create_model", side_effect=slow_model):
+            session = ConversationalCyclingAgent("ollama", background=True)
+            assert session.agent is None
+            release.set()
+            session.wait_ready()
+        assert built_on == ["agent-startup"]
+        assert session.model is not None and session.agent is not None
+
+    def test_build_errors_surface_when_waiting(self):
+        with patch.object(ConversationalCyclingAgent, "_create_model", side_effect=RuntimeError("no creds")):
+            session = ConversationalCyclingAgent("google", background=True)
+            with pytest.raises(RuntimeError, match="no creds"):
+                session.wait_ready()
@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from src.agents.conversational_agent import ConversationalCyclingAgent
+from src.agents.tool_selection import INTENT_EXAMPLES, ToolSelector, ToolSubsetAgent
+from src.models.registry import get_registry
+
+NAMES = [
+    "find_bike_rentals",
+    "get_weather_now",
+    "get_weather_forecast",
+    "get_weather_bulk",
+    "plan_ride_windows",
+    "find_cycling_climb_articles",
+    "scrape_and_extract_climb_stats",
+    "query_climbs",
+    "user_strava_routes",
+    "strava_climbs",
+    "user_routes_near",
+    "elevation_profile",
+]
+
+
+def intent_embedder(texts):
+    """One axis per intent: each example points along its intent's axis, queries along whatever they name."""
+    axes = {intent: i for i, intent in enumerate(INTENT_EXAMPLES)}
+    vectors = np.full((len(texts), len(axes)), 0.01)
+    for row, text in enumerate(texts):
+        for intent, examples in INTENT_EXAMPLES.items():
+            if text in examples or f"<{intent}>" in text:
+                vectors[row, axes[intent]] = 1.0
+    return vectors
+
+
+class TestToolSelector:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("What's the weather in Girona tomorrow?", set(NAMES[1:5])),
+            ("Where can I rent a bike in Valencia?", {"find_bike_rentals"}),
+            ("Find climbs near Girona", {"find_cycling_climb_articles", "scrape_and_extract_climb_stats", "query_climbs", "elevation_profile"}),
+        ],
+    )
+    def test_keywords_pick_the_matching_tools(self, text, expected):
+        assert set(ToolSelector(NAMES).select(text)) == expected
+
+    def test_mixed_requests_get_every_intent_in_original_order(self):
+        names = ToolSelector(NAMES).select("Climbs near Olot and the forecast for Saturday")
+        assert names == tuple(n for n in NAMES if n in names)
+        assert "get_weather_forecast" in names and "find_cycling_climb_articles" in names
+
+    def test_unclear_turn_offers_every_tool(self):
+        assert ToolSelector(NAMES).select("What do you think?") == tuple(NAMES)
+
+    def test_embeddings_cover_turns_without_keywords(self):
+        selector = ToolSelector(NAMES, embed=intent_embedder)
+        assert selector.select("I'd like to borrow something with pedals <rentals>") == ("find_bike_rentals",)
+        assert selector.select("What do you think?") == tuple(NAMES)
+
+    def test_failing_embedder_falls_back_to_keywords(self):
+        embed = MagicMock(side_effect=ConnectionError("no ollama"))
+        selector = ToolSelector(NAMES, embed=embed)
+        assert selector.select("What do you think?") == tuple(NAMES)
+        assert selector.select("Anything else?") == tuple(NAMES)
+        assert embed.call_count == 1
+
+
+class TestToolSubsetAgent:
+    def test_one_executor_per_subset(self):
+        built = {}
+
+        def build(names):
+            return built.setdefault(names, MagicMock(invoke=MagicMock(return_value={"output": str(len(names))})))
+
+        agent = ToolSubsetAgent(ToolSelector(NAMES), build)
+        assert agent.invoke({"input": "Rent a bike in Sóller"})["output"] == "1"
+        agent.invoke({"input": "Bike shops in Palma?"})
+        agent.invoke({"input": "Weather in Palma"})
+        assert len(built) == 2
+        assert built[("find_bike_rentals",)].invoke.call_count == 2
+
+
+class TestSessionToolSelection:
+    @pytest.fixture(autouse=True)
+    def clean_registry(self):
+        get_registry().close()
+        yield
+        get_registry().close()
+
+    def test_model_is_bound_to_the_turns_tools_only(self):
+        bound = []
+
+        def fake_model(provider):
+            model = MagicMock()
+
+            def bind_tools(tools, **kwargs):
+                bound.append([t.name for t in tools])
+                return RunnableLambda(lambda x: x)
+
+            model.bind_tools.side_effect = bind_tools
+            return model
+
+        with patch.object(ConversationalCyclingAgent, "_create_model", side_effect=fake_model):
+            session = ConversationalCyclingAgent("azure_openai")
+            executor = session.agent.executor_for("Where can I rent a bike in Girona?")
+            again = ConversationalCyclingAgent("azure_openai").agent.executor_for("Any bike rental in Olot?")
+
+        assert bound == [["find_bike_rentals"]]
+        assert executor is again
+        assert [t.name for t in executor.tools] == ["find_bike_rentals"]
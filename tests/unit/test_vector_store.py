@@ -0,0 +1,147 @@
+import json
+import os
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+import src.tools.tools as tools
+from src.utils.vector_store import VectorStore, _scores, chunk_words
+
+DIM = 64
+
+
+def hashing_embedder(texts):
+    """Deterministic bag-of-words embedding: similar words, similar vectors."""
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            out[row, zlib.crc32(word.encode()) % DIM] += 1.0
+    return out
+
+
+ARTICLES = {
+    "https://a.example/girona": "Rocacorba climbs 13.8 km from Banyoles at 6.5 percent to the antennas",
+    "https://b.example/alps": "Alpe d'Huez has 21 hairpins over 13.8 km from Bourg d'Oisans",
+    "https://c.example/provence": "Mont Ventoux from Bedoin crosses the forest then the bare summit moonscape",
+}
+
+
+def store(tmp_path, **kwargs):
+    vs = VectorStore(str(tmp_path), hashing_embedder, chunk_size=8, chunk_overlap=2, **kwargs)
+    for url, text in ARTICLES.items():
+        vs.add_document(url, text)
+    return vs
+
+
+class TestChunkWords:
+    def test_windows_overlap(self):
+        chunks = chunk_words(" ".join(str(i) for i in range(10)), size=4, overlap=1)
+        assert chunks == ["0 1 2 3", "3 4 5 6", "6 7 8 9"]
+
+    def test_short_and_empty_text(self):
+        assert chunk_words("one two", size=4, overlap=1) == ["one two"]
+        assert chunk_words("   ") == []
+
+
+class TestVectorStore:
+    def test_top_passage_matches_query(self, tmp_path):
+        vs = store(tmp_path)
+        hits = vs.search("hairpins Alpe d'Huez", k=2)
+        assert hits[0].url == "https://b.example/alps"
+        assert hits[0].score >= hits[1].score
+
+    def test_reopen_and_add_incrementally(self, tmp_path):
+        rows = len(store(tmp_path))
+        reopened = VectorStore(str(tmp_path), hashing_embedder, chunk_size=8, chunk_overlap=2)
+        assert len(reopened) == rows and "https://a.example/girona" in reopened
+        assert reopened.add_document("https://a.example/girona", "again") == 0
+        assert reopened.add_document("https://d.example/pyrenees", "Tourmalet Aspin Peyresourde passes") == 1
+        assert reopened.search("Tourmalet passes", k=1)[0].url == "https://d.example/pyrenees"
+
+    def test_interrupted_append_is_repaired_on_open(self, tmp_path):
+        rows = len(store(tmp_path))
+        with open(tmp_path / "passages.jsonl", "ab") as f:
+            f.write(json.dumps({"url": "https://x.example", "chunk": 0, "text": "lost"}).encode() + b"\n{\"url")
+        reopened = VectorStore(str(tmp_path), hashing_embedder)
+        assert len(reopened) == rows
+        assert "https://x.example" not in reopened
+        assert os.path.getsize(tmp_path / "vectors.f32") == rows * DIM * 4
+
+    def test_ivf_and_quantized_search_agree_with_brute_force(self, tmp_path):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(10, DIM))
+        points = {f"https://{i}.example": centers[i % 10] + 0.05 * rng.normal(size=DIM) for i in range(300)}
+        vectors = dict(points)
+
+        def embed(texts):
+            return np.array([vectors[t] for t in texts])
+
+        exact = VectorStore(str(tmp_path / "exact"), embed, chunk_size=1, chunk_overlap=0)
+        ivf = VectorStore(
+            str(tmp_path / "ivf"), embed, chunk_size=1, chunk_overlap=0, ivf_min_rows=200, nprobe=3, quantize=True
+        )
+        for url in points:
+            exact.add_document(url, url)
+            ivf.add_document(url, url)
+        assert (tmp_path / "ivf" / "centroids.npy").exists()
+        assert os.path.getsize(tmp_path / "ivf" / "lists.i32") == 300 * 4
+
+        query = centers[3]
+        want = {p.url for p in exact.search_vector(query, k=10)}
+        got = {p.url for p in ivf.search_vector(query, k=10)}
+        assert len(want & got) >= 9
+
+    def test_inverted_lists_follow_appends_and_reopen(self, tmp_path):
+        rng = np.random.default_rng(2)
+        vectors = {f"https://{i}.example": rng.normal(size=DIM) for i in range(60)}
+
+        def embed(texts):
+            return np.array([vectors[t] for t in texts])
+
+        vs = VectorStore(str(tmp_path), embed, chunk_size=1, chunk_overlap=0, ivf_min_rows=40)
+        for url in vectors:
+            vs.add_document(url, url)
+
+        def by_list(store):
+            return [list(rows) for rows in store._inverted]
+
+        lists = np.fromfile(tmp_path / "lists.i32", dtype=np.int32)
+        assert by_list(vs) == [list(np.flatnonzero(lists == c)) for c in range(len(vs._centroids))]
+        assert by_list(VectorStore(str(tmp_path), embed)) == by_list(vs)
+
+    def test_int8_scores_are_computed_in_blocks(self):
+        rng = np.random.default_rng(1)
+        codes = rng.integers(-127, 128, size=(1000, DIM), dtype=np.int8)
+        query = rng.normal(size=DIM).astype(np.float32)
+        ids = np.array([5, 999, 0, 512])
+        full = codes.astype(np.float32) @ query
+        np.testing.assert_allclose(_scores(codes, query, batch=64), full, rtol=1e-5)
+        np.testing.assert_allclose(_scores(codes, query, ids, batch=3), full[ids], rtol=1e-5)
+
+    def test_quantized_search_without_ivf(self, tmp_path):
+        exact = store(tmp_path / "exact")
+        quantized = store(tmp_path / "quantized", quantize=True)
+        query = hashing_embedder(["Rocacorba antennas"])[0]
+        assert [p.url for p in quantized.search_vector(query, k=2)] == [p.url for p in exact.search_vector(query, k=2)]
+
+    def test_embedding_size_is_fixed(self, tmp_path):
+        vs = store(tmp_path)
+        vs.embed = lambda texts: np.ones((len(texts), DIM + 1))
+        with pytest.raises(ValueError):
+            vs.add_document("https://e.example", "different model")
+
+
+class TestSearchStoredArticlesTool:
+    def test_disabled_without_a_store_directory(self):
+        with patch.object(tools, "ARTICLE_STORE_DIR", ""):
+            result = tools.search_stored_articles.invoke({"query": "climbs near Girona"})
+        assert "ARTICLE_STORE_DIR" in result[0]["message"]
+
+    def test_returns_passages(self, tmp_path):
+        vs = store(tmp_path)
+        with patch.object(tools, "get_article_store", return_value=vs):
+            result = tools.search_stored_articles.invoke({"query": "Rocacorba Banyoles", "k": 1})
+        assert result[0]["url"] == "https://a.example/girona"
+        assert "Rocacorba" in result[0]["text"]